@@ -28,8 +28,13 @@ def create_app(config=None):
     Returns:
         Aplicação Flask configurada
     """
+    from src.utils.json_provider import FastJSONProvider
+    
     app = Flask(__name__, static_folder="static")
     
+    # Serialização JSON rápida (orjson quando disponível)
+    app.json = FastJSONProvider(app)
+    
     # Configuração
     configure_app(app, config)
     
@@ -39,6 +44,9 @@ def create_app(config=None):
     # CORS
     configure_cors(app)
     
+    # Compressão gzip/brotli das respostas /api/*
+    configure_compression(app)
+    
     # Registra blueprints
     register_blueprints(app)
     
@@ -85,6 +93,14 @@ def configure_app(app, config=None):
     logger.info(f"App configured - Debug: {debug_mode}, DB: {app.config['DATABASE_PATH']}")
 
 
+def configure_compression(app):
+    """Configura compressão das respostas acima de COMPRESSION_MIN_BYTES"""
+    from src.utils.compression import init_compression, ENCODINGS
+    
+    init_compression(app, min_bytes=app.config.get("COMPRESSION_MIN_BYTES"))
+    logger.info(f"Compression configured - Encodings: {list(ENCODINGS)}")
+
+
 def configure_cors(app):
     """Configura CORS com origens específicas"""
     debug_mode = app.config.get("DEBUG", False)
@@ -110,135 +126,142 @@ def configure_cors(app):
 
 def init_database(app):
     """Inicializa banco de dados"""
-    import sqlite3
-    from datetime import datetime
+    from src.utils.db_connection import get_connection_manager, reset_connection_manager
+    from src.utils.migrations import apply_migrations
     
     db_path = app.config["DATABASE_PATH"]
     
+    # Cada app com ":memory:" (testes) começa com um banco em memória vazio
+    if db_path == ":memory:":
+        reset_connection_manager(db_path)
+    db = get_connection_manager(db_path)
+    
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Tabela de detecções
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS detections (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                created_at TEXT NOT NULL,
-                frame INTEGER,
-                class_name TEXT,
-                confidence REAL,
-                bbox TEXT,
-                fps REAL,
-                location_x REAL DEFAULT 0,
-                location_y REAL DEFAULT 0,
-                zone_id TEXT DEFAULT 'A1'
-            )
-        """)
-        
-        # Tabela de motos no pátio
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS motos_patio (
-                id TEXT PRIMARY KEY,
-                modelo TEXT,
-                placa TEXT,
-                status TEXT DEFAULT 'disponivel',
-                bateria INTEGER DEFAULT 100,
-                localizacao_x REAL DEFAULT 0,
-                localizacao_y REAL DEFAULT 0,
-                zona TEXT DEFAULT 'A1',
-                endereco TEXT DEFAULT '',
-                setor TEXT DEFAULT '',
-                andar INTEGER DEFAULT 1,
-                vaga TEXT DEFAULT '',
-                descricao_localizacao TEXT DEFAULT '',
-                ultima_atualizacao TEXT,
-                em_uso_por TEXT,
-                manutencao_agendada TEXT
-            )
-        """)
-        
-        # Tabela de usuários
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS usuarios (
-                id TEXT PRIMARY KEY,
-                nome TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                senha_hash TEXT NOT NULL,
-                tipo TEXT DEFAULT 'usuario',
-                criado_em TEXT,
-                ultimo_acesso TEXT,
-                ativo BOOLEAN DEFAULT 1
-            )
-        """)
-        
-        # Tabela de alertas
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS alertas (
-                id TEXT PRIMARY KEY,
-                tipo TEXT NOT NULL,
-                severidade TEXT DEFAULT 'info',
-                titulo TEXT NOT NULL,
-                descricao TEXT,
-                moto_id TEXT,
-                zona TEXT,
-                ativo BOOLEAN DEFAULT 1,
-                criado_em TEXT,
-                resolvido_em TEXT,
-                resolvido_por TEXT
-            )
-        """)
-        
-        # Tabela para idempotência de eventos IoT
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS iot_eventos (
-                idempotency_key TEXT PRIMARY KEY,
-                alert_id TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-        """)
-        
-        # Tabela para tokens de push (mobile)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS push_devices (
-                token TEXT PRIMARY KEY,
-                user_id TEXT,
-                platform TEXT,
-                created_at TEXT NOT NULL,
-                last_seen TEXT
-            )
-        """)
-        
-        # Tabela de dispositivos IoT
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS dispositivos_iot (
-                id TEXT PRIMARY KEY,
-                nome TEXT NOT NULL,
-                tipo TEXT NOT NULL,
-                status TEXT DEFAULT 'online',
-                localizacao TEXT,
-                ultima_comunicacao TEXT,
-                dados_sensor TEXT,
-                configuracao TEXT
-            )
-        """)
-        
-        # Tabela de histórico de uso
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS historico_uso (
-                id TEXT PRIMARY KEY,
-                moto_id TEXT NOT NULL,
-                usuario_id TEXT,
-                inicio_uso TEXT,
-                fim_uso TEXT,
-                localizacao_inicial TEXT,
-                localizacao_final TEXT,
-                distancia_percorrida REAL DEFAULT 0,
-                tempo_uso INTEGER DEFAULT 0
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Tabela de detecções
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS detections (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    frame INTEGER,
+                    class_name TEXT,
+                    confidence REAL,
+                    bbox TEXT,
+                    fps REAL,
+                    location_x REAL DEFAULT 0,
+                    location_y REAL DEFAULT 0,
+                    zone_id TEXT DEFAULT 'A1'
+                )
+            """)
+            
+            # Tabela de motos no pátio
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS motos_patio (
+                    id TEXT PRIMARY KEY,
+                    modelo TEXT,
+                    placa TEXT,
+                    status TEXT DEFAULT 'disponivel',
+                    bateria INTEGER DEFAULT 100,
+                    localizacao_x REAL DEFAULT 0,
+                    localizacao_y REAL DEFAULT 0,
+                    zona TEXT DEFAULT 'A1',
+                    endereco TEXT DEFAULT '',
+                    setor TEXT DEFAULT '',
+                    andar INTEGER DEFAULT 1,
+                    vaga TEXT DEFAULT '',
+                    descricao_localizacao TEXT DEFAULT '',
+                    ultima_atualizacao TEXT,
+                    em_uso_por TEXT,
+                    manutencao_agendada TEXT
+                )
+            """)
+            
+            # Tabela de usuários
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS usuarios (
+                    id TEXT PRIMARY KEY,
+                    nome TEXT NOT NULL,
+                    email TEXT UNIQUE NOT NULL,
+                    senha_hash TEXT NOT NULL,
+                    tipo TEXT DEFAULT 'usuario',
+                    criado_em TEXT,
+                    ultimo_acesso TEXT,
+                    ativo BOOLEAN DEFAULT 1
+                )
+            """)
+            
+            # Tabela de alertas
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS alertas (
+                    id TEXT PRIMARY KEY,
+                    tipo TEXT NOT NULL,
+                    severidade TEXT DEFAULT 'info',
+                    titulo TEXT NOT NULL,
+                    descricao TEXT,
+                    moto_id TEXT,
+                    zona TEXT,
+                    ativo BOOLEAN DEFAULT 1,
+                    criado_em TEXT,
+                    resolvido_em TEXT,
+                    resolvido_por TEXT
+                )
+            """)
+            
+            # Tabela para idempotência de eventos IoT
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS iot_eventos (
+                    idempotency_key TEXT PRIMARY KEY,
+                    alert_id TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            
+            # Tabela para tokens de push (mobile)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS push_devices (
+                    token TEXT PRIMARY KEY,
+                    user_id TEXT,
+                    platform TEXT,
+                    created_at TEXT NOT NULL,
+                    last_seen TEXT
+                )
+            """)
+            
+            # Tabela de dispositivos IoT
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS dispositivos_iot (
+                    id TEXT PRIMARY KEY,
+                    nome TEXT NOT NULL,
+                    tipo TEXT NOT NULL,
+                    status TEXT DEFAULT 'online',
+                    localizacao TEXT,
+                    ultima_comunicacao TEXT,
+                    dados_sensor TEXT,
+                    configuracao TEXT
+                )
+            """)
+            
+            # Tabela de histórico de uso
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS historico_uso (
+                    id TEXT PRIMARY KEY,
+                    moto_id TEXT NOT NULL,
+                    usuario_id TEXT,
+                    inicio_uso TEXT,
+                    fim_uso TEXT,
+                    localizacao_inicial TEXT,
+                    localizacao_final TEXT,
+                    distancia_percorrida REAL DEFAULT 0,
+                    tempo_uso INTEGER DEFAULT 0
+                )
+            """)
+            
+            conn.commit()
+            
+            # Índices e colunas derivadas (PRAGMA user_version)
+            apply_migrations(conn)
         
         # Popula dados iniciais
         populate_initial_data(db_path)
@@ -252,10 +275,11 @@ def init_database(app):
 
 def populate_initial_data(db_path):
     """Popula dados iniciais para demonstração"""
-    import sqlite3
     from datetime import datetime
+    from src.utils.db_connection import get_connection_manager
     
-    conn = sqlite3.connect(db_path)
+    db = get_connection_manager(db_path)
+    conn = db.acquire()
     cursor = conn.cursor()
     
     try:
@@ -307,18 +331,20 @@ def populate_initial_data(db_path):
     except Exception as e:
         logger.error(f"Error populating initial data: {e}", exc_info=True)
     finally:
-        conn.close()
+        db.release(conn)
 
 
 def register_blueprints(app):
     """Registra todos os blueprints"""
-    from src.routes import mobile_bp, java_bp, dotnet_bp, iot_bp, database_bp
+    from src.routes import mobile_bp, java_bp, dotnet_bp, iot_bp, database_bp, snapshot_bp, stream_bp
     
     app.register_blueprint(mobile_bp)
     app.register_blueprint(java_bp)
     app.register_blueprint(dotnet_bp)
     app.register_blueprint(iot_bp)
     app.register_blueprint(database_bp)
+    app.register_blueprint(snapshot_bp)
+    app.register_blueprint(stream_bp)
     
     logger.info("All blueprints registered")
 
@@ -338,6 +364,7 @@ def register_basic_routes(app):
                 "dotnet": "/api/dotnet/*",
                 "database": "/api/database/*",
                 "iot": "/api/iot/*",
+                "snapshots": "/api/snapshots/<key>.jpg",
                 "dashboard": "/dashboard",
                 "health": "/health"
             }
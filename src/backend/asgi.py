@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+VisionMoto API - Modo ASGI
+Expõe as mesmas rotas da aplicação Flask para servidores ASGI (uvicorn):
+as requisições comuns rodam em um pool de threads limitado (a2wsgi), e o
+stream SSE é servido de forma nativa no event loop, de modo que milhares
+de conexões ociosas não ocupam threads nem workers.
+
+Uso:
+    uvicorn src.backend.asgi:app --host 0.0.0.0 --port 5001 --workers 2
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from flask import Flask
+
+from src.config import Config
+from src.constants import SSE_KEEPALIVE_SECONDS, SSE_RETRY_MS
+from src.utils.change_feed import AsyncSubscriber, get_change_feed
+from src.routes.stream_routes import format_sse
+
+try:
+    from a2wsgi import WSGIMiddleware
+
+    A2WSGI_AVAILABLE = True
+except ImportError:
+    WSGIMiddleware = None
+    A2WSGI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATH = "/api/stream/events"
+
+SSE_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+
+class VisionMotoASGI:
+    """Aplicação ASGI: stream SSE nativo e demais rotas via pool de threads"""
+
+    def __init__(self, flask_app: Flask, threads: int):
+        self.flask_app = flask_app
+        self.db_path = flask_app.config.get("DATABASE_PATH", Config.DATABASE_PATH)
+        # Cada thread do pool mantém sua conexão SQLite (ConnectionManager)
+        self.wsgi = WSGIMiddleware(flask_app, workers=threads)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["path"] == STREAM_PATH
+            and scope["method"] == "GET"
+        ):
+            await self.stream_events(receive, send)
+            return
+        await self.wsgi(scope, receive, send)
+
+    async def stream_events(self, receive, send):
+        """Mesmo protocolo de GET /api/stream/events, sem thread por cliente"""
+        loop = asyncio.get_running_loop()
+        feed = get_change_feed(self.db_path)
+        subscriber = AsyncSubscriber(loop, feed.queue_size)
+        # O primeiro assinante lê o estado de referência no banco
+        await loop.run_in_executor(None, feed.subscribe, subscriber)
+
+        disconnected = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            await send({"type": "http.response.start", "status": 200, "headers": SSE_HEADERS})
+            await send({
+                "type": "http.response.body",
+                "body": b"retry: %d\n\n" % SSE_RETRY_MS,
+                "more_body": True,
+            })
+
+            while not disconnected.done():
+                next_event = asyncio.ensure_future(subscriber.get())
+                done, _ = await asyncio.wait(
+                    {next_event, disconnected},
+                    timeout=SSE_KEEPALIVE_SECONDS,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if next_event in done:
+                    chunk = format_sse(*next_event.result())
+                else:
+                    next_event.cancel()
+                    if disconnected in done:
+                        break
+                    # Comentário SSE: mantém proxies abertos
+                    chunk = b": keepalive\n\n"
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        except OSError:
+            # Conexão encerrada pelo cliente durante o envio
+            pass
+        finally:
+            disconnected.cancel()
+            feed.unsubscribe(subscriber)
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+
+
+def create_asgi_app(flask_app: Optional[Flask] = None, threads: Optional[int] = None):
+    """
+    Cria a aplicação ASGI
+
+    Args:
+        flask_app: Aplicação Flask (padrão: a instância de src.backend.app)
+        threads: Tamanho do pool de threads das rotas síncronas
+            (padrão: ASGI_THREADS)
+
+    Returns:
+        Aplicação ASGI
+
+    Raises:
+        RuntimeError: Se a2wsgi não estiver instalado
+    """
+    if not A2WSGI_AVAILABLE:
+        raise RuntimeError("Modo ASGI requer a2wsgi: pip install a2wsgi uvicorn")
+
+    if flask_app is None:
+        from src.backend.app import app as flask_app
+
+    threads = Config.ASGI_THREADS if threads is None else threads
+    logger.info(f"ASGI app initialized ({threads} threads)")
+    return VisionMotoASGI(flask_app, threads)
+
+
+# Instância global da aplicação ASGI
+app = create_asgi_app()
@@ -34,18 +34,29 @@ from src.constants import (
     RATE_LIMIT_PER_MINUTE,
     RATE_LIMIT_PER_HOUR,
     DEFAULT_CORS_ORIGINS,
-    ALLOWED_TABLES
+    ALLOWED_TABLES,
+    MAX_EVENT_BATCH_SIZE,
+    MAX_TELEMETRY_BATCH_SIZE,
 )
 
 # Importa serviços
 from src.services.moto_service import MotoService
 from src.services.alert_service import AlertService
+from src.services.iot_service import IoTService
 from src.services.auth_service import AuthService
 
+from src.utils.db_connection import get_connection_manager, reset_connection_manager
+from src.utils.migrations import apply_migrations
+from src.utils.json_provider import FastJSONProvider
+from src.utils.compression import init_compression
+from src.utils.change_feed import get_change_feed
+
 # Importa formatadores
 from src.formatters.mobile_formatter import MobileFormatter
 from src.formatters.java_formatter import JavaFormatter
 from src.formatters.dotnet_formatter import DotNetFormatter
+from src.routes.snapshot_routes import snapshot_response
+from src.routes.stream_routes import event_stream_response
 
 # Importa modelos
 from src.models.user import UserLogin
@@ -68,6 +79,7 @@ class VisionMotoIntegrationAPI:
 
     def __init__(self, db_path: Optional[str] = None):
         self.app = Flask(__name__, static_folder="static")
+        self.app.json = FastJSONProvider(self.app)
         
         # SECRET_KEY obrigatória em produção
         secret_key = os.environ.get("SECRET_KEY")
@@ -87,6 +99,10 @@ class VisionMotoIntegrationAPI:
         
         self.app.config["SECRET_KEY"] = secret_key
         self.db_path = db_path or os.environ.get("DATABASE_PATH", DEFAULT_DB_PATH)
+        # Cada instância com ":memory:" (testes) começa com um banco vazio
+        if self.db_path == ":memory:":
+            reset_connection_manager(self.db_path)
+        self.db = get_connection_manager(self.db_path)
 
         # CORS configurado com origens específicas
         allowed_origins = os.environ.get(
@@ -105,6 +121,9 @@ class VisionMotoIntegrationAPI:
             }
         })
 
+        # Compressão gzip/brotli das respostas /api/*
+        init_compression(self.app)
+
         # Rate Limiting
         self.limiter = Limiter(
             app=self.app,
@@ -116,6 +135,7 @@ class VisionMotoIntegrationAPI:
         # Inicializa serviços
         self.moto_service = MotoService(self.db_path)
         self.alert_service = AlertService(self.db_path)
+        self.iot_service = IoTService(self.db_path)
         self.auth_service = AuthService(self.db_path, secret_key)
 
         self._init_database()
@@ -123,9 +143,8 @@ class VisionMotoIntegrationAPI:
 
     @contextmanager
     def get_db_connection(self):
-        """Context manager para conexões de banco de dados"""
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
+        """Context manager sobre a conexão persistente da thread"""
+        conn = self.db.acquire()
         try:
             yield conn
         except Exception as e:
@@ -133,7 +152,7 @@ class VisionMotoIntegrationAPI:
             logger.error(f"Database error: {e}", exc_info=True)
             raise
         finally:
-            conn.close()
+            self.db.release(conn)
     
     def _validate_table_name(self, table_name: str) -> bool:
         """Valida nome de tabela para prevenir SQL injection"""
@@ -262,6 +281,9 @@ class VisionMotoIntegrationAPI:
                 )
             """)
 
+            # Índices e colunas derivadas (PRAGMA user_version)
+            apply_migrations(conn)
+
         # Popula dados iniciais se necessário
         self._populate_initial_data()
 
@@ -564,20 +586,18 @@ class VisionMotoIntegrationAPI:
             """Gerenciamento de alertas para Java"""
             if request.method == "GET":
                 try:
-                    conn = sqlite3.connect(self.db_path)
-                    conn.row_factory = sqlite3.Row
-                    cursor = conn.cursor()
-
-                    cursor.execute(
+                    with self.get_db_connection() as conn:
+                        cursor = conn.cursor()
+
+                        cursor.execute(
+                            """
+                            SELECT * FROM alertas 
+                            WHERE ativo = 1 
+                            ORDER BY criado_em DESC
                         """
-                        SELECT * FROM alertas 
-                        WHERE ativo = 1 
-                        ORDER BY criado_em DESC
-                    """
-                    )
+                        )
 
-                    alertas = [dict(row) for row in cursor.fetchall()]
-                    conn.close()
+                        alertas = [dict(row) for row in cursor.fetchall()]
 
                     return jsonify({"success": True, "alertas": alertas})
 
@@ -588,28 +608,27 @@ class VisionMotoIntegrationAPI:
                 try:
                     data = request.get_json()
 
-                    conn = sqlite3.connect(self.db_path)
-                    cursor = conn.cursor()
-
-                    cursor.execute(
-                        """
-                        INSERT INTO alertas (id, tipo, severidade, titulo, descricao, moto_id, zona, criado_em)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            str(uuid.uuid4()),
-                            data.get("tipo", "info"),
-                            data.get("severidade", "info"),
-                            data.get("titulo", ""),
-                            data.get("descricao", ""),
-                            data.get("motoId"),
-                            data.get("zona"),
-                            datetime.now().isoformat(),
-                        ),
-                    )
+                    with self.get_db_connection() as conn:
+                        cursor = conn.cursor()
+
+                        cursor.execute(
+                            """
+                            INSERT INTO alertas (id, tipo, severidade, titulo, descricao, moto_id, zona, criado_em)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                            (
+                                str(uuid.uuid4()),
+                                data.get("tipo", "info"),
+                                data.get("severidade", "info"),
+                                data.get("titulo", ""),
+                                data.get("descricao", ""),
+                                data.get("motoId"),
+                                data.get("zona"),
+                                datetime.now().isoformat(),
+                            ),
+                        )
 
-                    conn.commit()
-                    conn.close()
+                        conn.commit()
 
                     return jsonify({"success": True, "message": "Alerta criado"})
 
@@ -621,33 +640,26 @@ class VisionMotoIntegrationAPI:
         def dotnet_motorcycle_data():
             """Endpoint para integração com .NET (formato C#)"""
             try:
-                conn = sqlite3.connect(self.db_path)
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-
-                cursor.execute(
-                    """
-                    SELECT 
-                        id as Id,
-                        modelo as Model,
-                        placa as LicensePlate,
-                        status as Status,
-                        bateria as BatteryLevel,
-                        localizacao_x as LocationX,
-                        localizacao_y as LocationY,
-                        zona as Zone,
-                        endereco as Address,
-                        setor as Sector,
-                        andar as Floor,
-                        vaga as ParkingSpot,
-                        descricao_localizacao as LocationDescription,
-                        ultima_atualizacao as LastUpdate
-                    FROM motos_patio
-                """
-                )
-
-                motorcycles = [dict(row) for row in cursor.fetchall()]
-                conn.close()
+                # Snapshot em memória da frota (MotoService)
+                motorcycles = [
+                    {
+                        "Id": m["id"],
+                        "Model": m["modelo"],
+                        "LicensePlate": m["placa"],
+                        "Status": m["status"],
+                        "BatteryLevel": m["bateria"],
+                        "LocationX": m["localizacao_x"],
+                        "LocationY": m["localizacao_y"],
+                        "Zone": m["zona"],
+                        "Address": m["endereco"],
+                        "Sector": m["setor"],
+                        "Floor": m["andar"],
+                        "ParkingSpot": m["vaga"],
+                        "LocationDescription": m["descricao_localizacao"],
+                        "LastUpdate": m["ultima_atualizacao"],
+                    }
+                    for m in self.moto_service.get_fleet_snapshot()[1]
+                ]
 
                 # Formato .NET-friendly
                 response = {
@@ -689,36 +701,36 @@ class VisionMotoIntegrationAPI:
         def dotnet_buscar_moto_por_placa(placa):
             """Busca moto específica por placa - Endpoint .NET"""
             try:
-                conn = sqlite3.connect(self.db_path)
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
+                with self.get_db_connection() as conn:
+                    cursor = conn.cursor()
 
-                cursor.execute(
-                    """
-                    SELECT 
-                        id as Id,
-                        modelo as Model,
-                        placa as LicensePlate,
-                        status as Status,
-                        bateria as BatteryLevel,
-                        localizacao_x as LocationX,
-                        localizacao_y as LocationY,
-                        zona as Zone,
-                        endereco as Address,
-                        setor as Sector,
-                        andar as Floor,
-                        vaga as ParkingSpot,
-                        descricao_localizacao as LocationDescription,
-                        ultima_atualizacao as LastUpdate,
-                        em_uso_por as InUseBy
-                    FROM motos_patio 
-                    WHERE placa = ? COLLATE NOCASE
-                """,
-                    (placa,),
-                )
+                    cursor.execute(
+                        """
+                        SELECT 
+                            id as Id,
+                            modelo as Model,
+                            placa as LicensePlate,
+                            status as Status,
+                            bateria as BatteryLevel,
+                            localizacao_x as LocationX,
+                            localizacao_y as LocationY,
+                            zona as Zone,
+                            endereco as Address,
+                            setor as Sector,
+                            andar as Floor,
+                            vaga as ParkingSpot,
+                            descricao_localizacao as LocationDescription,
+                            ultima_atualizacao as LastUpdate,
+                            em_uso_por as InUseBy
+                        FROM motos_patio 
+                        WHERE placa_normalizada = ?
+                        ORDER BY ultima_atualizacao DESC, id
+                        LIMIT 1
+                    """,
+                        (MotoService.normalize_placa(placa),),
+                    )
 
-                motorcycle = cursor.fetchone()
-                conn.close()
+                    motorcycle = cursor.fetchone()
 
                 if not motorcycle:
                     return jsonify({
@@ -779,28 +791,26 @@ class VisionMotoIntegrationAPI:
                 )
                 end_date = data.get("EndDate", datetime.now().isoformat())
 
-                conn = sqlite3.connect(self.db_path)
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
+                with self.get_db_connection() as conn:
+                    cursor = conn.cursor()
 
-                cursor.execute(
-                    """
-                    SELECT 
-                        h.moto_id as MotorcycleId,
-                        m.modelo as Model,
-                        COUNT(*) as UsageCount,
-                        AVG(h.tempo_uso) as AverageUsageTime,
-                        SUM(h.distancia_percorrida) as TotalDistance
-                    FROM historico_uso h
-                    JOIN motos_patio m ON h.moto_id = m.id
-                    WHERE h.inicio_uso BETWEEN ? AND ?
-                    GROUP BY h.moto_id, m.modelo
-                """,
-                    (start_date, end_date),
-                )
+                    cursor.execute(
+                        """
+                        SELECT 
+                            h.moto_id as MotorcycleId,
+                            m.modelo as Model,
+                            COUNT(*) as UsageCount,
+                            AVG(h.tempo_uso) as AverageUsageTime,
+                            SUM(h.distancia_percorrida) as TotalDistance
+                        FROM historico_uso h
+                        JOIN motos_patio m ON h.moto_id = m.id
+                        WHERE h.inicio_uso BETWEEN ? AND ?
+                        GROUP BY h.moto_id, m.modelo
+                    """,
+                        (start_date, end_date),
+                    )
 
-                report_data = [dict(row) for row in cursor.fetchall()]
-                conn.close()
+                    report_data = [dict(row) for row in cursor.fetchall()]
 
                 return jsonify(
                     {
@@ -823,10 +833,8 @@ class VisionMotoIntegrationAPI:
                     f"backup_visionmoto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
                 )
 
-                # Copia banco atual
-                import shutil
-
-                shutil.copy2(self.db_path, backup_path)
+                # Backup online do SQLite: consistente mesmo com dados ainda no WAL
+                self.db.backup(backup_path)
 
                 return jsonify(
                     {
@@ -843,53 +851,51 @@ class VisionMotoIntegrationAPI:
         def database_analytics():
             """Retorna analytics do banco de dados"""
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-
-                # Estatísticas gerais
-                stats = {}
-
-                # Contagem de tabelas com validação
-                ALLOWED_TABLES = [
-                    "motos_patio",
-                    "usuarios",
-                    "alertas",
-                    "dispositivos_iot",
-                    "historico_uso",
-                    "detections",
-                ]
-                for table in ALLOWED_TABLES:
-                    # Valida nome da tabela antes de usar em query
-                    if not self._validate_table_name(table):
-                        logger.error(f"Invalid table name attempted: {table}")
-                        continue
-                    
-                    # Agora é seguro usar f-string pois validamos
-                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                    stats[f"{table}_count"] = cursor.fetchone()[0]
+                with self.get_db_connection() as conn:
+                    cursor = conn.cursor()
 
-                # Estatísticas de uso
-                cursor.execute(
+                    # Estatísticas gerais
+                    stats = {}
+
+                    # Contagem de tabelas com validação
+                    ALLOWED_TABLES = [
+                        "motos_patio",
+                        "usuarios",
+                        "alertas",
+                        "dispositivos_iot",
+                        "historico_uso",
+                        "detections",
+                    ]
+                    for table in ALLOWED_TABLES:
+                        # Valida nome da tabela antes de usar em query
+                        if not self._validate_table_name(table):
+                            logger.error(f"Invalid table name attempted: {table}")
+                            continue
+                        
+                        # Agora é seguro usar f-string pois validamos
+                        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                        stats[f"{table}_count"] = cursor.fetchone()[0]
+
+                    # Estatísticas de uso
+                    cursor.execute(
+                        """
+                        SELECT 
+                            COUNT(*) as total_usos,
+                            AVG(tempo_uso) as tempo_medio,
+                            SUM(distancia_percorrida) as distancia_total
+                        FROM historico_uso
+                        WHERE inicio_uso >= date('now', '-30 days')
                     """
-                    SELECT 
-                        COUNT(*) as total_usos,
-                        AVG(tempo_uso) as tempo_medio,
-                        SUM(distancia_percorrida) as distancia_total
-                    FROM historico_uso
-                    WHERE inicio_uso >= date('now', '-30 days')
-                """
-                )
-
-                uso_stats = cursor.fetchone()
-                stats.update(
-                    {
-                        "usos_ultimo_mes": uso_stats[0],
-                        "tempo_medio_uso": uso_stats[1] or 0,
-                        "distancia_total_mes": uso_stats[2] or 0,
-                    }
-                )
+                    )
 
-                conn.close()
+                    uso_stats = cursor.fetchone()
+                    stats.update(
+                        {
+                            "usos_ultimo_mes": uso_stats[0],
+                            "tempo_medio_uso": uso_stats[1] or 0,
+                            "distancia_total_mes": uso_stats[2] or 0,
+                        }
+                    )
 
                 return jsonify(
                     {
@@ -912,57 +918,31 @@ class VisionMotoIntegrationAPI:
                 if not idem:
                     return jsonify({"error": "Idempotency-Key obrigatório"}), 400
 
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-
-                # Idempotência: já existe?
-                cursor.execute(
-                    "SELECT alert_id FROM iot_eventos WHERE idempotency_key = ?",
-                    (idem,),
-                )
-                row = cursor.fetchone()
-                if row:
-                    alert_id = row[0]
-                    conn.close()
-                    return (
-                        jsonify({"alertId": alert_id, "status": "OPEN", "idempotent": True}),
-                        200,
-                    )
-
-                # Cria alerta
-                alert_id = f"ALR-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
-                titulo = "Moto fora da vaga" if data.get("type") else "Alerta IoT"
-                descricao = (
-                    f"Dispositivo {data.get('deviceId','desconhecido')} detectou irregularidade"
-                )
-
-                cursor.execute(
-                    """
-                    INSERT INTO alertas (id, tipo, severidade, titulo, descricao, moto_id, zona, ativo, criado_em)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
-                    """,
-                    (
-                        alert_id,
-                        data.get("type", "iot"),
-                        "HIGH" if data.get("type") else "info",
-                        titulo,
-                        descricao,
-                        None,
-                        (data.get("metadata") or {}).get("slot"),
-                        datetime.now().isoformat(),
-                    ),
-                )
-
-                # Registra idempotência
-                cursor.execute(
-                    "INSERT INTO iot_eventos (idempotency_key, alert_id, created_at) VALUES (?, ?, ?)",
-                    (idem, alert_id, datetime.now().isoformat()),
-                )
-
-                conn.commit()
-                conn.close()
+                result = self.iot_service.process_event(idem, data)
+                return jsonify(result), 200 if result["idempotent"] else 201
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            except Exception as e:
+                return jsonify({"error": str(e)}), 500
 
-                return jsonify({"alertId": alert_id, "status": "OPEN"}), 201
+        @self.app.route("/api/iot/eventos:batch", methods=["POST"])
+        def iot_eventos_batch():
+            """Recebe um lote de eventos IoT com idempotência por evento"""
+            try:
+                data = request.get_json(silent=True)
+                events = data.get("events") if isinstance(data, dict) else data
+                if not isinstance(events, list) or not events:
+                    return jsonify({"error": "Lista de eventos obrigatória"}), 400
+                if len(events) > MAX_EVENT_BATCH_SIZE:
+                    return jsonify({"error": f"Máximo de {MAX_EVENT_BATCH_SIZE} eventos por lote"}), 413
+
+                results = self.iot_service.process_events_batch(events)
+                return jsonify({
+                    "results": results,
+                    "created": len([r for r in results if r.get("idempotent") is False]),
+                    "idempotent": len([r for r in results if r.get("idempotent")]),
+                    "failed": len([r for r in results if "error" in r]),
+                })
             except Exception as e:
                 return jsonify({"error": str(e)}), 500
 
@@ -970,13 +950,11 @@ class VisionMotoIntegrationAPI:
         def iot_devices():
             """Lista dispositivos IoT"""
             try:
-                conn = sqlite3.connect(self.db_path)
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
+                with self.get_db_connection() as conn:
+                    cursor = conn.cursor()
 
-                cursor.execute("SELECT * FROM dispositivos_iot ORDER BY nome")
-                devices = [dict(row) for row in cursor.fetchall()]
-                conn.close()
+                    cursor.execute("SELECT * FROM dispositivos_iot ORDER BY nome")
+                    devices = [dict(row) for row in cursor.fetchall()]
 
                 return jsonify(
                     {
@@ -989,27 +967,41 @@ class VisionMotoIntegrationAPI:
             except Exception as e:
                 return jsonify({"error": str(e)}), 500
 
+        @self.app.route("/api/iot/devices/data:batch", methods=["POST"])
+        def iot_devices_data_batch():
+            """Recebe leituras de vários dispositivos em uma requisição"""
+            try:
+                data = request.get_json(silent=True)
+                items = data.get("readings") if isinstance(data, dict) else data
+                if not isinstance(items, list) or not items:
+                    return jsonify({"error": "Lista de leituras obrigatória"}), 400
+                if len(items) > MAX_TELEMETRY_BATCH_SIZE:
+                    return jsonify({"error": f"Máximo de {MAX_TELEMETRY_BATCH_SIZE} leituras por lote"}), 413
+
+                return jsonify(self.iot_service.ingest_readings(items))
+            except Exception as e:
+                return jsonify({"error": str(e)}), 500
+
         @self.app.route("/api/iot/devices/<device_id>/data", methods=["POST"])
         def iot_device_data(device_id):
             """Recebe dados de dispositivo IoT"""
             try:
                 data = request.get_json()
 
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
+                with self.get_db_connection() as conn:
+                    cursor = conn.cursor()
 
-                # Atualiza dados do dispositivo
-                cursor.execute(
-                    """
-                    UPDATE dispositivos_iot 
-                    SET dados_sensor = ?, ultima_comunicacao = ?, status = 'online'
-                    WHERE id = ?
-                """,
-                    (json.dumps(data), datetime.now().isoformat(), device_id),
-                )
+                    # Atualiza dados do dispositivo
+                    cursor.execute(
+                        """
+                        UPDATE dispositivos_iot 
+                        SET dados_sensor = ?, ultima_comunicacao = ?, status = 'online'
+                        WHERE id = ?
+                    """,
+                        (json.dumps(data), datetime.now().isoformat(), device_id),
+                    )
 
-                conn.commit()
-                conn.close()
+                    conn.commit()
 
                 return jsonify({"success": True, "message": "Dados recebidos"})
 
@@ -1037,29 +1029,23 @@ class VisionMotoIntegrationAPI:
                 if status not in ["OPEN", "RESOLVED", "ALL"]:
                     return jsonify({"error": "Invalid status. Use OPEN, RESOLVED, or ALL"}), 400
 
-                conn = sqlite3.connect(self.db_path)
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
+                status_filter = status if status != "ALL" else None
+                page_cursor = request.args.get("cursor")
 
-                if status == "OPEN":
-                    cursor.execute(
-                        "SELECT * FROM alertas WHERE ativo = 1 ORDER BY criado_em DESC LIMIT ? OFFSET ?",
-                        (limit, offset),
-                    )
-                elif status == "RESOLVED":
-                    cursor.execute(
-                        "SELECT * FROM alertas WHERE ativo = 0 ORDER BY resolvido_em DESC LIMIT ? OFFSET ?",
-                        (limit, offset),
-                    )
+                # Cursor (keyset) por padrão; offset mantido para clientes antigos
+                next_cursor = None
+                if offset and not page_cursor:
+                    rows = self.alert_service.get_alerts(status_filter, limit, offset)
                 else:
-                    cursor.execute(
-                        "SELECT * FROM alertas ORDER BY criado_em DESC LIMIT ? OFFSET ?",
-                        (limit, offset),
-                    )
+                    try:
+                        rows, next_cursor = self.alert_service.get_alerts_page(
+                            status_filter, limit, page_cursor
+                        )
+                    except ValueError:
+                        return jsonify({"error": "Invalid cursor"}), 400
 
                 items = []
-                for row in cursor.fetchall():
-                    d = dict(row)
+                for d in rows:
                     items.append(
                         {
                             "id": d["id"],
@@ -1069,12 +1055,12 @@ class VisionMotoIntegrationAPI:
                             "severity": d.get("severidade", "info").upper(),
                             "deviceId": None,
                             "createdAt": d.get("criado_em"),
+                            "imageUrl": d.get("imagem_url"),
                             "location": {"lat": None, "lng": None},
                         }
                     )
 
-                conn.close()
-                return jsonify({"items": items, "total": len(items)})
+                return jsonify({"items": items, "total": len(items), "next_cursor": next_cursor})
             except Exception as e:
                 return jsonify({"error": str(e)}), 500
 
@@ -1082,20 +1068,18 @@ class VisionMotoIntegrationAPI:
         def mobile_alertas_resolver(alert_id):
             try:
                 data = request.get_json() or {}
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    UPDATE alertas SET ativo = 0, resolvido_em = ?, resolvido_por = ?
-                    WHERE id = ? AND ativo = 1
-                    """,
-                    (datetime.now().isoformat(), data.get("resolvedBy"), alert_id),
-                )
-                if cursor.rowcount == 0:
-                    conn.close()
-                    return jsonify({"error": "Alerta não encontrado ou já resolvido"}), 404
-                conn.commit()
-                conn.close()
+                with self.get_db_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        """
+                        UPDATE alertas SET ativo = 0, resolvido_em = ?, resolvido_por = ?
+                        WHERE id = ? AND ativo = 1
+                        """,
+                        (datetime.now().isoformat(), data.get("resolvedBy"), alert_id),
+                    )
+                    if cursor.rowcount == 0:
+                        return jsonify({"error": "Alerta não encontrado ou já resolvido"}), 404
+                    conn.commit()
                 return jsonify({"id": alert_id, "status": "RESOLVED", "updatedAt": datetime.now().isoformat()})
             except Exception as e:
                 return jsonify({"error": str(e)}), 500
@@ -1107,28 +1091,38 @@ class VisionMotoIntegrationAPI:
                 token = data.get("token")
                 if not token:
                     return jsonify({"error": "token obrigatório"}), 400
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO push_devices (token, user_id, platform, created_at, last_seen)
-                    VALUES (?, ?, ?, COALESCE((SELECT created_at FROM push_devices WHERE token = ?), ?), ?)
-                    """,
-                    (
-                        token,
-                        data.get("userId"),
-                        data.get("platform", "android"),
-                        token,
-                        datetime.now().isoformat(),
-                        datetime.now().isoformat(),
-                    ),
-                )
-                conn.commit()
-                conn.close()
+                with self.get_db_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        """
+                        INSERT OR REPLACE INTO push_devices (token, user_id, platform, created_at, last_seen)
+                        VALUES (?, ?, ?, COALESCE((SELECT created_at FROM push_devices WHERE token = ?), ?), ?)
+                        """,
+                        (
+                            token,
+                            data.get("userId"),
+                            data.get("platform", "android"),
+                            token,
+                            datetime.now().isoformat(),
+                            datetime.now().isoformat(),
+                        ),
+                    )
+                    conn.commit()
                 return jsonify({"ok": True})
             except Exception as e:
                 return jsonify({"ok": False, "error": str(e)}), 500
 
+        # Evidências dos alertas (imageUrl dos eventos PARKING_OUT_OF_SPOT)
+        @self.app.route("/api/snapshots/<key>.jpg", methods=["GET"])
+        def get_snapshot(key):
+            return snapshot_response(key)
+
+        # Atualizações ao vivo do dashboard (SSE)
+        @self.app.route("/api/stream/events", methods=["GET"])
+        @self.limiter.exempt
+        def stream_events():
+            return event_stream_response(get_change_feed(self.db_path))
+
         # Dashboard
         @self.app.route("/dashboard")
         def dashboard():
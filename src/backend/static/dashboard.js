@@ -40,9 +40,6 @@ function updateMetrics() {
             avgFps.textContent = data.avg_fps_last_60.toFixed(1);
             detectionRate.textContent = (data.avg_detection_rate || 0).toFixed(2);
             uniqueClasses.textContent = data.unique_classes || 0;
-            
-            // Atualiza métricas IoT apenas se métricas principais funcionaram
-            updateIoTMetrics();
         })
         .catch(error => {
             console.error('Erro detalhado ao buscar métricas:', error.message);
@@ -173,6 +170,68 @@ function loadAlerts() {
         });
 }
 
+// Converte um alerta do stream (colunas de alertas) para o formato do dashboard
+function toDashboardAlert(alerta) {
+    return {
+        id: alerta.id,
+        severity: alerta.severidade,
+        alert_type: alerta.tipo,
+        message: alerta.descricao || alerta.titulo,
+        created_at: alerta.criado_em
+    };
+}
+
+// Converte um dispositivo do stream (colunas de dispositivos_iot)
+function toDashboardDevice(dispositivo) {
+    let dados = {};
+    try {
+        dados = JSON.parse(dispositivo.dados_sensor || '{}') || {};
+    } catch (error) {
+        dados = {};
+    }
+    return {
+        device_id: dispositivo.id,
+        device_type: dispositivo.tipo.startsWith('atuador') ? 'actuator' : 'sensor',
+        status: dispositivo.status === 'online' ? 'active' : dispositivo.status,
+        location: dispositivo.localizacao,
+        battery_level: dados.battery_level ?? 0
+    };
+}
+
+// Aplica os deltas do stream de eventos
+function setupLiveUpdates() {
+    LiveUpdates.shared()
+        .on('alert.created', (alerta) => {
+            alerts.unshift(toDashboardAlert(alerta));
+            if (alerts.length > 10) alerts.pop();
+            displayAlerts();
+        })
+        .on('alert.resolved', (alerta) => {
+            alerts = alerts.filter(a => a.id !== alerta.id);
+            displayAlerts();
+        })
+        .on('device.heartbeat', (dispositivo) => {
+            const device = toDashboardDevice(dispositivo);
+            const index = iotDevicesList.findIndex(d => d.device_id === device.device_id);
+            if (index >= 0) {
+                iotDevicesList[index] = device;
+            } else {
+                iotDevicesList.push(device);
+            }
+            iotDevices.textContent = iotDevicesList.length;
+            displayIoTDevices();
+        })
+        .onResync(() => {
+            loadAlerts();
+            updateIoTMetrics();
+        })
+        .onUnavailable(() => {
+            // Sem stream: polling como antes
+            setInterval(loadAlerts, 5000);
+            setInterval(updateIoTMetrics, 3000);
+        });
+}
+
 // Função para exibir alertas
 function displayAlerts() {
     if (alerts.length === 0) {
@@ -228,10 +287,10 @@ function initializeDashboard() {
     loadAlerts();
     updateIoTMetrics();
     
-    // Atualiza métricas a cada 2 segundos
+    // Métricas de detecção continuam por polling; alertas e dispositivos
+    // chegam como deltas pelo stream de eventos
     setInterval(updateMetrics, 2000);
-    setInterval(loadAlerts, 5000);
-    setInterval(updateIoTMetrics, 3000);
+    setupLiveUpdates();
 }
 
 // Configuração do Socket.IO
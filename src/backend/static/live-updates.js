@@ -0,0 +1,78 @@
+// VisionMoto - Atualizações ao vivo (Server-Sent Events)
+// Uma única conexão por página, compartilhada pelo mapa e pelo dashboard.
+// O servidor envia apenas deltas; após reconexão ou "resync" cada tela
+// recarrega o estado completo uma vez.
+
+class LiveUpdates {
+    static URL = '/api/stream/events';
+    static instance = null;
+
+    static shared() {
+        if (!LiveUpdates.instance) {
+            LiveUpdates.instance = new LiveUpdates(LiveUpdates.URL);
+        }
+        return LiveUpdates.instance;
+    }
+
+    constructor(url) {
+        this.source = null;
+        this.reconnecting = false;
+        this.resyncHandlers = [];
+        this.fallbackHandlers = [];
+
+        if (!window.EventSource) {
+            return;
+        }
+
+        this.source = new EventSource(url);
+
+        this.source.addEventListener('open', () => {
+            // Eventos perdidos enquanto desconectado: recarrega o estado
+            if (this.reconnecting) {
+                this.reconnecting = false;
+                this.resyncHandlers.forEach(handler => handler());
+            }
+        });
+
+        this.source.addEventListener('error', () => {
+            if (this.source.readyState === EventSource.CLOSED) {
+                // Servidor sem suporte a SSE (ex.: 204 em workers síncronos): volta ao polling
+                console.warn('Stream de eventos indisponível, usando polling');
+                this.source = null;
+                this.fallbackHandlers.forEach(handler => handler());
+            } else {
+                // O navegador reconecta sozinho (intervalo "retry" do servidor)
+                this.reconnecting = true;
+            }
+        });
+
+        this.source.addEventListener('resync', () => {
+            this.resyncHandlers.forEach(handler => handler());
+        });
+    }
+
+    get available() {
+        return this.source !== null;
+    }
+
+    on(event, handler) {
+        if (this.source) {
+            this.source.addEventListener(event, (e) => handler(JSON.parse(e.data)));
+        }
+        return this;
+    }
+
+    onResync(handler) {
+        this.resyncHandlers.push(handler);
+        return this;
+    }
+
+    onUnavailable(handler) {
+        if (this.source) {
+            this.fallbackHandlers.push(handler);
+        } else {
+            handler();
+        }
+        return this;
+    }
+}
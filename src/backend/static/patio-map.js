@@ -49,9 +49,14 @@ class PatioMap {
         this.render();
     }
     
+    static FIELDS = 'id,placa,modelo,status,bateria,zona,setor,vaga,localizacao_x,localizacao_y';
+    // Mesmo filtro de /api/mobile/motos (carga inicial)
+    static VISIBLE_STATUS = ['disponivel', 'em_uso'];
+    
     async loadMotos() {
         try {
-            const response = await fetch('/api/mobile/motos');
+            // Apenas os campos usados pelo mapa
+            const response = await fetch(`/api/mobile/motos?fields=${PatioMap.FIELDS}`);
             const data = await response.json();
             this.motos = data.motos || [];
             this.render();
@@ -62,7 +67,37 @@ class PatioMap {
     
     startUpdating() {
         this.loadMotos();
-        setInterval(() => this.loadMotos(), 3000);
+        
+        // Carga inicial completa; depois apenas os deltas do servidor
+        LiveUpdates.shared()
+            .on('moto.updated', (moto) => this.applyMotoUpdate(moto))
+            .on('moto.removed', ({ id }) => {
+                this.motos = this.motos.filter(m => m.id !== id);
+                this.render();
+            })
+            .onResync(() => this.loadMotos())
+            .onUnavailable(() => setInterval(() => this.loadMotos(), 3000));
+    }
+    
+    applyMotoUpdate(moto) {
+        const index = this.motos.findIndex(m => m.id === moto.id);
+        if (!PatioMap.VISIBLE_STATUS.includes(moto.status)) {
+            // Saiu dos status exibidos: remove do mapa
+            if (index >= 0) {
+                this.motos.splice(index, 1);
+                if (this.selectedMoto?.id === moto.id) {
+                    this.selectedMoto = null;
+                }
+                this.render();
+            }
+            return;
+        }
+        if (index >= 0) {
+            this.motos[index] = moto;
+        } else {
+            this.motos.push(moto);
+        }
+        this.render();
     }
     
     render() {
@@ -9,6 +9,8 @@ import secrets
 from typing import Optional
 from pathlib import Path
 
+from src.constants import DEFAULT_LATENCY_BUDGET_MS
+
 
 class Config:
     """Configuração base do sistema"""
@@ -53,7 +55,23 @@ class Config:
     YOLO_CONFIDENCE_THRESHOLD: float = float(
         os.getenv("YOLO_CONFIDENCE_THRESHOLD", "0.5")
     )
+    # Orçamento de latência por frame usado por --model auto
+    YOLO_LATENCY_BUDGET_MS: float = float(os.getenv("YOLO_LATENCY_BUDGET_MS", str(DEFAULT_LATENCY_BUDGET_MS)))
+    MODEL_SELECTION_CACHE_PATH: str = os.getenv(
+        "MODEL_SELECTION_CACHE_PATH",
+        str(BASE_DIR / "data" / "model_selection.json")
+    )
+
+    # Câmeras (vagas e calibração por câmera)
+    CAMERAS_CONFIG_PATH: str = os.getenv(
+        "CAMERAS_CONFIG_PATH",
+        str(BASE_DIR / "config" / "cameras.json")
+    )
     
+    # Evidências (recortes JPEG das detecções que geram alerta)
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", str(BASE_DIR / "data" / "snapshots"))
+    SNAPSHOT_MAX_MB: int = int(os.getenv("SNAPSHOT_MAX_MB", "512"))
+
     # IoT
     MQTT_BROKER: str = os.getenv("MQTT_BROKER", "localhost")
     MQTT_PORT: int = int(os.getenv("MQTT_PORT", "1883"))
@@ -63,6 +81,17 @@ class Config:
     # Performance
     MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", "4"))
     REQUEST_TIMEOUT: int = int(os.getenv("REQUEST_TIMEOUT", "30"))
+    # Modo ASGI: threads por processo para as rotas síncronas (e conexões SQLite)
+    ASGI_THREADS: int = int(os.getenv("ASGI_THREADS", "32"))
+    # Stream SSE pela rota Flask: "auto" só em servidores com threads
+    # (gthread, servidor de desenvolvimento); "on" força; "off" desativa.
+    # Em workers síncronos responde 204 e o dashboard volta ao polling.
+    SSE_MODE: str = os.getenv("SSE_MODE", "auto").lower()
+    
+    # Compressão das respostas /api/* (níveis baixos: prioriza latência)
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "5"))
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "4"))
     
     @classmethod
     def validate(cls) -> bool:
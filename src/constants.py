@@ -23,6 +23,22 @@ JWT_ALGORITHM = "HS256"
 DEFAULT_DB_PATH = "visionmoto_integration.db"
 DB_CONNECTION_TIMEOUT = 30
 
+# SQLite (WAL: leitores não bloqueiam atrás de escritores entre workers)
+SQLITE_JOURNAL_MODE = "WAL"
+SQLITE_SYNCHRONOUS = "NORMAL"
+SQLITE_CACHE_SIZE_KB = 20000
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+SQLITE_WAL_AUTOCHECKPOINT_PAGES = 1000
+SQLITE_JOURNAL_SIZE_LIMIT = 64 * 1024 * 1024
+
+# Exportação em streaming: tabela -> coluna de data usada nos filtros
+EXPORT_TABLES = {
+    "detections": "created_at",
+    "historico_uso": "inicio_uso",
+    "alertas": "criado_em",
+}
+EXPORT_FETCH_SIZE = 1000
+
 # Rate Limiting
 RATE_LIMIT_PER_MINUTE = 60
 RATE_LIMIT_PER_HOUR = 1000
@@ -83,6 +99,25 @@ DEFAULT_CORS_ORIGINS = "http://localhost:3000,http://localhost:8080"
 MAX_RETRY_ATTEMPTS = 3
 RETRY_DELAY_SECONDS = 1
 
+# Ingestão de eventos IoT em lote
+MAX_EVENT_BATCH_SIZE = 500
+# Linhas por INSERT multi-valores (limite de parâmetros do SQLite)
+EVENT_INSERT_CHUNK = 200
+# Leituras de telemetria por requisição em lote
+MAX_TELEMETRY_BATCH_SIZE = 1000
+
+# Eventos de moto fora da vaga gerados pelo detector (um por câmera no intervalo)
+OUT_OF_SPOT_EVENT_COOLDOWN_SECONDS = 30
+# Evidências aguardando codificação JPEG; acima disso novos recortes são descartados
+SNAPSHOT_MAX_PENDING = 8
+
+# Atualizações ao vivo (SSE)
+CHANGE_FEED_POLL_SECONDS = 1.0
+# Eventos pendentes por cliente antes de pedir um resync
+CHANGE_FEED_QUEUE_SIZE = 1000
+SSE_KEEPALIVE_SECONDS = 15
+SSE_RETRY_MS = 3000
+
 # Health Check
 HEALTH_CHECK_INTERVAL_SECONDS = 30
 HEALTH_CHECK_TIMEOUT_SECONDS = 10
@@ -93,6 +128,13 @@ FPS_HISTORY_MAXLEN = 60
 # YOLO Configuration
 DEFAULT_YOLO_MODEL = "yolov8n.pt"
 DEFAULT_CONFIDENCE_THRESHOLD = 0.5
+# IoU do NMS (padrão do ultralytics, explícito para entrar na chave do cache)
+DEFAULT_IOU_THRESHOLD = 0.7
+
+# Seleção automática de modelo (do mais preciso para o mais leve)
+YOLO_MODEL_CANDIDATES = ("yolov8x.pt", "yolov8l.pt", "yolov8m.pt", "yolov8s.pt", "yolov8n.pt")
+YOLO_INPUT_SIZE_CANDIDATES = (640, 480, 320)
+DEFAULT_LATENCY_BUDGET_MS = 100.0
 
 # COCO Classes (Motos e Veículos)
 COCO_CLASS_BICYCLE = 1
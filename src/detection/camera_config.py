@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Configuração por câmera - Calibração e geometria do pátio
+Carrega o arquivo JSON de câmeras (CAMERAS_CONFIG_PATH)
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from src.config import Config
+
+
+def _resolve_path(config_path: Optional[str]) -> str:
+    """Resolve caminho do arquivo de câmeras"""
+    return config_path or os.getenv("CAMERAS_CONFIG_PATH", Config.CAMERAS_CONFIG_PATH)
+
+
+@lru_cache(maxsize=8)
+def _load_file(path: str) -> Dict[str, Any]:
+    """Lê e cacheia o arquivo de configuração (lido uma vez por processo)"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("cameras", {})
+
+
+def load_camera_config(camera_id: str, config_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Retorna a configuração de uma câmera
+
+    Formato esperado do arquivo:
+        {"cameras": {"CAMERA001": {"frame_size": [1280, 720],
+                                   "slots": {"A1-001": [[x, y], ...]}}}}
+
+    Args:
+        camera_id: Identificador da câmera (ex: CAMERA001)
+        config_path: Caminho do arquivo JSON (padrão: CAMERAS_CONFIG_PATH)
+
+    Returns:
+        Dicionário de configuração da câmera
+
+    Raises:
+        KeyError: Se a câmera não estiver configurada
+    """
+    cameras = _load_file(_resolve_path(config_path))
+    if camera_id not in cameras:
+        raise KeyError(f"Câmera não configurada: {camera_id}")
+    return cameras[camera_id]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Orçamento de CPU do processo de inferência
+Número de threads intra-op/inter-op do PyTorch e afinidade de CPU por
+instância, para várias instâncias do detector dividirem o servidor sem
+ociosidade nem disputa por núcleos.
+"""
+
+import logging
+import os
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bibliotecas numéricas que dimensionam o próprio pool de threads pelo ambiente
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def available_cores() -> List[int]:
+    """Núcleos que o processo atual pode usar"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def split_cores(instances: int, cores: Optional[List[int]] = None) -> List[List[int]]:
+    """
+    Divide os núcleos em conjuntos contíguos e disjuntos, um por instância
+
+    Núcleos que sobram na divisão vão para as primeiras instâncias.
+    """
+    cores = cores if cores is not None else available_cores()
+    if instances < 1 or instances > len(cores):
+        raise ValueError(f"Não é possível dividir {len(cores)} núcleos em {instances} instâncias")
+
+    base, extra = divmod(len(cores), instances)
+    sets = []
+    start = 0
+    for i in range(instances):
+        size = base + (1 if i < extra else 0)
+        sets.append(cores[start:start + size])
+        start += size
+    return sets
+
+
+def set_thread_env(threads: Optional[int]):
+    """
+    Limita os pools de threads OpenMP/MKL/OpenBLAS pelo ambiente
+
+    Essas bibliotecas leem as variáveis uma única vez, ao serem carregadas:
+    deve ser chamado antes de importar torch (ex.: no início do processo filho).
+    """
+    if threads:
+        for var in THREAD_ENV_VARS:
+            os.environ[var] = str(threads)
+
+
+def configure_cpu_budget(
+    intra_op_threads: Optional[int] = None,
+    inter_op_threads: Optional[int] = None,
+    cpu_affinity: Optional[Iterable[int]] = None,
+):
+    """
+    Aplica afinidade e número de threads ao processo atual
+
+    Deve ser chamado antes de carregar o modelo. Sem intra_op_threads
+    explícito e com afinidade definida, usa um thread por núcleo atribuído.
+    Com torch já importado, as variáveis de ambiente não têm mais efeito:
+    o pool do PyTorch é ajustado por torch.set_num_threads (ver set_thread_env).
+    """
+    if cpu_affinity is not None:
+        cpu_affinity = sorted(set(cpu_affinity))
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpu_affinity)
+        else:
+            logger.warning("Afinidade de CPU não suportada nesta plataforma")
+        if intra_op_threads is None:
+            intra_op_threads = len(cpu_affinity)
+
+    if not intra_op_threads and not inter_op_threads:
+        return
+
+    import torch
+
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as e:
+            # Só pode ser definido antes do primeiro trabalho paralelo do processo
+            logger.warning(f"Threads inter-op não alteradas: {e}")
+
+    logger.info(
+        f"Orçamento de CPU: intra-op={intra_op_threads}, inter-op={inter_op_threads}, "
+        f"afinidade={cpu_affinity}"
+    )
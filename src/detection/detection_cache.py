@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+DetectionCache - Cache em disco de detecções brutas por frame
+Chave: (hash do conteúdo do vídeo, índice do frame, pesos do modelo e
+parâmetros de inferência que alteram a saída: confiança, IoU, tamanho de
+entrada e classes).
+As detecções ficam em arquivos memory-mapped, sem desserialização por frame.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Linha bruta: x1, y1, x2, y2, confiança, classe
+RAW_COLUMNS = 6
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_content_hash(path: str, cache_dir: str) -> str:
+    """
+    SHA-256 do conteúdo de um arquivo (vídeo ou pesos do modelo)
+
+    O hash é memorizado em cache_dir/hashes.json por (caminho, tamanho, mtime)
+    para não reler arquivos grandes a cada execução.
+    """
+    stat = os.stat(path)
+    memo_path = Path(cache_dir) / "hashes.json"
+    memo_key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    memo = {}
+    if memo_path.exists():
+        try:
+            memo = json.loads(memo_path.read_text())
+        except (OSError, ValueError):
+            memo = {}
+    if memo_key in memo:
+        return memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    memo[memo_key] = digest.hexdigest()
+    memo_path.write_text(json.dumps(memo))
+    return memo[memo_key]
+
+
+def model_cache_key(model_id: str, cache_dir: str) -> str:
+    """
+    Identidade dos pesos na chave do cache
+
+    Pesos locais entram pelo hash do conteúdo: um modelo retreinado salvo
+    com o mesmo nome (ex.: best.pt) gera outra chave. Nomes sem arquivo
+    local (pesos oficiais baixados pelo ultralytics) usam o próprio nome.
+    """
+    name = Path(model_id).name.replace(os.sep, "_")
+    if not os.path.isfile(model_id):
+        return name
+    return f"{name}-{file_content_hash(model_id, cache_dir)[:12]}"
+
+
+class DetectionCache:
+    """Cache memory-mapped de detecções de um vídeo para um modelo/limiar"""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        video_path: str,
+        model_id: str,
+        confidence_threshold: float,
+        frame_count: int,
+        input_size: Optional[int] = None,
+        iou_threshold: Optional[float] = None,
+        classes: Optional[Sequence[int]] = None,
+    ):
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        video_hash = file_content_hash(video_path, cache_dir)
+        model_key = model_cache_key(model_id, cache_dir)
+
+        # Qualquer parâmetro que muda as detecções gera outro diretório
+        self.params = {
+            "confidence": round(float(confidence_threshold), 3),
+            "iou": round(float(iou_threshold), 3) if iou_threshold is not None else None,
+            "input_size": int(input_size) if input_size else None,
+            "classes": sorted(int(c) for c in classes) if classes is not None else None,
+        }
+        params_key = hashlib.blake2b(
+            json.dumps(self.params, sort_keys=True).encode(), digest_size=6
+        ).hexdigest()
+
+        self.path = Path(cache_dir) / f"{video_hash[:16]}_{model_key}_{params_key}"
+        self.path.mkdir(exist_ok=True)
+        (self.path / "params.json").write_text(json.dumps(self.params, sort_keys=True))
+        self.hits = 0
+        self.misses = 0
+
+        # Índice: (offset, quantidade) por frame; offset -1 = frame não processado
+        index_path = self.path / "index.npy"
+        if index_path.exists():
+            self.index = np.load(index_path, mmap_mode="r+")
+            if self.index.shape[0] < frame_count:
+                self.index = self._grow_index(index_path, frame_count)
+        else:
+            self.index = np.lib.format.open_memmap(
+                index_path, mode="w+", dtype=np.int64, shape=(max(frame_count, 1), 2)
+            )
+            self.index[:] = -1
+
+        # Dados: linhas float32 anexadas ao final do arquivo
+        self.data_path = self.path / "detections.f32"
+        self.data_path.touch(exist_ok=True)
+        self._rows = self.data_path.stat().st_size // (RAW_COLUMNS * 4)
+        self._data = self._map_data()
+        self._writer = open(self.data_path, "ab")
+
+    def _grow_index(self, index_path: Path, frame_count: int) -> np.ndarray:
+        """Amplia o índice quando o vídeo tem mais frames que o previsto"""
+        old = np.array(self.index)
+        del self.index
+        index = np.lib.format.open_memmap(
+            index_path, mode="w+", dtype=np.int64, shape=(frame_count, 2)
+        )
+        index[:] = -1
+        index[: old.shape[0]] = old
+        return index
+
+    def _map_data(self) -> Optional[np.ndarray]:
+        if self._rows == 0:
+            return None
+        return np.memmap(
+            self.data_path, dtype=np.float32, mode="r", shape=(self._rows, RAW_COLUMNS)
+        )
+
+    def get(self, frame_index: int) -> Optional[np.ndarray]:
+        """Retorna as detecções brutas do frame ou None se não cacheado"""
+        if frame_index >= self.index.shape[0]:
+            self.misses += 1
+            return None
+
+        offset, count = self.index[frame_index]
+        if offset < 0 or offset + count > self._rows:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if count == 0:
+            return np.empty((0, RAW_COLUMNS), dtype=np.float32)
+        if self._data is None or self._data.shape[0] < offset + count:
+            self._data = self._map_data()
+        return self._data[offset:offset + count]
+
+    def put(self, frame_index: int, raw: np.ndarray):
+        """Anexa as detecções brutas do frame ao cache"""
+        rows = np.ascontiguousarray(raw, dtype=np.float32).reshape(-1, RAW_COLUMNS)
+        if frame_index >= self.index.shape[0]:
+            self.index.flush()
+            self.index = self._grow_index(self.path / "index.npy", frame_index * 2)
+
+        self._writer.write(rows.tobytes())
+        self._writer.flush()
+        self.index[frame_index] = (self._rows, rows.shape[0])
+        self._rows += rows.shape[0]
+
+    def close(self):
+        """Persiste o índice e fecha o arquivo de dados"""
+        self._writer.close()
+        self.index.flush()
+
+    def stats(self):
+        return {"cache_hits": self.hits, "cache_misses": self.misses}
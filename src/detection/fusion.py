@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+DetectionFusion - Fusão de detecções de múltiplas câmeras
+Agrupa detecções em coordenadas do pátio (janela de tempo + KD-tree) e emite
+uma única observação por moto, eliminando contagem duplicada entre câmeras.
+Com um detector por processo (launcher), cada detector envia suas detecções
+por uma fila (QueueFusionSink) ao processo de fusão (run_fusion).
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import requests
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND_URL = "http://localhost:5000/detections"
+
+# Campos das detecções usados pela fusão (o resto não atravessa a fila)
+FUSION_FIELDS = ("location_x", "location_y", "confidence", "class", "class_name", "slot")
+
+
+class DetectionFusion:
+    """Fusão espacial de detecções de câmeras sobrepostas"""
+
+    def __init__(self, window_seconds: float = 0.5, merge_radius: float = 1.0):
+        self.window_seconds = window_seconds
+        self.merge_radius = merge_radius
+        self._latest: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.total_submitted = 0
+        # Detecções que entraram em cada chamada de fuse (base do dedup_ratio):
+        # submit conta por frame, fuse vê apenas o frame mais recente de cada câmera
+        self.total_fuse_inputs = 0
+        self.total_fused = 0
+
+    def submit(
+        self,
+        camera_id: str,
+        detections: List[Dict[str, Any]],
+        timestamp: Optional[float] = None,
+    ):
+        """
+        Registra as detecções do frame mais recente de uma câmera
+
+        Apenas detecções com location_x/location_y (homografia calibrada)
+        participam da fusão; o frame anterior da mesma câmera é substituído.
+        """
+        located = [d for d in detections if d.get("location_x") is not None]
+        with self._lock:
+            self._latest[camera_id] = (timestamp or time.time(), located)
+            self.total_submitted += len(located)
+
+    def fuse(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Retorna uma observação fundida por moto na janela de tempo atual"""
+        now = now or time.time()
+        with self._lock:
+            frames = [
+                (camera_id, ts, dets)
+                for camera_id, (ts, dets) in self._latest.items()
+                if now - ts <= self.window_seconds and dets
+            ]
+
+        if not frames:
+            return []
+
+        cameras = [camera_id for camera_id, _, _ in frames]
+        detections = [det for _, _, dets in frames for det in dets]
+        camera_idx = np.repeat(np.arange(len(frames)), [len(dets) for _, _, dets in frames])
+        points = np.array(
+            [(d["location_x"], d["location_y"]) for d in detections], dtype=np.float64
+        )
+        confidences = np.array([d["confidence"] for d in detections], dtype=np.float64)
+
+        labels = self._cluster(points, camera_idx)
+        n_clusters = int(labels.max()) + 1
+
+        # Posição média ponderada pela confiança (vetorizada por cluster)
+        weights = np.bincount(labels, weights=confidences, minlength=n_clusters)
+        xs = np.bincount(labels, weights=points[:, 0] * confidences, minlength=n_clusters) / weights
+        ys = np.bincount(labels, weights=points[:, 1] * confidences, minlength=n_clusters) / weights
+        sizes = np.bincount(labels, minlength=n_clusters)
+
+        fused = []
+        best = {}
+        for i, label in enumerate(labels.tolist()):
+            if label not in best or confidences[i] > confidences[best[label]]:
+                best[label] = i
+
+        for label in range(n_clusters):
+            members = np.flatnonzero(labels == label)
+            top = detections[best[label]]
+            fused.append({
+                "timestamp": now,
+                "location_x": float(xs[label]),
+                "location_y": float(ys[label]),
+                "confidence": float(confidences[members].max()),
+                "class": top.get("class"),
+                "class_name": top.get("class_name"),
+                "slot": top.get("slot"),
+                "cameras": sorted({cameras[c] for c in camera_idx[members].tolist()}),
+                "detections": int(sizes[label]),
+            })
+
+        self.total_fuse_inputs += len(detections)
+        self.total_fused += len(fused)
+        return fused
+
+    def _cluster(self, points: np.ndarray, camera_idx: np.ndarray) -> np.ndarray:
+        """
+        Agrupa pontos próximos de câmeras diferentes
+
+        Pares dentro do raio são unidos do mais próximo ao mais distante,
+        sem nunca juntar duas detecções da mesma câmera (duas motos lado a
+        lado vistas pela mesma câmera continuam separadas).
+        """
+        n = len(points)
+        parent = np.arange(n)
+        camera_sets = [1 << int(c) for c in camera_idx]
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        pairs = cKDTree(points).query_pairs(self.merge_radius, output_type="ndarray")
+        if len(pairs):
+            pairs = pairs[camera_idx[pairs[:, 0]] != camera_idx[pairs[:, 1]]]
+            distances = np.linalg.norm(points[pairs[:, 0]] - points[pairs[:, 1]], axis=1)
+            for a, b in pairs[np.argsort(distances)].tolist():
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b and not camera_sets[root_a] & camera_sets[root_b]:
+                    parent[root_b] = root_a
+                    camera_sets[root_a] |= camera_sets[root_b]
+
+        roots = np.array([find(i) for i in range(n)])
+        _, labels = np.unique(roots, return_inverse=True)
+        return labels
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Métricas de deduplicação"""
+        return {
+            "submitted": self.total_submitted,
+            "fuse_inputs": self.total_fuse_inputs,
+            "fused": self.total_fused,
+            "dedup_ratio": (
+                1 - self.total_fused / self.total_fuse_inputs if self.total_fuse_inputs else 0
+            ),
+        }
+
+
+def publish_observations(observations: List[Dict[str, Any]], backend_url: str):
+    """Envia as observações fundidas ao backend"""
+    for observation in observations:
+        try:
+            requests.post(backend_url, json=observation, timeout=0.1)
+        except requests.exceptions.RequestException:
+            # Backend pode não estar rodando, não é crítico
+            continue
+
+
+class FusionPublisher(threading.Thread):
+    """Publica periodicamente as observações fundidas no backend"""
+
+    def __init__(
+        self,
+        fusion: DetectionFusion,
+        backend_url: str = DEFAULT_BACKEND_URL,
+        interval: Optional[float] = None,
+    ):
+        super().__init__(daemon=True)
+        self.fusion = fusion
+        self.backend_url = backend_url
+        self.interval = interval or fusion.window_seconds
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            publish_observations(self.fusion.fuse(), self.backend_url)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class QueueFusionSink:
+    """
+    Envio das detecções de um detector para o processo de fusão
+
+    Mesma interface submit do DetectionFusion, para ser passado como fusion
+    ao MotoDetector de outro processo (picklable com spawn).
+    """
+
+    def __init__(self, fusion_queue):
+        self.queue = fusion_queue
+
+    def submit(
+        self,
+        camera_id: str,
+        detections: List[Dict[str, Any]],
+        timestamp: Optional[float] = None,
+    ):
+        # Frames sem detecções também seguem: substituem o frame anterior
+        located = [
+            {key: det.get(key) for key in FUSION_FIELDS}
+            for det in detections
+            if det.get("location_x") is not None
+        ]
+        try:
+            self.queue.put_nowait((camera_id, timestamp or time.time(), located))
+        except queue.Full:
+            # Fusão atrasada: o próximo frame da câmera substitui este
+            pass
+
+
+def run_fusion(
+    fusion_queue,
+    backend_url: Optional[str] = DEFAULT_BACKEND_URL,
+    window_seconds: float = 0.5,
+    merge_radius: float = 1.0,
+) -> Dict[str, Any]:
+    """
+    Laço do processo de fusão
+
+    Consome (camera_id, timestamp, detecções) da fila até receber None e
+    publica as observações fundidas a cada janela.
+
+    Args:
+        fusion_queue: Fila alimentada pelos QueueFusionSink dos detectores
+        backend_url: Destino das observações (None = não publica)
+        window_seconds: Janela de tempo da fusão
+        merge_radius: Raio de agrupamento (metros do pátio)
+
+    Returns:
+        Métricas de deduplicação
+    """
+    fusion = DetectionFusion(window_seconds=window_seconds, merge_radius=merge_radius)
+    next_fuse = time.time() + window_seconds
+
+    def fuse_and_publish():
+        observations = fusion.fuse()
+        if backend_url:
+            publish_observations(observations, backend_url)
+
+    while True:
+        try:
+            item = fusion_queue.get(timeout=max(0.0, next_fuse - time.time()))
+        except queue.Empty:
+            item = ()
+        if item is None:
+            break
+        if item:
+            camera_id, timestamp, detections = item
+            fusion.submit(camera_id, detections, timestamp)
+        if time.time() >= next_fuse:
+            fuse_and_publish()
+            next_fuse = time.time() + window_seconds
+
+    # Últimos frames recebidos antes do fim
+    fuse_and_publish()
+    return fusion.get_metrics()
+
+
+def run_fusion_process(fusion_queue, results, **kwargs):
+    """Alvo de multiprocessing: executa run_fusion e devolve as métricas"""
+    results.put(("fusion", run_fusion(fusion_queue, **kwargs)))
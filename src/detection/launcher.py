@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Launcher de instâncias de inferência fixadas em núcleos
+Inicia K detectores em processos separados, cada um com seu próprio conjunto
+de núcleos, e compara layouts (instâncias x threads) pelo throughput total.
+Com --fusion, as câmeras (--camera-ids) enviam as detecções a um processo de
+fusão que deduplica motos vistas por mais de uma câmera.
+"""
+
+import argparse
+import logging
+import multiprocessing as mp
+import queue
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from src.detection.cpu_budget import available_cores, set_thread_env, split_cores
+from src.detection.fusion import DEFAULT_BACKEND_URL, QueueFusionSink, run_fusion_process
+from src.detection.model_selection import resolve_auto_model
+
+logger = logging.getLogger(__name__)
+
+# Frames pendentes na fila da fusão antes de descartar os mais novos
+FUSION_QUEUE_SIZE = 256
+
+# Intervalo para verificar se os processos filhos ainda estão vivos
+RESULT_POLL_SECONDS = 1.0
+
+
+def _run_instance(
+    index: int,
+    source,
+    cores: List[int],
+    detector_kwargs,
+    process_kwargs,
+    results,
+    start_event,
+    camera_id=None,
+    fusion_queue=None,
+):
+    """Processo de uma instância: aplica o orçamento de CPU antes de carregar o modelo"""
+    # Antes de importar torch (via MotoDetector): OpenMP/MKL leem o ambiente ao carregar
+    set_thread_env(detector_kwargs.get("intra_op_threads") or len(cores))
+    from src.detection.moto_detection_enhanced import MotoDetector
+
+    fusion = QueueFusionSink(fusion_queue) if fusion_queue is not None else None
+    detector = MotoDetector(
+        cpu_affinity=cores, camera_id=camera_id, fusion=fusion, **detector_kwargs
+    )
+    # Modelo carregado: o throughput só é medido depois que todas estão prontas
+    results.put(("ready", index))
+    start_event.wait()
+
+    metrics = detector.process_video(video_path=source, display=False, **process_kwargs)
+    results.put(("done", index, cores, metrics or {}, time.time()))
+
+
+def _gather(results, processes, kind: str, pending: Set[int]) -> Dict[int, tuple]:
+    """
+    Recebe uma mensagem `kind` de cada instância pendente
+
+    Instâncias que terminam sem enviá-la (ex.: falha ao carregar o modelo)
+    são removidas de `pending` em vez de bloquear o launcher.
+    """
+    received = {}
+    while pending - received.keys():
+        try:
+            message = results.get(timeout=RESULT_POLL_SECONDS)
+        except queue.Empty:
+            dead = {
+                i for i in pending - received.keys()
+                if processes[i].exitcode is not None
+            }
+            for i in dead:
+                logger.error(f"Instância {i} falhou (exitcode={processes[i].exitcode})")
+            pending -= dead
+            continue
+        if message[0] == kind:
+            received[message[1]] = message[2:]
+    return received
+
+
+def launch_instances(
+    sources: Sequence,
+    instances: int,
+    cores: Optional[List[int]] = None,
+    max_frames: Optional[int] = None,
+    camera_ids: Optional[Sequence[str]] = None,
+    fusion: bool = False,
+    backend_url: str = DEFAULT_BACKEND_URL,
+    **detector_kwargs,
+) -> Dict[str, Any]:
+    """
+    Executa K instâncias do detector, cada uma fixada em núcleos distintos
+
+    O tempo medido começa quando todas as instâncias carregaram o modelo,
+    de modo que o throughput não inclui o carregamento.
+
+    Args:
+        sources: Vídeos/câmeras; distribuídos entre as instâncias em rodízio
+        instances: Número de instâncias
+        cores: Núcleos disponíveis (padrão: todos do processo)
+        max_frames: Limite de frames por instância
+        camera_ids: ID da câmera de cada fonte (vagas e homografia)
+        fusion: Envia as detecções a um processo de fusão multi-câmera
+        backend_url: Destino das observações fundidas
+        detector_kwargs: Argumentos repassados ao MotoDetector
+
+    Returns:
+        Throughput agregado e métricas por instância (e da fusão)
+
+    Raises:
+        RuntimeError: Se todas as instâncias falharem
+    """
+    if camera_ids is not None and len(camera_ids) != len(sources):
+        raise ValueError("camera_ids deve ter um ID por fonte")
+    if fusion and camera_ids is None:
+        raise ValueError("A fusão requer camera_ids (homografia de cada câmera)")
+
+    ctx = mp.get_context("spawn")
+    core_sets = split_cores(instances, cores)
+    # --model auto: calibra uma vez, no orçamento de CPU de uma instância
+    detector_kwargs = resolve_auto_model(detector_kwargs, core_sets[0])
+    results = ctx.Queue()
+    start_event = ctx.Event()
+    process_kwargs = {"max_frames": max_frames}
+
+    fusion_queue = fusion_results = fusion_process = None
+    if fusion:
+        fusion_queue = ctx.Queue(maxsize=FUSION_QUEUE_SIZE)
+        fusion_results = ctx.Queue()
+        fusion_process = ctx.Process(
+            target=run_fusion_process,
+            args=(fusion_queue, fusion_results),
+            kwargs={"backend_url": backend_url},
+            daemon=True,
+        )
+        fusion_process.start()
+
+    processes = [
+        ctx.Process(
+            target=_run_instance,
+            args=(
+                i,
+                sources[i % len(sources)],
+                core_sets[i],
+                detector_kwargs,
+                process_kwargs,
+                results,
+                start_event,
+                camera_ids[i % len(sources)] if camera_ids else None,
+                fusion_queue,
+            ),
+            daemon=True,
+        )
+        for i in range(instances)
+    ]
+    for process in processes:
+        process.start()
+
+    pending = set(range(instances))
+    try:
+        _gather(results, processes, "ready", pending)
+        start = time.time()
+        start_event.set()
+        done = _gather(results, processes, "done", pending)
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    if not done:
+        if fusion_process is not None:
+            fusion_process.terminate()
+        raise RuntimeError("Todas as instâncias do detector falharam")
+
+    per_instance = [
+        {
+            "instance": index,
+            "cores": instance_cores,
+            "frames_processed": metrics.get("frames_processed", 0),
+            "avg_fps": metrics.get("avg_fps", 0),
+        }
+        for index, (instance_cores, metrics, _) in done.items()
+    ]
+    elapsed = max(finished_at for _, _, finished_at in done.values()) - start
+    total_frames = sum(item["frames_processed"] for item in per_instance)
+    summary = {
+        "instances": instances,
+        "instances_failed": instances - len(done),
+        "threads_per_instance": len(core_sets[0]),
+        "total_frames": total_frames,
+        "elapsed_time": elapsed,
+        "throughput_fps": total_frames / elapsed if elapsed > 0 else 0,
+        "per_instance": sorted(per_instance, key=lambda item: item["instance"]),
+        "model_selection": detector_kwargs.get("model_selection"),
+    }
+
+    if fusion_process is not None:
+        # Sentinela: todos os detectores terminaram
+        fusion_queue.put(None)
+        while True:
+            try:
+                _, summary["fusion"] = fusion_results.get(timeout=RESULT_POLL_SECONDS)
+                break
+            except queue.Empty:
+                if fusion_process.exitcode is not None:
+                    logger.error(f"Processo de fusão falhou (exitcode={fusion_process.exitcode})")
+                    break
+        fusion_process.join(timeout=5)
+
+    return summary
+
+
+def benchmark_layouts(
+    source,
+    layouts: Optional[Sequence[int]] = None,
+    max_frames: int = 200,
+    **detector_kwargs,
+) -> List[Dict[str, Any]]:
+    """
+    Compara layouts de instâncias sobre o mesmo vídeo
+
+    Por padrão testa 1, 2, 4, ... instâncias até o número de núcleos.
+    Retorna os resultados ordenados do maior para o menor throughput.
+    """
+    n_cores = len(available_cores())
+    if layouts is None:
+        layouts = []
+        instances = 1
+        while instances <= n_cores:
+            layouts.append(instances)
+            instances *= 2
+
+    results = []
+    for instances in layouts:
+        logger.info(f"Benchmark: {instances} instância(s)")
+        results.append(
+            launch_instances([source], instances, max_frames=max_frames, **detector_kwargs)
+        )
+
+    return sorted(results, key=lambda item: item["throughput_fps"], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Executa instâncias do detector fixadas em núcleos de CPU"
+    )
+    parser.add_argument(
+        "--video",
+        nargs="+",
+        default=["assets/sample_video.mp4"],
+        help="Vídeos/câmeras (distribuídos entre as instâncias)",
+    )
+    parser.add_argument("--instances", type=int, default=1, help="Número de instâncias")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Compara layouts de instâncias e informa o melhor",
+    )
+    parser.add_argument(
+        "--layouts",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Números de instâncias a comparar no benchmark (padrão: 1, 2, 4, ...)",
+    )
+    parser.add_argument(
+        "--max-frames", type=int, default=None, help="Frames por instância (benchmark: 200)"
+    )
+    parser.add_argument("--model", default="yolov8n.pt", help="Caminho para o modelo YOLOv8")
+    parser.add_argument("--confidence", type=float, default=0.5, help="Limiar de confiança")
+    parser.add_argument(
+        "--inter-op-threads", type=int, default=1, help="Threads inter-op por instância"
+    )
+    parser.add_argument(
+        "--camera-ids",
+        nargs="+",
+        default=None,
+        help="ID da câmera de cada --video (vagas e homografia de CAMERAS_CONFIG_PATH)",
+    )
+    parser.add_argument(
+        "--fusion",
+        action="store_true",
+        help="Funde as detecções das câmeras em um processo dedicado (requer --camera-ids)",
+    )
+    parser.add_argument(
+        "--backend-url",
+        default=DEFAULT_BACKEND_URL,
+        help="Destino das observações fundidas",
+    )
+
+    args = parser.parse_args()
+    sources = [int(v) if v.isdigit() else v for v in args.video]
+    if args.camera_ids and len(args.camera_ids) != len(sources):
+        parser.error("--camera-ids deve ter um ID por --video")
+    if args.fusion and not args.camera_ids:
+        parser.error("--fusion requer --camera-ids")
+    detector_kwargs = {
+        "model_path": args.model,
+        "confidence_threshold": args.confidence,
+        "inter_op_threads": args.inter_op_threads,
+    }
+
+    if args.benchmark:
+        results = benchmark_layouts(
+            sources[0], args.layouts, max_frames=args.max_frames or 200, **detector_kwargs
+        )
+        print("\n=== BENCHMARK DE LAYOUTS ===")
+        for result in results:
+            print(
+                f"{result['instances']:>3} instância(s) x {result['threads_per_instance']:>2} "
+                f"thread(s): {result['throughput_fps']:.2f} FPS"
+            )
+        best = results[0]
+        print(
+            f"Melhor layout: {best['instances']} instância(s) x "
+            f"{best['threads_per_instance']} thread(s)"
+        )
+        return
+
+    summary = launch_instances(
+        sources,
+        args.instances,
+        max_frames=args.max_frames,
+        camera_ids=args.camera_ids,
+        fusion=args.fusion,
+        backend_url=args.backend_url,
+        **detector_kwargs,
+    )
+    print(
+        f"{summary['instances']} instância(s): {summary['total_frames']} frames, "
+        f"{summary['throughput_fps']:.2f} FPS agregados"
+    )
+    if "fusion" in summary:
+        fusion = summary["fusion"]
+        print(
+            f"Fusão: {fusion['submitted']} detecções -> {fusion['fused']} observações "
+            f"(deduplicação {fusion['dedup_ratio']:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+LatestFrameGrabber - Captura ao vivo com latência limitada
+Uma thread drena o buffer da câmera (RTSP/USB) continuamente e mantém apenas
+o frame mais recente; frames não consumidos a tempo são descartados e contados.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LatestFrameGrabber:
+    """Fonte de frames com interface compatível com cv2.VideoCapture"""
+
+    def __init__(self, source, read_timeout: float = 5.0):
+        self.cap = cv2.VideoCapture(source)
+        # Minimiza o buffer interno do backend (nem todos respeitam)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.read_timeout = read_timeout
+
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_seq = 0
+        self._delivered_seq = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        # Liberação delegada à thread quando ela ainda está presa em cap.read()
+        self._thread_done = False
+        self._release_on_exit = False
+
+        # Contadores e timestamp de captura do último frame entregue
+        self.frames_grabbed = 0
+        self.frames_dropped = 0
+        self.frames_delivered = 0
+        self.last_capture_time: Optional[float] = None
+        self._capture_time: Optional[float] = None
+
+    def isOpened(self) -> bool:  # noqa: N802 - compatível com cv2.VideoCapture
+        return self.cap.isOpened()
+
+    def get(self, prop_id: int) -> float:
+        return self.cap.get(prop_id)
+
+    def start(self) -> "LatestFrameGrabber":
+        """Inicia a thread de captura"""
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self._capture_loop()
+        finally:
+            with self._cond:
+                self._thread_done = True
+                release = self._release_on_exit
+            if release:
+                self.cap.release()
+
+    def _capture_loop(self):
+        while self._running:
+            ok, frame = self.cap.read()
+            captured_at = time.time()
+            with self._cond:
+                if not ok:
+                    self._running = False
+                    self._cond.notify_all()
+                    break
+
+                # Frame anterior ainda não consumido: descartado
+                if self._frame_seq > self._delivered_seq:
+                    self.frames_dropped += 1
+
+                self._frame = frame
+                self._capture_time = captured_at
+                self._frame_seq += 1
+                self.frames_grabbed += 1
+                self._cond.notify_all()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Retorna o frame mais recente ainda não entregue (bloqueia até chegar)"""
+        if not self._running and self._thread is None:
+            self.start()
+
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._frame_seq > self._delivered_seq or not self._running,
+                timeout=self.read_timeout,
+            )
+            if self._frame_seq <= self._delivered_seq:
+                return False, None
+
+            self._delivered_seq = self._frame_seq
+            self.frames_delivered += 1
+            self.last_capture_time = self._capture_time
+            return True, self._frame
+
+    def frame_age(self) -> float:
+        """Idade (s) do último frame entregue"""
+        if self.last_capture_time is None:
+            return 0.0
+        return time.time() - self.last_capture_time
+
+    def stats(self):
+        return {
+            "frames_grabbed": self.frames_grabbed,
+            "frames_dropped": self.frames_dropped,
+            "frames_delivered": self.frames_delivered,
+        }
+
+    def release(self):
+        """
+        Para a captura e libera a câmera
+
+        cap.release() concorrente com um cap.read() em andamento não é
+        seguro: se a thread não terminar dentro do timeout (ex.: stream
+        travado), a liberação fica a cargo dela, ao sair do read.
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        with self._cond:
+            self._cond.notify_all()
+            if self._thread is not None and not self._thread_done:
+                self._release_on_exit = True
+                logger.warning("Thread de captura ainda em cap.read(); liberação adiada")
+                return
+        self.cap.release()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Seleção automática do modelo YOLO por orçamento de latência
+Mede variantes do modelo e tamanhos de entrada no host atual e escolhe a
+combinação mais precisa que cabe no orçamento por frame. A escolha fica
+cacheada por impressão digital do host.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing as mp
+import os
+import platform
+import queue
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.config import Config
+from src.constants import YOLO_INPUT_SIZE_CANDIDATES, YOLO_MODEL_CANDIDATES
+from src.detection.cpu_budget import configure_cpu_budget, set_thread_env
+
+logger = logging.getLogger(__name__)
+
+AUTO_MODEL = "auto"
+
+# Intervalo para verificar se o processo de calibração ainda está vivo
+CALIBRATION_POLL_SECONDS = 1.0
+
+
+def host_fingerprint() -> str:
+    """Identifica o hardware/software que influencia a latência de inferência"""
+    parts = [platform.machine(), platform.processor(), platform.python_version()]
+    if hasattr(os, "sched_getaffinity"):
+        parts.append(str(len(os.sched_getaffinity(0))))
+    else:
+        parts.append(str(os.cpu_count()))
+
+    try:
+        import torch
+
+        parts += [torch.__version__, str(torch.get_num_threads())]
+        if torch.cuda.is_available():
+            parts.append(torch.cuda.get_device_name(0))
+    except ImportError:
+        pass
+
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def time_model(model_path: str, input_size: int, warmup: int = 2, runs: int = 5) -> float:
+    """Latência mediana (ms) do modelo em um frame sintético do tamanho de entrada"""
+    from ultralytics import YOLO
+
+    model = YOLO(model_path)
+    frame = np.zeros((input_size, input_size, 3), dtype=np.uint8)
+
+    for _ in range(warmup):
+        model(frame, imgsz=input_size, verbose=False)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model(frame, imgsz=input_size, verbose=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def _load_cache(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def select_model(
+    latency_budget_ms: Optional[float] = None,
+    candidates: Sequence[str] = YOLO_MODEL_CANDIDATES,
+    input_sizes: Sequence[int] = YOLO_INPUT_SIZE_CANDIDATES,
+    cache_path: Optional[str] = None,
+    force: bool = False,
+    timer: Callable[[str, int], float] = time_model,
+) -> Dict[str, Any]:
+    """
+    Escolhe o modelo mais preciso que cabe no orçamento de latência
+
+    Os candidatos são testados do mais preciso para o mais leve; para cada
+    modelo os tamanhos de entrada vão do menor ao maior, parando no primeiro
+    que estoura o orçamento. Vence o primeiro modelo com algum tamanho viável,
+    no maior tamanho viável. Se nada couber, usa o modelo e tamanho mais leves.
+
+    Returns:
+        Dicionário com model, input_size, latency_ms, budget_ms, fits e host
+    """
+    budget = float(latency_budget_ms or Config.YOLO_LATENCY_BUDGET_MS)
+    path = Path(cache_path or os.getenv("MODEL_SELECTION_CACHE_PATH", Config.MODEL_SELECTION_CACHE_PATH))
+    fingerprint = host_fingerprint()
+    cache_key = f"{fingerprint}:{budget:g}:{','.join(candidates)}:{','.join(map(str, input_sizes))}"
+
+    cache = _load_cache(path)
+    if not force and cache_key in cache:
+        logger.info(f"Modelo selecionado (cache): {cache[cache_key]}")
+        return cache[cache_key]
+
+    sizes = sorted(input_sizes)
+    choice = None
+    for model_path in candidates:
+        best = None
+        for size in sizes:
+            latency = timer(model_path, size)
+            logger.info(f"Calibração: {model_path} @ {size}px = {latency:.1f}ms")
+            if latency > budget:
+                break
+            best = (size, latency)
+
+        if best is not None:
+            choice = {"model": model_path, "input_size": best[0], "latency_ms": best[1], "fits": True}
+            break
+
+    if choice is None:
+        choice = {
+            "model": candidates[-1],
+            "input_size": sizes[0],
+            "latency_ms": latency,
+            "fits": False,
+        }
+        logger.warning(f"Nenhum modelo cabe em {budget:g}ms; usando {candidates[-1]} @ {sizes[0]}px")
+
+    choice.update({"budget_ms": budget, "host": fingerprint})
+
+    cache[cache_key] = choice
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Escrita atômica: outro processo nunca lê um JSON pela metade
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(cache, indent=2))
+    os.replace(tmp, path)
+
+    logger.info(f"Modelo selecionado: {choice}")
+    return choice
+
+
+def _calibration_process(
+    results,
+    latency_budget_ms: Optional[float],
+    cores: Optional[List[int]],
+    intra_op_threads: Optional[int],
+    inter_op_threads: Optional[int],
+    selector: Callable[..., Dict[str, Any]],
+):
+    """Calibra com o mesmo orçamento de CPU de um worker de inferência"""
+    set_thread_env(intra_op_threads or (len(cores) if cores else None))
+    configure_cpu_budget(intra_op_threads, inter_op_threads, cores)
+    results.put(selector(latency_budget_ms))
+
+
+def resolve_auto_model(
+    detector_kwargs: Dict[str, Any],
+    cores: Optional[List[int]] = None,
+    selector: Callable[..., Dict[str, Any]] = select_model,
+) -> Dict[str, Any]:
+    """
+    Resolve model_path="auto" uma única vez, antes de iniciar os workers
+
+    A calibração roda em um processo filho com a afinidade (cores) e o
+    número de threads de um worker, pois é nesse orçamento que a
+    inferência vai rodar; o processo pai, sem afinidade e com todas as
+    threads, mediria latências que nenhum worker alcança. Também evita que
+    cada worker calibre ao mesmo tempo, disputando os mesmos núcleos.
+
+    Args:
+        detector_kwargs: Argumentos do MotoDetector
+        cores: Núcleos de um worker (ex.: o primeiro conjunto de split_cores)
+        selector: Função de seleção (padrão: select_model)
+
+    Returns:
+        Cópia de detector_kwargs com o modelo e o tamanho de entrada
+        escolhidos e o registro da seleção em model_selection
+
+    Raises:
+        RuntimeError: Se o processo de calibração falhar
+    """
+    kwargs = dict(detector_kwargs)
+    if kwargs.get("model_path") != AUTO_MODEL:
+        return kwargs
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(
+        target=_calibration_process,
+        args=(
+            results,
+            kwargs.pop("latency_budget_ms", None),
+            cores,
+            kwargs.get("intra_op_threads"),
+            kwargs.get("inter_op_threads"),
+            selector,
+        ),
+        daemon=True,
+    )
+    process.start()
+    try:
+        while True:
+            try:
+                selection = results.get(timeout=CALIBRATION_POLL_SECONDS)
+                break
+            except queue.Empty:
+                if process.exitcode is not None:
+                    raise RuntimeError(
+                        f"Calibração do modelo falhou (exitcode={process.exitcode})"
+                    )
+    finally:
+        process.join(timeout=5)
+
+    kwargs["model_path"] = selection["model"]
+    kwargs["input_size"] = kwargs.get("input_size") or selection["input_size"]
+    kwargs["model_selection"] = selection
+    return kwargs
@@ -1,7 +1,10 @@
 import cv2
+import torch
 from ultralytics import YOLO
 import numpy as np
 import argparse
+import os
+import sys
 import time
 import json
 import requests
@@ -10,6 +13,23 @@ from datetime import datetime
 import threading
 from collections import deque
 
+# Execução direta (python src/detection/moto_detection_enhanced.py): a raiz do
+# repositório precisa estar no path para os imports absolutos de src
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.constants import DEFAULT_IOU_THRESHOLD
+from src.detection.cpu_budget import configure_cpu_budget
+from src.detection.detection_cache import DetectionCache
+from src.detection.live_capture import LatestFrameGrabber
+from src.detection.model_selection import AUTO_MODEL, select_model
+from src.detection.preprocess import Letterbox
+from src.detection.slot_occupancy import SlotOccupancyMap
+from src.detection.video_writer import AsyncVideoWriter
+from src.iot.event_publisher import OutOfSpotReporter
+from src.utils.snapshot_store import SnapshotStore
+from src.detection.yard_mapping import YardHomography
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,11 +39,51 @@ logger = logging.getLogger(__name__)
 
 
 class MotoDetector:
-    def __init__(self, model_path="yolov8n.pt", confidence_threshold=0.5):
+    def __init__(
+        self,
+        model_path="yolov8n.pt",
+        confidence_threshold=0.5,
+        camera_id=None,
+        fusion=None,
+        input_size=None,
+        intra_op_threads=None,
+        inter_op_threads=None,
+        cpu_affinity=None,
+        latency_budget_ms=None,
+        model_selection=None,
+        snapshot_store=None,
+        event_reporter=None,
+    ):
+        # Threads e afinidade precisam ser definidos antes de carregar o modelo
+        configure_cpu_budget(intra_op_threads, inter_op_threads, cpu_affinity)
+
+        # "auto": maior modelo/entrada que cabe no orçamento de latência do host.
+        # Workers recebem a seleção já feita (resolve_auto_model) em model_selection
+        self.model_selection = model_selection
+        if model_path == AUTO_MODEL:
+            self.model_selection = select_model(latency_budget_ms)
+            model_path = self.model_selection["model"]
+            input_size = input_size or self.model_selection["input_size"]
+
         self.model = YOLO(model_path)
+        self.model_id = model_path
         self.confidence_threshold = confidence_threshold
+        self.iou_threshold = DEFAULT_IOU_THRESHOLD
+        # Tamanho fixo de entrada: letterbox/normalização em buffers reutilizados
+        self.input_size = input_size
+        self.letterbox = Letterbox(input_size) if input_size else None
+        self.camera_id = camera_id
+        # Estágio de fusão compartilhado entre câmeras (opcional)
+        self.fusion = fusion
+        # Evidências JPEG das detecções que geram alerta (opcional)
+        self.snapshot_store = snapshot_store
+        # Eventos PARKING_OUT_OF_SPOT com a evidência da detecção (opcional)
+        self.event_reporter = event_reporter
         self.fps_history = deque(maxlen=60)
         self.detection_history = deque(maxlen=100)
+        # Idade do frame (captura -> publicação), em segundos
+        self.latency_history = deque(maxlen=100)
+        self.frames_dropped = 0
         self.total_detections = 0
         self.unique_motos = set()
         self.start_time = time.time()
@@ -36,34 +96,71 @@ class MotoDetector:
             7: "truck",  # caminhão (pode ser confundido)
         }
 
-    def detect_motos(self, frame):
-        """Detecta motos no frame usando YOLOv8"""
-        results = self.model(frame, conf=self.confidence_threshold)
+        # Mapa de vagas da câmera (rasterizado uma única vez)
+        self.slot_map = None
+        self.slot_status = None
+        if camera_id:
+            try:
+                self.slot_map = SlotOccupancyMap.from_config(camera_id)
+            except (OSError, KeyError, ValueError) as e:
+                logger.warning(f"Mapa de vagas indisponível para {camera_id}: {e}")
+
+        # Homografia câmera -> pátio (calculada uma única vez)
+        self.homography = None
+        if camera_id:
+            try:
+                self.homography = YardHomography.from_config(camera_id)
+            except (OSError, KeyError, ValueError) as e:
+                logger.warning(f"Homografia indisponível para {camera_id}: {e}")
+
+    def infer_raw(self, frame):
+        """Executa o YOLOv8 e retorna detecções brutas (N x 6: xyxy, conf, classe)"""
+        if self.letterbox is not None:
+            # Tensor pronto: o YOLO pula o próprio pré-processamento
+            source = torch.from_numpy(self.letterbox(frame))
+        else:
+            source = frame
+
+        results = self.model(source, conf=self.confidence_threshold, iou=self.iou_threshold)
+        raw = [
+            result.boxes.data[:, :6].cpu().numpy()
+            for result in results
+            if result.boxes is not None and len(result.boxes)
+        ]
+        if not raw:
+            return np.empty((0, 6), dtype=np.float32)
+        raw = np.concatenate(raw).astype(np.float32, copy=False)
+
+        if self.letterbox is not None:
+            raw = self.letterbox.unletterbox(raw)
+        return raw
+
+    def detections_from_raw(self, raw):
+        """Converte detecções brutas em dicionários, mantendo motos e similares"""
         detections = []
 
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    cls = int(box.cls.item())
-                    conf = box.conf.item()
-
-                    # Filtra apenas motos e veículos similares
-                    if cls in self.moto_classes:
-                        x1, y1, x2, y2 = box.xyxy[0].tolist()
-                        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-
-                        detection = {
-                            "class": cls,
-                            "class_name": self.moto_classes[cls],
-                            "confidence": conf,
-                            "bbox": [x1, y1, x2, y2],
-                            "area": (x2 - x1) * (y2 - y1),
-                        }
-                        detections.append(detection)
+        for x1, y1, x2, y2, conf, cls in raw.tolist():
+            cls = int(cls)
+
+            # Filtra apenas motos e veículos similares
+            if cls in self.moto_classes:
+                x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+
+                detection = {
+                    "class": cls,
+                    "class_name": self.moto_classes[cls],
+                    "confidence": conf,
+                    "bbox": [x1, y1, x2, y2],
+                    "area": (x2 - x1) * (y2 - y1),
+                }
+                detections.append(detection)
 
         return detections
 
+    def detect_motos(self, frame):
+        """Detecta motos no frame usando YOLOv8"""
+        return self.detections_from_raw(self.infer_raw(frame))
+
     def filter_motos(self, detections):
         """Filtra apenas motos baseado em características específicas"""
         moto_detections = []
@@ -83,6 +180,88 @@ class MotoDetector:
 
         return moto_detections
 
+    def annotate_detections(self, detections, frame_shape):
+        """Atribui vaga e coordenadas do pátio a todas as detecções do frame"""
+        if self.slot_map is None and self.homography is None:
+            return detections
+
+        bboxes = np.array([det["bbox"] for det in detections], dtype=np.float32)
+        frame_size = (frame_shape[1], frame_shape[0])
+
+        if self.slot_map is not None:
+            labels = self.slot_map.lookup(bboxes, frame_size)
+            for det, slot in zip(detections, self.slot_map.codes_for(labels)):
+                det["slot"] = slot
+
+            # Status de todas as vagas da câmera no frame atual
+            self.slot_status = self.slot_map.occupancy_from_labels(labels)
+
+        if self.homography is not None and detections:
+            positions = self.homography.bboxes_to_yard(bboxes, frame_size)
+            for det, (x, y) in zip(detections, positions.tolist()):
+                det["location_x"] = x
+                det["location_y"] = y
+
+        return detections
+
+    def capture_evidence(self, frame, detections):
+        """
+        Agenda recortes de evidência para motos fora de vaga
+
+        Só o hash do recorte é calculado aqui; o JPEG é codificado no pool
+        do SnapshotStore. Com event_reporter, a chave segue no evento que
+        gera o alerta e nada é codificado enquanto a câmera está em
+        cooldown. Requer mapa de vagas da câmera.
+        """
+        if self.snapshot_store is None or self.slot_map is None:
+            return detections
+
+        for det in detections:
+            if det["class"] != 3 or det.get("slot") is not None:
+                continue
+            if self.event_reporter is not None and not self.event_reporter.ready(self.camera_id):
+                break
+            crop = SnapshotStore.crop(frame, det["bbox"])
+            if not crop.size:
+                continue
+            key = self.snapshot_store.submit(crop)
+            if key is None:
+                # Fila de codificação cheia: recorte descartado
+                continue
+            det["snapshot"] = key
+            if self.event_reporter is not None:
+                self.event_reporter.report(self.camera_id, det)
+        return detections
+
+    def draw_detections(self, frame, detections, info_text):
+        """Desenha caixas, rótulos e métricas no frame"""
+        for det in detections:
+            x1, y1, x2, y2 = det["bbox"]
+            conf = det["confidence"]
+            class_name = det["class_name"]
+
+            # Cor baseada na classe
+            color = (0, 255, 0) if det["class"] == 3 else (255, 0, 0)
+
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            label = f"{class_name}: {conf:.2f}"
+            if det.get("slot"):
+                label += f" [{det['slot']}]"
+            cv2.putText(
+                frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2
+            )
+
+        for i, text in enumerate(info_text):
+            cv2.putText(
+                frame,
+                text,
+                (10, 30 + i * 25),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.7,
+                (255, 255, 255),
+                2,
+            )
+
     def calculate_metrics(self):
         """Calcula métricas de performance"""
         elapsed = time.time() - self.start_time
@@ -95,10 +274,31 @@ class MotoDetector:
             "avg_fps": np.mean(list(self.fps_history)) if self.fps_history else 0,
             "elapsed_time": elapsed,
             "detection_rate": self.total_detections / elapsed if elapsed > 0 else 0,
+            "occupied_slots": int(self.slot_status.sum()) if self.slot_status is not None else None,
+            "frame_latency_ms": (
+                float(np.mean(self.latency_history)) * 1000 if self.latency_history else 0
+            ),
+            "frame_latency_p95_ms": (
+                float(np.percentile(self.latency_history, 95)) * 1000
+                if self.latency_history
+                else 0
+            ),
+            "frames_dropped": self.frames_dropped,
+            "model": self.model_id,
+            "input_size": self.input_size,
+            "model_latency_budget_ms": (
+                self.model_selection["budget_ms"] if self.model_selection else None
+            ),
+            "model_selection": self.model_selection,
         }
 
     def send_to_backend(self, detections, frame_num, metrics):
         """Envia dados para o backend com tratamento adequado de erros"""
+        # Com fusão multi-câmera, quem publica é o FusionPublisher
+        if self.fusion is not None:
+            self.fusion.submit(self.camera_id, detections)
+            return
+
         for det in detections:
             try:
                 payload = {
@@ -109,6 +309,10 @@ class MotoDetector:
                     "confidence": det["confidence"],
                     "bbox": det["bbox"],
                     "area": det["area"],
+                    "camera_id": self.camera_id,
+                    "slot": det.get("slot"),
+                    "location_x": det.get("location_x"),
+                    "location_y": det.get("location_y"),
                     "metrics": metrics,
                 }
 
@@ -133,22 +337,55 @@ class MotoDetector:
         max_frames=None,
         display=True,
         backend_url="http://localhost:5000/detections",
+        cache_dir=None,
+        live=False,
+        render_every=1,
+        render_detections_only=False,
+        fourcc="mp4v",
     ):
-        """Processa vídeo com detecção de motos"""
-        cap = cv2.VideoCapture(video_path)
+        """
+        Processa vídeo com detecção de motos
+
+        Em modo live (câmeras RTSP/USB) uma thread drena o buffer da câmera e
+        o loop sempre processa o frame mais recente, descartando os atrasados.
+        O vídeo de saída é desenhado e codificado em uma thread separada, a
+        cada render_every frames ou apenas nos frames com detecções.
+        """
+        cap = LatestFrameGrabber(video_path).start() if live else cv2.VideoCapture(video_path)
 
         if not cap.isOpened():
             print(f"Erro ao abrir vídeo: {video_path}")
             return
 
-        # Configuração do vídeo de saída
+        # Cache de detecções (apenas para arquivos gravados)
+        cache = None
+        if cache_dir and not live and isinstance(video_path, str) and os.path.isfile(video_path):
+            cache = DetectionCache(
+                cache_dir,
+                video_path,
+                self.model_id,
+                self.confidence_threshold,
+                int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+                input_size=self.input_size,
+                iou_threshold=self.iou_threshold,
+            )
+
+        # Configuração do vídeo de saída (encoder assíncrono)
         writer = None
+        render_every = max(1, render_every)
         if output_path:
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            fps = int(cap.get(cv2.CAP_PROP_FPS))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30
             width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+            # Mantém a duração real quando só 1 a cada N frames é gravado
+            out_fps = fps if render_detections_only else fps / render_every
+            writer = AsyncVideoWriter(
+                output_path,
+                out_fps,
+                (width, height),
+                fourcc=fourcc,
+                render=self.draw_detections,
+            )
 
         frame_count = 0
         frame_start_time = time.time()
@@ -161,11 +398,19 @@ class MotoDetector:
             if not ret:
                 break
 
+            captured_at = cap.last_capture_time if live else time.time()
             frame_count += 1
 
-            # Detecção
-            detections = self.detect_motos(frame)
+            # Detecção (reaproveita o cache quando o frame já foi processado)
+            raw = cache.get(frame_count - 1) if cache else None
+            if raw is None:
+                raw = self.infer_raw(frame)
+                if cache:
+                    cache.put(frame_count - 1, raw)
+            detections = self.detections_from_raw(raw)
             moto_detections = self.filter_motos(detections)
+            self.annotate_detections(moto_detections, frame.shape)
+            self.capture_evidence(frame, moto_detections)
 
             # Atualiza métricas
             self.total_detections += len(moto_detections)
@@ -179,23 +424,12 @@ class MotoDetector:
                 self.fps_history.append(current_fps)
             frame_start_time = time.time()
 
-            # Desenha detecções
-            for det in moto_detections:
-                x1, y1, x2, y2 = det["bbox"]
-                conf = det["confidence"]
-                class_name = det["class_name"]
-
-                # Cor baseada na classe
-                color = (0, 255, 0) if det["class"] == 3 else (255, 0, 0)
-
-                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                label = f"{class_name}: {conf:.2f}"
-                cv2.putText(
-                    frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2
-                )
-
-            # Adiciona informações de métricas
+            # Decimação: grava a cada N frames ou apenas frames com detecções
             metrics = self.calculate_metrics()
+            record = writer is not None and (
+                bool(moto_detections) if render_detections_only
+                else (frame_count - 1) % render_every == 0
+            )
             info_text = [
                 f"FPS: {metrics['avg_fps']:.1f}",
                 f"Detecções: {metrics['total_detections']}",
@@ -203,23 +437,19 @@ class MotoDetector:
                 f"Frame: {frame_count}",
             ]
 
-            for i, text in enumerate(info_text):
-                cv2.putText(
-                    frame,
-                    text,
-                    (10, 30 + i * 25),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.7,
-                    (255, 255, 255),
-                    2,
-                )
+            if display:
+                self.draw_detections(frame, moto_detections, info_text)
+                if record:
+                    writer.submit(frame)
+            elif record:
+                # Desenho e codificação ficam na thread do encoder
+                writer.submit(frame, moto_detections, info_text)
 
             # Envia para backend
             self.send_to_backend(moto_detections, frame_count, metrics)
-
-            # Salva frame se solicitado
-            if output_path and writer:
-                writer.write(frame)
+            self.latency_history.append(time.time() - captured_at)
+            if live:
+                self.frames_dropped = cap.frames_dropped
 
             # Exibe frame
             if display:
@@ -237,8 +467,14 @@ class MotoDetector:
 
         # Limpeza
         cap.release()
+        if cache:
+            cache.close()
         if writer:
-            writer.release()
+            writer.close()
+        if self.snapshot_store:
+            self.snapshot_store.close()
+        if self.event_reporter:
+            self.event_reporter.close()
         if display:
             cv2.destroyAllWindows()
 
@@ -248,11 +484,33 @@ class MotoDetector:
         print(f"Frames processados: {frame_count}")
         print(f"Tempo total: {final_metrics['elapsed_time']:.2f}s")
         print(f"FPS médio: {final_metrics['avg_fps']:.2f}")
+        print(f"Modelo: {final_metrics['model']} (entrada: {final_metrics['input_size'] or 'padrão'})")
         print(f"Total de detecções: {final_metrics['total_detections']}")
         print(f"Motos únicas detectadas: {final_metrics['unique_motos']}")
+        print(
+            f"Latência do frame: {final_metrics['frame_latency_ms']:.1f}ms "
+            f"(p95 {final_metrics['frame_latency_p95_ms']:.1f}ms)"
+        )
+        if live:
+            print(f"Frames descartados (atrasados): {final_metrics['frames_dropped']}")
         print(
             f"Taxa de detecção: {final_metrics['detection_rate']:.2f} detecções/segundo"
         )
+        if cache:
+            stats = cache.stats()
+            print(
+                f"Cache de detecções: {stats['cache_hits']} hits, {stats['cache_misses']} misses"
+            )
+
+        if writer:
+            stats = writer.stats()
+            print(
+                f"Vídeo de saída: {stats['frames_written']} frames gravados, "
+                f"{stats['frames_dropped']} descartados pelo encoder"
+            )
+
+        final_metrics["frames_processed"] = frame_count
+        return final_metrics
 
 
 def main():
@@ -262,7 +520,7 @@ def main():
     parser.add_argument(
         "--video",
         default="assets/sample_video.mp4",
-        help="Caminho para o arquivo de vídeo",
+        help="Arquivo de vídeo, URL RTSP ou índice de câmera USB",
     )
     parser.add_argument(
         "--output", help="Arquivo de saída para salvar vídeo processado"
@@ -270,6 +528,22 @@ def main():
     parser.add_argument(
         "--no-display", action="store_true", help="Desabilita a exibição do vídeo"
     )
+    parser.add_argument(
+        "--render-every",
+        type=int,
+        default=1,
+        help="Grava no vídeo de saída apenas 1 a cada N frames",
+    )
+    parser.add_argument(
+        "--render-detections-only",
+        action="store_true",
+        help="Grava no vídeo de saída apenas frames com detecções",
+    )
+    parser.add_argument(
+        "--fourcc",
+        default="mp4v",
+        help="Codec do vídeo de saída (ex: mp4v, avc1, MJPG)",
+    )
     parser.add_argument(
         "--max-frames",
         type=int,
@@ -283,20 +557,123 @@ def main():
         help="Limiar de confiança para detecção",
     )
     parser.add_argument(
-        "--model", default="yolov8n.pt", help="Caminho para o modelo YOLOv8"
+        "--model",
+        default="yolov8n.pt",
+        help="Caminho para o modelo YOLOv8 ou 'auto' (calibra pelo orçamento de latência)",
+    )
+    parser.add_argument(
+        "--latency-budget-ms",
+        type=float,
+        default=None,
+        help="Orçamento de latência por frame para --model auto (padrão: YOLO_LATENCY_BUDGET_MS)",
+    )
+    parser.add_argument(
+        "--camera-id",
+        default=None,
+        help="ID da câmera (carrega vagas e homografia de CAMERAS_CONFIG_PATH)",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Modo câmera ao vivo (RTSP/USB): processa sempre o frame mais recente",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Diretório do cache de detecções para reprocessar vídeos gravados",
+    )
+    parser.add_argument(
+        "--input-size",
+        type=int,
+        default=None,
+        help="Tamanho fixo de entrada do modelo (múltiplo de 32, ex: 640)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Threads intra-op do PyTorch (padrão: um por núcleo da afinidade)",
+    )
+    parser.add_argument(
+        "--inter-op-threads", type=int, default=None, help="Threads inter-op do PyTorch"
+    )
+    parser.add_argument(
+        "--cpu-affinity",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Núcleos de CPU em que o detector pode executar (ex: 0 1 2 3)",
+    )
+    parser.add_argument(
+        "--snapshots",
+        action="store_true",
+        help=(
+            "Grava recortes JPEG das motos fora de vaga em SNAPSHOT_DIR e publica "
+            "o evento PARKING_OUT_OF_SPOT de cada uma (BACKEND_BASE_URL)"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processos de inferência (>1 usa captura separada com memória compartilhada)",
     )
 
     args = parser.parse_args()
 
+    # Câmeras USB são informadas pelo índice (ex: --video 0)
+    video_source = int(args.video) if args.video.isdigit() else args.video
+
+    if args.workers > 1:
+        from src.detection.pipeline import run_pipeline
+
+        summary = run_pipeline(
+            video_source,
+            workers=args.workers,
+            max_frames=args.max_frames,
+            live=args.live,
+            model_path=args.model,
+            confidence_threshold=args.confidence,
+            camera_id=args.camera_id,
+            input_size=args.input_size,
+            intra_op_threads=args.threads,
+            inter_op_threads=args.inter_op_threads,
+            latency_budget_ms=args.latency_budget_ms,
+            snapshots=args.snapshots,
+            cpu_affinity=args.cpu_affinity,
+        )
+        print(
+            f"Pipeline: {summary['frames_processed']} frames em "
+            f"{summary['elapsed_time']:.2f}s ({summary['fps']:.2f} FPS, "
+            f"{summary['workers']} workers, {summary.get('frames_dropped', 0)} descartados)"
+        )
+        return
+
     # Inicializa detector
-    detector = MotoDetector(model_path=args.model, confidence_threshold=args.confidence)
+    detector = MotoDetector(
+        model_path=args.model,
+        confidence_threshold=args.confidence,
+        camera_id=args.camera_id,
+        input_size=args.input_size,
+        intra_op_threads=args.threads,
+        inter_op_threads=args.inter_op_threads,
+        cpu_affinity=args.cpu_affinity,
+        latency_budget_ms=args.latency_budget_ms,
+        snapshot_store=SnapshotStore() if args.snapshots else None,
+        event_reporter=OutOfSpotReporter() if args.snapshots else None,
+    )
 
     # Processa vídeo
     detector.process_video(
-        video_path=args.video,
+        video_path=video_source,
         output_path=args.output,
         max_frames=args.max_frames,
         display=not args.no_display,
+        cache_dir=args.cache_dir,
+        live=args.live,
+        render_every=args.render_every,
+        render_detections_only=args.render_detections_only,
+        fourcc=args.fourcc,
     )
 
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Pipeline multi-processo de detecção
+Um processo de captura decodifica direto nos slots do SharedFrameRing e N
+processos de inferência consomem os frames sem cópia nem pickling.
+"""
+
+import logging
+import multiprocessing as mp
+import queue
+import time
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from src.detection.cpu_budget import set_thread_env, split_cores
+from src.detection.model_selection import resolve_auto_model
+from src.detection.shm_ring import SharedFrameRing
+
+logger = logging.getLogger(__name__)
+
+# Intervalo para verificar se os processos filhos ainda estão vivos
+RESULT_POLL_SECONDS = 1.0
+
+
+def _probe_frame_shape(source):
+    """Descobre a resolução da fonte de vídeo"""
+    cap = cv2.VideoCapture(source)
+    try:
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width and height:
+            return (height, width, 3)
+        ok, frame = cap.read()
+        if not ok:
+            raise RuntimeError(f"Não foi possível ler a fonte de vídeo: {source}")
+        return frame.shape
+    finally:
+        cap.release()
+
+
+def _capture_loop(source, ring: SharedFrameRing, workers: int, max_frames, live: bool, stats):
+    """Processo de captura: decodifica cada frame direto na memória compartilhada"""
+    cap = cv2.VideoCapture(source)
+    frame_index = 0
+    dropped = 0
+
+    try:
+        while not max_frames or frame_index < max_frames:
+            # Arquivo: bloqueia (backpressure). Ao vivo: descarta se todos os slots estão ocupados
+            acquired = ring.acquire(timeout=None if live else 1.0)
+            while acquired is None and not live:
+                acquired = ring.acquire(timeout=1.0)
+
+            if acquired is None:
+                if not cap.grab():
+                    break
+                dropped += 1
+                continue
+
+            slot, view = acquired
+            ok, frame = cap.read(view)
+            if not ok:
+                ring.release(slot)
+                break
+            if not np.shares_memory(frame, view):
+                np.copyto(view, frame)
+
+            ring.publish(slot, frame_index)
+            frame_index += 1
+    finally:
+        cap.release()
+        stats["frames_captured"] = frame_index
+        stats["frames_dropped"] = dropped
+        ring.close_producer(workers)
+        ring.close()
+
+
+def _inference_worker(ring: SharedFrameRing, results, detector_kwargs: Dict[str, Any], snapshots: bool):
+    """Processo de inferência: o detector lê a view do slot diretamente"""
+    cores = detector_kwargs.get("cpu_affinity")
+    # Antes de importar torch (via MotoDetector): OpenMP/MKL leem o ambiente ao carregar
+    set_thread_env(detector_kwargs.get("intra_op_threads") or (len(cores) if cores else None))
+    from src.detection.moto_detection_enhanced import MotoDetector
+    from src.iot.event_publisher import OutOfSpotReporter
+    from src.utils.snapshot_store import SnapshotStore
+
+    detector = MotoDetector(
+        snapshot_store=SnapshotStore() if snapshots else None,
+        event_reporter=OutOfSpotReporter() if snapshots else None,
+        **detector_kwargs,
+    )
+
+    while True:
+        item = ring.get()
+        if item is None:
+            break
+
+        slot, frame, frame_index, captured_at = item
+        try:
+            raw = detector.infer_raw(frame)
+            detections = detector.filter_motos(detector.detections_from_raw(raw))
+            detector.annotate_detections(detections, frame.shape)
+            # Recortes são copiados antes de o slot voltar ao produtor
+            detector.capture_evidence(frame, detections)
+        finally:
+            ring.release(slot)
+
+        detector.send_to_backend(detections, frame_index + 1, {})
+        results.put((frame_index, len(detections), time.time() - captured_at))
+
+    results.put(None)
+    if detector.snapshot_store:
+        detector.snapshot_store.close()
+    if detector.event_reporter:
+        detector.event_reporter.close()
+    ring.close()
+
+
+def run_pipeline(
+    source,
+    workers: int = 2,
+    slots: Optional[int] = None,
+    max_frames: Optional[int] = None,
+    live: bool = False,
+    snapshots: bool = False,
+    cpu_affinity: Optional[List[int]] = None,
+    **detector_kwargs,
+) -> Dict[str, Any]:
+    """
+    Executa captura + N workers de inferência em processos separados
+
+    Args:
+        source: Arquivo de vídeo, URL RTSP ou índice de câmera
+        workers: Número de processos de inferência
+        slots: Slots do anel (padrão: 2 por worker)
+        max_frames: Limite de frames
+        live: Descarta frames quando todos os workers estão ocupados
+        snapshots: Grava evidências das motos fora de vaga e publica o
+            evento PARKING_OUT_OF_SPOT de cada uma
+        cpu_affinity: Núcleos divididos entre os workers (um conjunto por worker)
+        detector_kwargs: Argumentos repassados ao MotoDetector
+
+    Returns:
+        Estatísticas da execução
+
+    Raises:
+        RuntimeError: Se todos os workers de inferência falharem
+    """
+    ctx = mp.get_context("spawn")
+    core_sets = split_cores(workers, cpu_affinity) if cpu_affinity else [None] * workers
+    # --model auto: calibra uma vez, no orçamento de CPU de um worker
+    detector_kwargs = resolve_auto_model(detector_kwargs, core_sets[0])
+    frame_shape = _probe_frame_shape(source)
+    ring = SharedFrameRing(frame_shape, slots=slots or workers * 2, ctx=ctx)
+    results = ctx.Queue()
+    manager = ctx.Manager()
+    capture_stats = manager.dict()
+
+    start = time.time()
+    capture = ctx.Process(
+        target=_capture_loop,
+        args=(source, ring, workers, max_frames, live, capture_stats),
+        daemon=True,
+    )
+    inference = [
+        ctx.Process(
+            target=_inference_worker,
+            args=(ring, results, dict(detector_kwargs, cpu_affinity=cores), snapshots),
+            daemon=True,
+        )
+        for cores in core_sets
+    ]
+    for process in [capture] + inference:
+        process.start()
+
+    processed = 0
+    total_detections = 0
+    latencies = []
+    finished = 0
+    producer_closed = False
+    try:
+        while finished < workers:
+            try:
+                item = results.get(timeout=RESULT_POLL_SECONDS)
+            except queue.Empty:
+                # Captura morta sem sentinelas: libera os workers bloqueados
+                if not producer_closed and capture.exitcode not in (None, 0):
+                    logger.error(f"Processo de captura falhou (exitcode={capture.exitcode})")
+                    ring.close_producer(workers)
+                    producer_closed = True
+                # Worker morto não envia o sentinela: não espera por ele
+                if not any(process.is_alive() for process in inference):
+                    break
+                continue
+            if item is None:
+                finished += 1
+                continue
+            _, count, latency = item
+            processed += 1
+            total_detections += count
+            latencies.append(latency)
+    finally:
+        for process in [capture] + inference:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        summary = dict(capture_stats)
+        manager.shutdown()
+        ring.close()
+
+    failed = [process.exitcode for process in inference if process.exitcode != 0]
+    if failed:
+        logger.error(f"{len(failed)} worker(s) de inferência falharam (exitcodes={failed})")
+        if len(failed) == workers:
+            raise RuntimeError("Todos os workers de inferência falharam")
+
+    elapsed = time.time() - start
+    summary.update({
+        "workers": workers,
+        "workers_failed": len(failed),
+        "frames_processed": processed,
+        "total_detections": total_detections,
+        "elapsed_time": elapsed,
+        "fps": processed / elapsed if elapsed > 0 else 0,
+        "frame_latency_ms": float(np.mean(latencies)) * 1000 if latencies else 0,
+        "model_selection": detector_kwargs.get("model_selection"),
+    })
+    logger.info(f"Pipeline multi-processo finalizado: {summary}")
+    return summary
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Letterbox - Pré-processamento com buffers pré-alocados
+Redimensiona, aplica letterbox e normaliza cada frame em arrays reutilizados;
+os parâmetros de escala são calculados uma única vez por resolução de origem.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+MODEL_STRIDE = 32
+
+
+class Letterbox:
+    """Converte frames BGR em tensores (1, 3, S, S) float32 sem alocação por frame"""
+
+    def __init__(self, input_size: int = 640, pad_value: int = 114):
+        if input_size <= 0 or input_size % MODEL_STRIDE:
+            raise ValueError(f"input_size deve ser múltiplo de {MODEL_STRIDE}: {input_size}")
+
+        self.input_size = input_size
+        self.pad_value = pad_value
+        self.source_shape: Optional[Tuple[int, int]] = None
+
+        # Buffers reutilizados entre frames
+        self._canvas = np.full((input_size, input_size, 3), pad_value, dtype=np.uint8)
+        self.tensor = np.empty((1, 3, input_size, input_size), dtype=np.float32)
+        self._resized: Optional[np.ndarray] = None
+
+    def _configure(self, height: int, width: int):
+        """Calcula escala e padding para a resolução de origem (uma vez)"""
+        size = self.input_size
+        self.scale = min(size / height, size / width)
+        new_w = int(round(width * self.scale))
+        new_h = int(round(height * self.scale))
+        self.pad_x = (size - new_w) // 2
+        self.pad_y = (size - new_h) // 2
+        self.new_size = (new_w, new_h)
+
+        self._canvas[:] = self.pad_value
+        self._resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self._region = self._canvas[self.pad_y:self.pad_y + new_h, self.pad_x:self.pad_x + new_w]
+        self.source_shape = (height, width)
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Pré-processa o frame e retorna o tensor de entrada do modelo
+
+        O array retornado é sempre o mesmo buffer, sobrescrito a cada chamada.
+        """
+        height, width = frame.shape[:2]
+        if self.source_shape != (height, width):
+            self._configure(height, width)
+
+        if self.new_size == (width, height):
+            np.copyto(self._region, frame)
+        else:
+            cv2.resize(frame, self.new_size, dst=self._resized, interpolation=cv2.INTER_LINEAR)
+            np.copyto(self._region, self._resized)
+
+        # BGR HWC uint8 -> RGB CHW float32 [0, 1] direto no buffer de saída
+        np.multiply(
+            self._canvas.transpose(2, 0, 1)[::-1], np.float32(1 / 255), out=self.tensor[0]
+        )
+        return self.tensor
+
+    def unletterbox(self, raw: np.ndarray) -> np.ndarray:
+        """Converte caixas (N x 6: xyxy, conf, classe) para coordenadas do frame original"""
+        if self.source_shape is None or not len(raw):
+            return raw
+
+        height, width = self.source_shape
+        # Views das colunas x (0, 2) e y (1, 3): ajuste feito no próprio array
+        xs, ys = raw[:, 0:4:2], raw[:, 1:4:2]
+        xs -= self.pad_x
+        ys -= self.pad_y
+        raw[:, :4] /= self.scale
+        np.clip(xs, 0, width, out=xs)
+        np.clip(ys, 0, height, out=ys)
+        return raw
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+SharedFrameRing - Transporte de frames sem cópia entre processos
+Anel fixo de slots em multiprocessing.shared_memory com número de sequência
+por slot; apenas (slot, seq, timestamp) trafegam pelas filas de controle.
+"""
+
+import multiprocessing as mp
+import queue
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+HEADER_ALIGN = 64
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Anexa a um bloco existente
+
+    Os processos filhos compartilham o resource_tracker do pai, que remove
+    o bloco uma única vez no unlink() do criador.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrameRing:
+    """
+    Anel de frames em memória compartilhada
+
+    Produtor: acquire() -> escreve no slot (ex: cap.read(view)) -> publish().
+    Consumidor: get() -> processa a view do slot -> release().
+    O objeto é picklable e pode ser passado para multiprocessing.Process.
+    """
+
+    def __init__(
+        self,
+        frame_shape: Tuple[int, ...],
+        slots: int = 8,
+        dtype=np.uint8,
+        ctx=None,
+    ):
+        self.frame_shape = tuple(frame_shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        self.frame_nbytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+
+        ctx = ctx or mp.get_context()
+        self._owner = True
+        self._shm = shared_memory.SharedMemory(create=True, size=self._total_size())
+        self._free = ctx.Queue()
+        self._ready = ctx.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+
+        self._map_views()
+        self._seqs[:] = -1
+        self._next_seq = 0
+
+    def _header_size(self) -> int:
+        size = self.slots * 8
+        return (size + HEADER_ALIGN - 1) // HEADER_ALIGN * HEADER_ALIGN
+
+    def _total_size(self) -> int:
+        return self._header_size() + self.slots * self.frame_nbytes
+
+    def _map_views(self):
+        """Cria as views NumPy sobre o bloco compartilhado (sem cópia)"""
+        self._seqs = np.ndarray((self.slots,), dtype=np.int64, buffer=self._shm.buf)
+        self._frames = np.ndarray(
+            (self.slots,) + self.frame_shape,
+            dtype=self.dtype,
+            buffer=self._shm.buf,
+            offset=self._header_size(),
+        )
+
+    def __getstate__(self):
+        return {
+            "name": self._shm.name,
+            "frame_shape": self.frame_shape,
+            "slots": self.slots,
+            "dtype": self.dtype.str,
+            "frame_nbytes": self.frame_nbytes,
+            "free": self._free,
+            "ready": self._ready,
+        }
+
+    def __setstate__(self, state):
+        self.frame_shape = state["frame_shape"]
+        self.slots = state["slots"]
+        self.dtype = np.dtype(state["dtype"])
+        self.frame_nbytes = state["frame_nbytes"]
+        self._free = state["free"]
+        self._ready = state["ready"]
+        self._owner = False
+        self._next_seq = 0
+        self._shm = _attach_shared_memory(state["name"])
+        self._map_views()
+
+    # ==================== PRODUTOR ====================
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """Reserva um slot livre; None se todos estiverem ocupados no timeout"""
+        try:
+            slot = self._free.get(timeout=timeout) if timeout else self._free.get_nowait()
+        except queue.Empty:
+            return None
+        return slot, self._frames[slot]
+
+    def publish(self, slot: int, frame_index: int, captured_at: Optional[float] = None):
+        """Marca o slot como pronto para os consumidores"""
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seqs[slot] = seq
+        self._ready.put((slot, seq, frame_index, captured_at or time.time()))
+
+    def close_producer(self, consumers: int):
+        """Sinaliza fim do stream para cada consumidor"""
+        for _ in range(consumers):
+            self._ready.put(None)
+
+    # ==================== CONSUMIDOR ====================
+
+    def get(self, timeout: Optional[float] = None):
+        """
+        Retorna (slot, view, frame_index, captured_at) do próximo frame pronto
+
+        Retorna None no fim do stream. A view aponta para a memória
+        compartilhada e só é válida até release(slot).
+        """
+        while True:
+            item = self._ready.get(timeout=timeout)
+            if item is None:
+                return None
+
+            slot, seq, frame_index, captured_at = item
+            # Slot reciclado antes da leitura (não deveria ocorrer): descarta
+            if self._seqs[slot] != seq:
+                continue
+            return slot, self._frames[slot], frame_index, captured_at
+
+    def release(self, slot: int):
+        """Devolve o slot ao produtor"""
+        self._free.put(slot)
+
+    def close(self):
+        """Libera o mapeamento; o processo criador também remove o bloco"""
+        self._seqs = None
+        self._frames = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+SlotOccupancyMap - Ocupação de vagas por câmera
+Polígonos das vagas são rasterizados uma única vez em uma máscara de rótulos;
+a ocupação por frame é um lookup vetorizado dos pontos de apoio das bboxes.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.detection.camera_config import load_camera_config
+
+
+class SlotOccupancyMap:
+    """Mapa de vagas rasterizado (rótulo 0 = fora de vaga)"""
+
+    def __init__(self, slots: Dict[str, Sequence], frame_size: Tuple[int, int]):
+        self.width, self.height = int(frame_size[0]), int(frame_size[1])
+        self.slot_codes: List[str] = list(slots)
+
+        dtype = np.uint16 if len(self.slot_codes) < np.iinfo(np.uint16).max else np.int32
+        self.label_mask = np.zeros((self.height, self.width), dtype=dtype)
+
+        # Rasteriza cada polígono com seu rótulo (vagas sobrepostas: a última prevalece)
+        for label, code in enumerate(self.slot_codes, start=1):
+            polygon = np.asarray(slots[code], dtype=np.int32).reshape(-1, 1, 2)
+            cv2.fillPoly(self.label_mask, [polygon], int(label))
+
+        # Tabela rótulo -> código da vaga (índice 0 = sem vaga)
+        self._codes = np.array([None] + self.slot_codes, dtype=object)
+
+    @classmethod
+    def from_config(cls, camera_id: str, config_path: Optional[str] = None) -> "SlotOccupancyMap":
+        """Cria o mapa a partir do arquivo de configuração de câmeras"""
+        camera = load_camera_config(camera_id, config_path)
+        return cls(camera.get("slots", {}), camera["frame_size"])
+
+    @property
+    def slot_count(self) -> int:
+        return len(self.slot_codes)
+
+    def lookup(
+        self, bboxes: np.ndarray, frame_size: Optional[Tuple[int, int]] = None
+    ) -> np.ndarray:
+        """
+        Retorna o rótulo da vaga de cada bbox (N x 4, xyxy)
+
+        O ponto de apoio é o centro da base da bbox (onde a moto toca o chão).
+        Se o frame tiver resolução diferente da calibração, as coordenadas
+        são reescaladas antes do lookup.
+        """
+        boxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+        if boxes.shape[0] == 0:
+            return np.empty(0, dtype=self.label_mask.dtype)
+
+        xs = (boxes[:, 0] + boxes[:, 2]) * 0.5
+        ys = boxes[:, 3] - 1.0
+        if frame_size and (frame_size[0] != self.width or frame_size[1] != self.height):
+            xs = xs * (self.width / frame_size[0])
+            ys = ys * (self.height / frame_size[1])
+
+        cols = np.clip(xs.astype(np.intp), 0, self.width - 1)
+        rows = np.clip(ys.astype(np.intp), 0, self.height - 1)
+        return self.label_mask[rows, cols]
+
+    def codes_for(self, labels: np.ndarray) -> List[Optional[str]]:
+        """Converte rótulos em códigos de vaga (None = fora de vaga)"""
+        return self._codes[labels].tolist()
+
+    def occupancy_from_labels(self, labels: np.ndarray) -> np.ndarray:
+        """Vetor booleano de ocupação alinhado com slot_codes"""
+        counts = np.bincount(labels.astype(np.intp), minlength=self.slot_count + 1)
+        return counts[1:] > 0
+
+    def assign(
+        self, bboxes: np.ndarray, frame_size: Optional[Tuple[int, int]] = None
+    ) -> List[Optional[str]]:
+        """Retorna o código da vaga (ou None) para cada bbox"""
+        return self.codes_for(self.lookup(bboxes, frame_size))
+
+    def occupancy(
+        self, bboxes: np.ndarray, frame_size: Optional[Tuple[int, int]] = None
+    ) -> Dict[str, bool]:
+        """Retorna ocupação por código de vaga"""
+        occupied = self.occupancy_from_labels(self.lookup(bboxes, frame_size))
+        return dict(zip(self.slot_codes, occupied.tolist()))
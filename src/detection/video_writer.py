@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+AsyncVideoWriter - Gravação do vídeo anotado fora do loop de inferência
+Uma thread desenha e codifica os frames a partir de uma fila limitada; se o
+encoder não acompanhar, frames são descartados e contados em vez de atrasar
+a detecção.
+"""
+
+import logging
+import queue
+import threading
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncVideoWriter:
+    """Encoder de vídeo em background com fila limitada"""
+
+    def __init__(
+        self,
+        output_path: str,
+        fps: float,
+        frame_size: Tuple[int, int],
+        fourcc: str = "mp4v",
+        queue_size: int = 32,
+        render: Optional[Callable] = None,
+    ):
+        self.writer = cv2.VideoWriter(
+            output_path, cv2.VideoWriter_fourcc(*fourcc), fps, frame_size
+        )
+        if not self.writer.isOpened():
+            raise ValueError(f"Não foi possível abrir o encoder '{fourcc}' para {output_path}")
+
+        # render(frame, *args) desenha as anotações na thread do encoder
+        self.render = render
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame: np.ndarray, *render_args) -> bool:
+        """
+        Enfileira o frame para gravação sem bloquear
+
+        O frame passa a pertencer ao encoder: não deve ser alterado depois.
+        Com render_args, as anotações são desenhadas na thread do encoder.
+        """
+        try:
+            self._queue.put_nowait((frame, render_args))
+            return True
+        except queue.Full:
+            self.frames_dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            frame, render_args = item
+            try:
+                if self.render is not None and render_args:
+                    self.render(frame, *render_args)
+                self.writer.write(frame)
+                self.frames_written += 1
+            except cv2.error as e:
+                logger.warning(f"Falha ao gravar frame: {e}")
+
+    def close(self):
+        """Grava os frames pendentes e finaliza o arquivo"""
+        self._queue.put(None)
+        self._thread.join()
+        self.writer.release()
+
+    def stats(self):
+        return {
+            "frames_written": self.frames_written,
+            "frames_dropped": self.frames_dropped,
+        }
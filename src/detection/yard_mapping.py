@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+YardHomography - Mapeamento pixel -> coordenadas do pátio
+A homografia de cada câmera é calculada/carregada uma vez e aplicada a todas
+as detecções do frame com uma única chamada a cv2.perspectiveTransform.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.detection.camera_config import load_camera_config
+
+
+def bbox_footpoints(bboxes: np.ndarray) -> np.ndarray:
+    """Centro da base de cada bbox xyxy (N x 2, float32)"""
+    boxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+    return np.stack(((boxes[:, 0] + boxes[:, 2]) * 0.5, boxes[:, 3]), axis=1)
+
+
+class YardHomography:
+    """Homografia de uma câmera para o plano do pátio (metros)"""
+
+    def __init__(self, matrix: np.ndarray, frame_size: Optional[Tuple[int, int]] = None):
+        self.matrix = np.asarray(matrix, dtype=np.float64).reshape(3, 3)
+        self.frame_size = tuple(frame_size) if frame_size else None
+        self._scaled = {}
+
+    @classmethod
+    def from_points(
+        cls, image_points, yard_points, frame_size: Optional[Tuple[int, int]] = None
+    ) -> "YardHomography":
+        """Calcula a homografia a partir de pontos de calibração (mínimo 4)"""
+        src = np.asarray(image_points, dtype=np.float32).reshape(-1, 2)
+        dst = np.asarray(yard_points, dtype=np.float32).reshape(-1, 2)
+        if len(src) < 4 or len(src) != len(dst):
+            raise ValueError("Calibração requer ao menos 4 pares de pontos")
+
+        matrix, _ = cv2.findHomography(src, dst, method=0 if len(src) == 4 else cv2.RANSAC)
+        if matrix is None:
+            raise ValueError("Pontos de calibração degenerados")
+        return cls(matrix, frame_size)
+
+    @classmethod
+    def from_config(cls, camera_id: str, config_path: Optional[str] = None) -> "YardHomography":
+        """
+        Cria a homografia a partir do arquivo de câmeras
+
+        Aceita "homography" (matriz 3x3 pronta) ou "calibration"
+        ({"image": [[u, v], ...], "yard": [[x, y], ...]}).
+        """
+        camera = load_camera_config(camera_id, config_path)
+        frame_size = camera.get("frame_size")
+
+        if "homography" in camera:
+            return cls(camera["homography"], frame_size)
+        if "calibration" in camera:
+            calibration = camera["calibration"]
+            return cls.from_points(calibration["image"], calibration["yard"], frame_size)
+
+        raise KeyError(f"Câmera sem calibração de homografia: {camera_id}")
+
+    def _matrix_for(self, frame_size: Optional[Tuple[int, int]]) -> np.ndarray:
+        """Matriz ajustada para a resolução do frame (cacheada por resolução)"""
+        if not frame_size or not self.frame_size or tuple(frame_size) == self.frame_size:
+            return self.matrix
+
+        key = tuple(frame_size)
+        if key not in self._scaled:
+            sx = self.frame_size[0] / frame_size[0]
+            sy = self.frame_size[1] / frame_size[1]
+            self._scaled[key] = self.matrix @ np.diag([sx, sy, 1.0])
+        return self._scaled[key]
+
+    def to_yard(
+        self, points: np.ndarray, frame_size: Optional[Tuple[int, int]] = None
+    ) -> np.ndarray:
+        """Converte pontos em pixels (N x 2) para coordenadas do pátio (N x 2)"""
+        pts = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+        if pts.shape[0] == 0:
+            return np.empty((0, 2), dtype=np.float32)
+        return cv2.perspectiveTransform(pts, self._matrix_for(frame_size)).reshape(-1, 2)
+
+    def bboxes_to_yard(
+        self, bboxes: np.ndarray, frame_size: Optional[Tuple[int, int]] = None
+    ) -> np.ndarray:
+        """Posição no pátio do ponto de apoio de cada bbox"""
+        return self.to_yard(bbox_footpoints(bboxes), frame_size)
@@ -3,16 +3,41 @@
 Formatador de respostas para .NET/C#
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
 class DotNetFormatter:
     """Formata respostas para o padrão .NET (PascalCase)"""
     
+    # Campos da listagem (?fields=) -> colunas de motos_patio
+    MOTO_FIELDS = {
+        "Id": "id",
+        "Model": "modelo",
+        "LicensePlate": "placa",
+        "Status": "status",
+        "BatteryLevel": "bateria",
+        "LocationX": "localizacao_x",
+        "LocationY": "localizacao_y",
+        "Zone": "zona",
+        "Address": "endereco",
+        "Sector": "setor",
+        "Floor": "andar",
+        "ParkingSpot": "vaga",
+        "LocationDescription": "descricao_localizacao",
+        "LastUpdate": "ultima_atualizacao",
+        "InUseBy": "em_uso_por",
+    }
+    
     @staticmethod
-    def format_moto(moto: Dict[str, Any]) -> Dict[str, Any]:
-        """Formata dados de moto para .NET"""
+    def format_moto(
+        moto: Dict[str, Any],
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Formata dados de moto para .NET (apenas fields, se informado)"""
+        if fields is not None:
+            return {name: moto.get(DotNetFormatter.MOTO_FIELDS[name]) for name in fields}
+        
         formatted = {
             "Id": moto.get("id"),
             "Model": moto.get("modelo"),
@@ -55,9 +80,12 @@ class DotNetFormatter:
         return formatted
     
     @staticmethod
-    def format_moto_list(motos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def format_moto_list(
+        motos: List[Dict[str, Any]],
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """Formata lista de motos para .NET"""
-        formatted_motos = [DotNetFormatter.format_moto(m) for m in motos]
+        formatted_motos = [DotNetFormatter.format_moto(m, fields) for m in motos]
         
         return {
             "IsSuccess": True,
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Sparse fieldsets - Parâmetro ?fields= das listagens
+Os nomes aceitos são os do formato de cada plataforma; cada formatador
+mapeia seus nomes para as colunas de motos_patio (MOTO_FIELDS).
+"""
+
+from typing import Dict, List, Optional
+
+
+def parse_fields(raw: Optional[str], allowed: Dict[str, str]) -> Optional[List[str]]:
+    """
+    Interpreta ?fields=a,b,c
+
+    Args:
+        raw: Valor do parâmetro (None ou vazio = todos os campos)
+        allowed: Mapa nome de saída -> coluna do formatador
+
+    Returns:
+        Campos pedidos, sem repetição e na ordem informada, ou None
+
+    Raises:
+        ValueError: Se houver campo desconhecido
+    """
+    if not raw:
+        return None
+
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    invalid = [f for f in fields if f not in allowed]
+    if invalid or not fields:
+        raise ValueError(
+            f"Invalid fields: {', '.join(invalid)}. Valid fields: {', '.join(allowed)}"
+        )
+    return fields
+
+
+def columns_for(fields: Optional[List[str]], allowed: Dict[str, str]) -> Optional[List[str]]:
+    """Colunas de motos_patio necessárias para os campos pedidos"""
+    if fields is None:
+        return None
+    return list(dict.fromkeys(allowed[f] for f in fields))
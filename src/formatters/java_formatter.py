@@ -3,16 +3,41 @@
 Formatador de respostas para Java/Spring Boot
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
 class JavaFormatter:
     """Formata respostas para o padrão Java (camelCase)"""
     
+    # Campos da listagem (?fields=) -> colunas de motos_patio
+    MOTO_FIELDS = {
+        "motoId": "id",
+        "modelo": "modelo",
+        "placa": "placa",
+        "status": "status",
+        "nivelBateria": "bateria",
+        "latitude": "localizacao_x",
+        "longitude": "localizacao_y",
+        "zona": "zona",
+        "endereco": "endereco",
+        "setor": "setor",
+        "andar": "andar",
+        "vaga": "vaga",
+        "descricaoLocalizacao": "descricao_localizacao",
+        "ultimaAtualizacao": "ultima_atualizacao",
+        "emUsoPor": "em_uso_por",
+    }
+    
     @staticmethod
-    def format_moto(moto: Dict[str, Any]) -> Dict[str, Any]:
-        """Formata dados de moto para Java"""
+    def format_moto(
+        moto: Dict[str, Any],
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Formata dados de moto para Java (apenas fields, se informado)"""
+        if fields is not None:
+            return {name: moto.get(JavaFormatter.MOTO_FIELDS[name]) for name in fields}
+        
         formatted = {
             "motoId": moto.get("id"),
             "modelo": moto.get("modelo"),
@@ -55,9 +80,12 @@ class JavaFormatter:
         return formatted
     
     @staticmethod
-    def format_moto_list(motos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def format_moto_list(
+        motos: List[Dict[str, Any]],
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """Formata lista de motos para Java"""
-        formatted_motos = [JavaFormatter.format_moto(m) for m in motos]
+        formatted_motos = [JavaFormatter.format_moto(m, fields) for m in motos]
         
         return {
             "success": True,
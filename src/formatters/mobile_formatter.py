@@ -3,13 +3,22 @@
 Formatador de respostas para Mobile App
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
 class MobileFormatter:
     """Formata respostas para o padrão Mobile"""
     
+    # Campos da listagem (?fields=) -> colunas de motos_patio
+    MOTO_FIELDS = {
+        name: name for name in (
+            "id", "modelo", "placa", "status", "bateria", "zona",
+            "endereco", "setor", "andar", "vaga", "descricao_localizacao",
+            "ultima_atualizacao", "localizacao_x", "localizacao_y",
+        )
+    }
+    
     @staticmethod
     def format_moto(moto: Dict[str, Any]) -> Dict[str, Any]:
         """Formata dados de moto para mobile"""
@@ -31,12 +40,19 @@ class MobileFormatter:
         }
     
     @staticmethod
-    def format_moto_list(motos: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Formata lista de motos para mobile"""
+    def format_moto_list(
+        motos: List[Dict[str, Any]],
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Formata lista de motos para mobile (apenas fields, se informado)"""
+        disponiveis = len([m for m in motos if m.get("status") == "disponivel"])
+        if fields is not None:
+            motos = [{name: m.get(name) for name in fields} for m in motos]
+        
         return {
             "motos": motos,
             "total": len(motos),
-            "disponiveis": len([m for m in motos if m.get("status") == "disponivel"]),
+            "disponiveis": disponiveis,
             "timestamp": datetime.now().isoformat()
         }
     
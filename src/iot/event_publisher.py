@@ -10,11 +10,15 @@ import json
 import uuid
 import random
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 import requests
 
+from src.constants import OUT_OF_SPOT_EVENT_COOLDOWN_SECONDS
+from src.utils.snapshot_store import snapshot_url
+
 
 DB_PATH = os.environ.get("IOT_QUEUE_DB", "iot_queue.db")
 
@@ -57,10 +61,18 @@ def _dequeue_batch(limit: int = 10):
     return rows
 
 
-def _delete(id_: str):
+def _delete_many(ids):
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.executemany("DELETE FROM queue WHERE id = ?", [(id_,) for id_ in ids])
+    conn.commit()
+    conn.close()
+
+
+def _bump_attempts_many(ids):
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
-    cur.execute("DELETE FROM queue WHERE id = ?", (id_,))
+    cur.executemany("UPDATE queue SET attempts = attempts + 1 WHERE id = ?", [(id_,) for id_ in ids])
     conn.commit()
     conn.close()
 
@@ -97,32 +109,113 @@ class IoTEventPublisher:
             return False
 
     def flush_queue(self):
+        """Reenvia a fila offline em um único POST /api/iot/eventos:batch"""
         rows = _dequeue_batch(self.batch_size)
         if not rows:
             return 0, 0
-        sent = 0
+        events = []
         for id_, payload_str, attempts in rows:
             payload = json.loads(payload_str)
-            try:
-                res = requests.post(
-                    f"{self.base_url}/api/iot/eventos", headers=self._headers(id_), json=payload, timeout=5
-                )
-                if res.status_code in (200, 201):
-                    _delete(id_)
-                    sent += 1
-                else:
-                    # backoff simples por item (incremento attempts)
-                    self._bump_attempts(id_)
-            except requests.exceptions.RequestException:
-                self._bump_attempts(id_)
-        return sent, len(rows) - sent
-
-    def _bump_attempts(self, id_: str):
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute("UPDATE queue SET attempts = attempts + 1 WHERE id = ?", (id_,))
-        conn.commit()
-        conn.close()
+            # O id do evento é a chave de idempotência no lote
+            payload["id"] = id_
+            events.append(payload)
+
+        batch_id = str(uuid.uuid4())
+        try:
+            res = requests.post(
+                f"{self.base_url}/api/iot/eventos:batch",
+                headers=self._headers(batch_id),
+                json={"events": events},
+                timeout=10,
+            )
+        except requests.exceptions.RequestException:
+            _bump_attempts_many([id_ for id_, _, _ in rows])
+            return 0, len(rows)
+
+        if res.status_code != 200:
+            _bump_attempts_many([id_ for id_, _, _ in rows])
+            return 0, len(rows)
+
+        # Novos e já existentes (idempotentes) saem da fila; inválidos ficam
+        results = res.json().get("results", [])
+        done = {r["id"] for r in results if "alertId" in r}
+        failed = [id_ for id_, _, _ in rows if id_ not in done]
+        _delete_many(done)
+        if failed:
+            _bump_attempts_many(failed)
+        return len(done), len(rows) - len(done)
+
+
+class OutOfSpotReporter:
+    """
+    Publica PARKING_OUT_OF_SPOT com a evidência da própria detecção
+
+    O id do evento deriva da chave do snapshot, então o alerta criado no
+    backend aponta para o recorte daquela moto. No máximo um evento por
+    câmera a cada cooldown; o envio roda em uma thread para não atrasar
+    a inferência.
+    """
+
+    def __init__(
+        self,
+        publisher: Optional[IoTEventPublisher] = None,
+        cooldown_seconds: float = OUT_OF_SPOT_EVENT_COOLDOWN_SECONDS,
+    ):
+        self.publisher = publisher or IoTEventPublisher()
+        self.cooldown_seconds = cooldown_seconds
+        self._last_sent: Dict[Optional[str], float] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def build_event(self, camera_id: Optional[str], detection: Dict[str, Any]) -> Dict:
+        """Evento no formato do publisher para uma detecção com snapshot"""
+        key = detection["snapshot"]
+        return {
+            "id": f"evt-{key}",
+            "deviceId": camera_id or self.publisher.device_id,
+            "type": "PARKING_OUT_OF_SPOT",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "confidence": round(float(detection["confidence"]), 2),
+            "imageUrl": snapshot_url(self.publisher.base_url, key),
+            "metadata": {
+                "snapshot": key,
+                "bbox": detection["bbox"],
+                "location_x": detection.get("location_x"),
+                "location_y": detection.get("location_y"),
+            },
+        }
+
+    def ready(self, camera_id: Optional[str]) -> bool:
+        """
+        Indica se a câmera está fora do cooldown
+
+        O detector consulta antes de codificar a evidência: em cooldown o
+        evento seria descartado e o JPEG só ocuparia espaço no store.
+        """
+        last = self._last_sent.get(camera_id)
+        return last is None or time.monotonic() - last >= self.cooldown_seconds
+
+    def report(self, camera_id: Optional[str], detection: Dict[str, Any]) -> Optional[str]:
+        """
+        Agenda o evento da detecção, respeitando o cooldown da câmera
+
+        Returns:
+            ID do evento agendado ou None (sem snapshot ou em cooldown)
+        """
+        if not detection.get("snapshot") or not self.ready(camera_id):
+            return None
+        self._last_sent[camera_id] = time.monotonic()
+
+        event = self.build_event(camera_id, detection)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event")
+        self._executor.submit(self.publisher.send_event, event, event["id"])
+        return event["id"]
+
+    def close(self, wait: bool = True):
+        """Aguarda os envios pendentes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
 
 
 def simulate_events(count: int = 1, event_type: str = "PARKING_OUT_OF_SPOT"):
@@ -136,7 +229,8 @@ def simulate_events(count: int = 1, event_type: str = "PARKING_OUT_OF_SPOT"):
             "type": event_type,
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "confidence": round(random.uniform(0.7, 0.99), 2),
-            "imageUrl": f"{pub.base_url}/static/{pub.device_id}/frame-{random.randint(1,999)}.jpg",
+            # Evento simulado: não há detecção real, logo nenhuma evidência
+            "imageUrl": None,
             "location": {
                 "lat": float(os.environ.get("SITE_LAT", "-23.56168")),
                 "lng": float(os.environ.get("SITE_LNG", "-46.65614")),
@@ -12,6 +12,8 @@ from typing import Dict, Callable, Optional
 import paho.mqtt.client as mqtt
 import requests
 
+from src.iot.telemetry_batcher import sensor_reading
+
 
 class MQTTIoTClient:
     """Cliente MQTT para comunicação IoT"""
@@ -21,10 +23,13 @@ class MQTTIoTClient:
         broker_host: str = "localhost",
         broker_port: int = 1883,
         api_url: str = "http://localhost:5000",
+        telemetry=None,
     ):
         self.broker_host = broker_host
         self.broker_port = broker_port
         self.api_url = api_url
+        # TelemetryBatcher opcional: leituras vão para o backend em lote
+        self.telemetry = telemetry
         self.client = mqtt.Client()
         self.connected = False
 
@@ -82,6 +87,10 @@ class MQTTIoTClient:
 
     def _process_sensor_data(self, data: Dict):
         """Processa dados de sensor via MQTT"""
+        if self.telemetry is not None:
+            self.telemetry.add(sensor_reading(data))
+            return
+
         try:
             # Envia para API HTTP como backup/integração
             response = requests.post(f"{self.api_url}/iot/sensor", json=data, timeout=2)
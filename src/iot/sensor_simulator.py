@@ -10,7 +10,9 @@ import json
 import threading
 import requests
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from src.iot.telemetry_batcher import TelemetryBatcher, sensor_reading
 
 try:
     from .mqtt_client import MQTTIoTClient
@@ -100,9 +102,19 @@ class IoTActuator:
 class IoTDeviceSimulator:
     """Simulador principal de dispositivos IoT"""
 
-    def __init__(self, api_url: str = "http://localhost:5000", use_mqtt: bool = True):
+    def __init__(
+        self,
+        api_url: str = "http://localhost:5000",
+        use_mqtt: bool = True,
+        telemetry_batch: bool = False,
+        telemetry_url: Optional[str] = None,
+    ):
         self.api_url = api_url
         self.use_mqtt = use_mqtt and MQTT_AVAILABLE
+        # Leituras dos sensores em lote (/api/iot/devices/data:batch). O
+        # api_url aponta para o serviço legado (/iot/sensor): o lote vai para
+        # o backend da API (telemetry_url, padrão BACKEND_BASE_URL)
+        self.telemetry = TelemetryBatcher(telemetry_url) if telemetry_batch else None
         self.sensors: List[MotoSensor] = []
         self.actuators: List[IoTActuator] = []
         self.running = False
@@ -161,6 +173,10 @@ class IoTDeviceSimulator:
         if self.use_mqtt and self.mqtt_client:
             self.mqtt_client.publish_sensor_data(sensor.sensor_id, data)
 
+        if self.telemetry is not None:
+            self.telemetry.add(sensor_reading(data))
+            return
+
         # Sempre envia via HTTP como backup
         try:
             response = requests.post(f"{self.api_url}/iot/sensor", json=data, timeout=2)
@@ -223,6 +239,8 @@ class IoTDeviceSimulator:
         print(f"🌐 Protocolo: {protocol}")
 
         self.running = True
+        if self.telemetry is not None:
+            self.telemetry.start()
 
         # Inicia threads para sensores
         for sensor in self.sensors:
@@ -255,6 +273,9 @@ class IoTDeviceSimulator:
         for thread in self.threads:
             thread.join(timeout=1)
 
+        if self.telemetry is not None:
+            self.telemetry.close()
+
         print("✅ Simulação IoT parada!")
 
     def get_device_status(self) -> Dict:
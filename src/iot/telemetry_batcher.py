@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Telemetry Batcher - Envio de leituras de sensores em lote
+Acumula leituras e as envia em um único POST /api/iot/devices/data:batch a
+cada flush_interval segundos (ou ao atingir max_batch), em vez de uma
+requisição por leitura.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+import requests
+
+
+def sensor_reading(data: Dict) -> Dict:
+    """Converte o payload do simulador/MQTT para o formato DeviceReading"""
+    battery = data.get("battery_level")
+    return {
+        "device_id": data.get("sensor_id") or data.get("device_id"),
+        "temperature": data.get("temperature"),
+        "humidity": data.get("humidity"),
+        "motion_detected": data.get("is_active"),
+        "battery_level": int(round(battery)) if battery is not None else None,
+        "custom_data": {
+            key: data[key]
+            for key in ("moto_id", "location", "timestamp", "vibration", "signal_strength")
+            if key in data
+        },
+    }
+
+
+class TelemetryBatcher:
+    """Buffer de leituras com envio periódico em lote"""
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        max_batch: int = 500,
+        flush_interval: float = 2.0,
+        timeout: float = 5.0,
+    ):
+        # Mesmo backend do IoTEventPublisher (app.py ou integration_api)
+        api_url = api_url or os.environ.get("BACKEND_BASE_URL", "http://localhost:5001")
+        self.url = f"{api_url.rstrip('/')}/api/iot/devices/data:batch"
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.sent = 0
+        self.failed = 0
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Inicia o envio periódico em background"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def add(self, reading: Dict):
+        """Enfileira uma leitura (formato DeviceReading)"""
+        with self._lock:
+            self._buffer.append(reading)
+            full = len(self._buffer) >= self.max_batch
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Envia as leituras acumuladas; retorna quantas foram aceitas"""
+        with self._lock:
+            batch, self._buffer = self._buffer[:self.max_batch], self._buffer[self.max_batch:]
+        if not batch:
+            return 0
+
+        try:
+            res = requests.post(self.url, json={"readings": batch}, timeout=self.timeout)
+            if res.status_code != 200:
+                self.failed += len(batch)
+                return 0
+            accepted = res.json().get("accepted", 0)
+        except requests.exceptions.RequestException:
+            # Telemetria é substituída pela próxima leitura: não reenvia
+            self.failed += len(batch)
+            return 0
+
+        self.sent += accepted
+        self.failed += len(batch) - accepted
+        return accepted
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Para o envio periódico e envia o que restou no buffer"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        # Cada flush retira até max_batch leituras do buffer
+        while self._buffer:
+            self.flush()
+
+    def stats(self) -> Dict:
+        return {"sent": self.sent, "failed": self.failed, "pending": len(self._buffer)}
@@ -4,5 +4,7 @@ from .java_routes import java_bp
 from .dotnet_routes import dotnet_bp
 from .iot_routes import iot_bp
 from .database_routes import database_bp
+from .snapshot_routes import snapshot_bp
+from .stream_routes import stream_bp
 
-__all__ = ["mobile_bp", "java_bp", "dotnet_bp", "iot_bp", "database_bp"]
+__all__ = ["mobile_bp", "java_bp", "dotnet_bp", "iot_bp", "database_bp", "snapshot_bp", "stream_bp"]
@@ -3,11 +3,15 @@
 Rotas Database - Endpoints para operações de banco de dados
 """
 
+import csv
+import io
 import logging
-import sqlite3
-import shutil
 from datetime import datetime
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from src.constants import EXPORT_FETCH_SIZE, EXPORT_TABLES
+from src.utils.db_connection import get_connection_manager
+from src.utils.json_provider import dumps_bytes
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +40,8 @@ def create_backup():
         db_path = get_db_path()
         backup_path = f"backup_visionmoto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         
-        shutil.copy2(db_path, backup_path)
+        # Backup online do SQLite: consistente mesmo com dados ainda no WAL
+        get_connection_manager(db_path).backup(backup_path)
         
         logger.info(f"Database backup created: {backup_path}")
         return jsonify({
@@ -54,48 +59,45 @@ def create_backup():
 def get_analytics():
     """Retorna analytics do banco de dados"""
     try:
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        stats = {}
-        
-        # Contagem de tabelas com validação
-        ALLOWED_TABLES = [
-            "motos_patio", "usuarios", "alertas", "dispositivos_iot",
-            "historico_uso", "detections"
-        ]
-        
-        for table in ALLOWED_TABLES:
-            if not validate_table_name(table):
-                logger.error(f"Invalid table name attempted: {table}")
-                continue
+        db = get_connection_manager(get_db_path())
+        with db.connection() as conn:
+            cursor = conn.cursor()
             
-            # Usa parametrização mesmo com whitelist
-            cursor.execute(f"SELECT COUNT(*) as count FROM {table}")
-            result = cursor.fetchone()
-            stats[f"{table}_count"] = result["count"] if result else 0
-        
-        # Estatísticas de uso
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_usos,
-                AVG(tempo_uso) as tempo_medio,
-                SUM(distancia_percorrida) as distancia_total
-            FROM historico_uso
-            WHERE inicio_uso >= date('now', '-30 days')
-        """)
-        
-        uso_stats = cursor.fetchone()
-        if uso_stats:
-            stats.update({
-                "usos_ultimo_mes": uso_stats["total_usos"] or 0,
-                "tempo_medio_uso": round(uso_stats["tempo_medio"] or 0, 2),
-                "distancia_total_mes": round(uso_stats["distancia_total"] or 0, 2)
-            })
-        
-        conn.close()
+            stats = {}
+            
+            # Contagem de tabelas com validação
+            ALLOWED_TABLES = [
+                "motos_patio", "usuarios", "alertas", "dispositivos_iot",
+                "historico_uso", "detections"
+            ]
+            
+            for table in ALLOWED_TABLES:
+                if not validate_table_name(table):
+                    logger.error(f"Invalid table name attempted: {table}")
+                    continue
+            
+                # Usa parametrização mesmo com whitelist
+                cursor.execute(f"SELECT COUNT(*) as count FROM {table}")
+                result = cursor.fetchone()
+                stats[f"{table}_count"] = result["count"] if result else 0
+            
+            # Estatísticas de uso
+            cursor.execute("""
+                SELECT 
+                    COUNT(*) as total_usos,
+                    AVG(tempo_uso) as tempo_medio,
+                    SUM(distancia_percorrida) as distancia_total
+                FROM historico_uso
+                WHERE inicio_uso >= date('now', '-30 days')
+            """)
+            
+            uso_stats = cursor.fetchone()
+            if uso_stats:
+                stats.update({
+                    "usos_ultimo_mes": uso_stats["total_usos"] or 0,
+                    "tempo_medio_uso": round(uso_stats["tempo_medio"] or 0, 2),
+                    "distancia_total_mes": round(uso_stats["distancia_total"] or 0, 2)
+                })
         
         return jsonify({
             "success": True,
@@ -106,3 +108,78 @@ def get_analytics():
     except Exception as e:
         logger.error(f"Error getting analytics: {e}", exc_info=True)
         return jsonify({"success": False, "error": "Failed to retrieve analytics"}), 500
+
+
+@database_bp.route('/export/<table>', methods=['GET'])
+def export_table(table):
+    """
+    Exporta uma tabela em streaming (NDJSON ou CSV)
+    
+    Query params:
+        format: ndjson (padrão) ou csv
+        since / until: intervalo ISO 8601 sobre a coluna de data da tabela
+    """
+    if table not in EXPORT_TABLES or not validate_table_name(table):
+        return jsonify({
+            "success": False,
+            "error": f"Export available for: {', '.join(EXPORT_TABLES)}"
+        }), 404
+    
+    export_format = request.args.get("format", "ndjson").lower()
+    if export_format not in ("ndjson", "csv"):
+        return jsonify({"success": False, "error": "Invalid format. Use ndjson or csv"}), 400
+    
+    time_column = EXPORT_TABLES[table]
+    conditions, params = [], []
+    for arg, operator in (("since", ">="), ("until", "<")):
+        value = request.args.get(arg)
+        if not value:
+            continue
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            return jsonify({"success": False, "error": f"Invalid {arg} (ISO 8601)"}), 400
+        conditions.append(f"{time_column} {operator} ?")
+        params.append(value)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"SELECT * FROM {table} {where} ORDER BY {time_column}"
+    db = get_connection_manager(get_db_path())
+    
+    def generate():
+        # Conexão própria: o cursor fica aberto entre os yields
+        with db.dedicated_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+                yield buffer.getvalue()
+            
+            while True:
+                rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                if export_format == "csv":
+                    buffer.seek(0)
+                    buffer.truncate()
+                    writer.writerows(rows)
+                    yield buffer.getvalue()
+                else:
+                    yield b"".join(
+                        dumps_bytes(dict(zip(columns, row))) + b"\n" for row in rows
+                    )
+        
+        logger.info(f"Table exported: {table} ({export_format})")
+    
+    mimetype = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    filename = f"{table}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -8,6 +8,9 @@ from flask import Blueprint, request, jsonify
 
 from src.services.moto_service import MotoService
 from src.formatters.dotnet_formatter import DotNetFormatter
+from src.formatters.fields import parse_fields, columns_for
+from src.utils.db_connection import get_connection_manager
+from src.utils.http_cache import conditional_get
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +24,19 @@ def get_moto_service():
 
 
 @dotnet_bp.route('/Dashboard/GetMotorcycleData', methods=['GET'])
+@conditional_get("motos_patio")
 def get_motorcycle_data():
     """Endpoint para integração com .NET (formato C#)"""
     try:
+        try:
+            fields = parse_fields(request.args.get("fields"), DotNetFormatter.MOTO_FIELDS)
+        except ValueError as e:
+            return jsonify(DotNetFormatter.format_error(str(e))), 400
+        
         moto_service = get_moto_service()
-        motos = moto_service.get_all_motos()
+        motos = moto_service.get_all_motos(columns=columns_for(fields, DotNetFormatter.MOTO_FIELDS))
         
-        return jsonify(DotNetFormatter.format_moto_list(motos)), 200
+        return jsonify(DotNetFormatter.format_moto_list(motos, fields)), 200
         
     except Exception as e:
         logger.error(f"Error getting motorcycle data: {e}", exc_info=True)
@@ -55,7 +64,6 @@ def find_by_plate(placa):
 def generate_usage_report():
     """Gera relatório de uso para .NET"""
     try:
-        import sqlite3
         from datetime import datetime, timedelta
         from flask import current_app
         
@@ -63,26 +71,24 @@ def generate_usage_report():
         start_date = data.get("StartDate", (datetime.now() - timedelta(days=7)).isoformat())
         end_date = data.get("EndDate", datetime.now().isoformat())
         
-        db_path = current_app.config.get('DATABASE_PATH')
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                h.moto_id as MotorcycleId,
-                m.modelo as Model,
-                COUNT(*) as UsageCount,
-                AVG(h.tempo_uso) as AverageUsageTime,
-                SUM(h.distancia_percorrida) as TotalDistance
-            FROM historico_uso h
-            JOIN motos_patio m ON h.moto_id = m.id
-            WHERE h.inicio_uso BETWEEN ? AND ?
-            GROUP BY h.moto_id, m.modelo
-        """, (start_date, end_date))
-        
-        report_data = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        db = get_connection_manager(current_app.config.get('DATABASE_PATH'))
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT 
+                    h.moto_id as MotorcycleId,
+                    m.modelo as Model,
+                    COUNT(*) as UsageCount,
+                    AVG(h.tempo_uso) as AverageUsageTime,
+                    SUM(h.distancia_percorrida) as TotalDistance
+                FROM historico_uso h
+                JOIN motos_patio m ON h.moto_id = m.id
+                WHERE h.inicio_uso BETWEEN ? AND ?
+                GROUP BY h.moto_id, m.modelo
+            """, (start_date, end_date))
+            
+            report_data = [dict(row) for row in cursor.fetchall()]
         
         return jsonify({
             "IsSuccess": True,
@@ -4,24 +4,35 @@ Rotas IoT - Endpoints para dispositivos IoT
 """
 
 import logging
-import sqlite3
-import uuid
 import json
 from datetime import datetime
 from flask import Blueprint, request, jsonify
 
+from src.constants import MAX_EVENT_BATCH_SIZE, MAX_TELEMETRY_BATCH_SIZE
+from src.services.iot_service import IoTService
+from src.utils.db_connection import get_connection_manager
+from src.utils.http_cache import conditional_get
+
 logger = logging.getLogger(__name__)
 
 iot_bp = Blueprint('iot', __name__, url_prefix='/api/iot')
 
 
-def get_db_connection():
-    """Helper para obter conexão com banco"""
+def get_db_manager():
+    """Helper para obter o gerenciador de conexões do banco"""
+    from flask import current_app
+    return get_connection_manager(current_app.config.get('DATABASE_PATH', 'visionmoto_integration.db'))
+
+
+def get_iot_service():
+    """Helper para obter o serviço de IoT"""
     from flask import current_app
-    db_path = current_app.config.get('DATABASE_PATH', 'visionmoto_integration.db')
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return IoTService(current_app.config.get('DATABASE_PATH', 'visionmoto_integration.db'))
+
+
+def get_db_connection():
+    """Helper para obter a conexão persistente da thread (context manager)"""
+    return get_db_manager().connection()
 
 
 @iot_bp.route('/eventos', methods=['POST'])
@@ -34,72 +45,56 @@ def criar_evento():
         if not idem:
             return jsonify({"error": "Idempotency-Key obrigatório"}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Idempotência: já existe?
-        cursor.execute(
-            "SELECT alert_id FROM iot_eventos WHERE idempotency_key = ?",
-            (idem,)
-        )
-        row = cursor.fetchone()
-        
-        if row:
-            alert_id = row[0]
-            conn.close()
+        result = get_iot_service().process_event(idem, data)
+        if result["idempotent"]:
             logger.info(f"Idempotent request for event: {idem}")
-            return jsonify({
-                "alertId": alert_id,
-                "status": "OPEN",
-                "idempotent": True
-            }), 200
-        
-        # Cria alerta
-        alert_id = f"ALR-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
-        titulo = "Moto fora da vaga" if data.get("type") else "Alerta IoT"
-        descricao = f"Dispositivo {data.get('deviceId','desconhecido')} detectou irregularidade"
-        
-        cursor.execute("""
-            INSERT INTO alertas (id, tipo, severidade, titulo, descricao, moto_id, zona, ativo, criado_em)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
-        """, (
-            alert_id,
-            data.get("type", "iot"),
-            "HIGH" if data.get("type") else "info",
-            titulo,
-            descricao,
-            None,
-            (data.get("metadata") or {}).get("slot"),
-            datetime.now().isoformat()
-        ))
-        
-        # Registra idempotência
-        cursor.execute(
-            "INSERT INTO iot_eventos (idempotency_key, alert_id, created_at) VALUES (?, ?, ?)",
-            (idem, alert_id, datetime.now().isoformat())
-        )
-        
-        conn.commit()
-        conn.close()
-        
-        logger.info(f"IoT event created: {alert_id}")
-        return jsonify({"alertId": alert_id, "status": "OPEN"}), 201
+            return jsonify(result), 200
+        
+        logger.info(f"IoT event created: {result['alertId']}")
+        return jsonify(result), 201
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error creating IoT event: {e}", exc_info=True)
         return jsonify({"error": "Failed to create event"}), 500
 
 
+@iot_bp.route('/eventos:batch', methods=['POST'])
+def criar_eventos_lote():
+    """Recebe um lote de eventos IoT com idempotência por evento (campo id)"""
+    try:
+        data = request.get_json(silent=True)
+        events = data.get("events") if isinstance(data, dict) else data
+        
+        if not isinstance(events, list) or not events:
+            return jsonify({"error": "Lista de eventos obrigatória"}), 400
+        if len(events) > MAX_EVENT_BATCH_SIZE:
+            return jsonify({"error": f"Máximo de {MAX_EVENT_BATCH_SIZE} eventos por lote"}), 413
+        
+        iot_service = get_iot_service()
+        results = iot_service.process_events_batch(events)
+        
+        return jsonify({
+            "results": results,
+            "created": len([r for r in results if r.get("idempotent") is False]),
+            "idempotent": len([r for r in results if r.get("idempotent")]),
+            "failed": len([r for r in results if "error" in r])
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error creating IoT event batch: {e}", exc_info=True)
+        return jsonify({"error": "Failed to create events"}), 500
+
+
 @iot_bp.route('/devices', methods=['GET'])
+@conditional_get("dispositivos_iot")
 def list_devices():
     """Lista dispositivos IoT"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM dispositivos_iot ORDER BY nome")
-        devices = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        with get_db_connection() as conn:
+            rows = conn.execute("SELECT * FROM dispositivos_iot ORDER BY nome").fetchall()
+        devices = [dict(row) for row in rows]
         
         return jsonify({
             "devices": devices,
@@ -112,6 +107,25 @@ def list_devices():
         return jsonify({"error": "Failed to retrieve devices"}), 500
 
 
+@iot_bp.route('/devices/data:batch', methods=['POST'])
+def receive_devices_data_batch():
+    """Recebe leituras de vários dispositivos em uma requisição"""
+    try:
+        data = request.get_json(silent=True)
+        items = data.get("readings") if isinstance(data, dict) else data
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "Lista de leituras obrigatória"}), 400
+        if len(items) > MAX_TELEMETRY_BATCH_SIZE:
+            return jsonify({"error": f"Máximo de {MAX_TELEMETRY_BATCH_SIZE} leituras por lote"}), 413
+        
+        return jsonify(get_iot_service().ingest_readings(items)), 200
+        
+    except Exception as e:
+        logger.error(f"Error receiving device data batch: {e}", exc_info=True)
+        return jsonify({"error": "Failed to process device data"}), 500
+
+
 @iot_bp.route('/devices/<device_id>/data', methods=['POST'])
 def receive_device_data(device_id):
     """Recebe dados de dispositivo IoT"""
@@ -120,22 +134,18 @@ def receive_device_data(device_id):
         if not data:
             return jsonify({"error": "Invalid JSON payload"}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Atualiza dados do dispositivo
-        cursor.execute("""
-            UPDATE dispositivos_iot 
-            SET dados_sensor = ?, ultima_comunicacao = ?, status = 'online'
-            WHERE id = ?
-        """, (json.dumps(data), datetime.now().isoformat(), device_id))
-        
-        if cursor.rowcount == 0:
-            conn.close()
-            return jsonify({"error": "Device not found"}), 404
-        
-        conn.commit()
-        conn.close()
+        with get_db_connection() as conn:
+            # Atualiza dados do dispositivo
+            cursor = conn.execute("""
+                UPDATE dispositivos_iot 
+                SET dados_sensor = ?, ultima_comunicacao = ?, status = 'online'
+                WHERE id = ?
+            """, (json.dumps(data), datetime.now().isoformat(), device_id))
+            
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Device not found"}), 404
+            
+            conn.commit()
         
         logger.info(f"Device data received: {device_id}")
         return jsonify({"success": True, "message": "Dados recebidos"}), 200
@@ -8,6 +8,8 @@ from flask import Blueprint, request, jsonify
 
 from src.services.moto_service import MotoService
 from src.formatters.java_formatter import JavaFormatter
+from src.formatters.fields import parse_fields, columns_for
+from src.utils.http_cache import conditional_get
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +23,19 @@ def get_moto_service():
 
 
 @java_bp.route('/motos/status', methods=['GET'])
+@conditional_get("motos_patio")
 def motos_status():
     """Endpoint para integração com Spring Boot"""
     try:
+        try:
+            fields = parse_fields(request.args.get("fields"), JavaFormatter.MOTO_FIELDS)
+        except ValueError as e:
+            return jsonify(JavaFormatter.format_error(str(e))), 400
+        
         moto_service = get_moto_service()
-        motos = moto_service.get_all_motos()
+        motos = moto_service.get_all_motos(columns=columns_for(fields, JavaFormatter.MOTO_FIELDS))
         
-        return jsonify(JavaFormatter.format_moto_list(motos)), 200
+        return jsonify(JavaFormatter.format_moto_list(motos, fields)), 200
         
     except Exception as e:
         logger.error(f"Error getting motos status: {e}", exc_info=True)
@@ -52,6 +60,7 @@ def buscar_moto_por_placa(placa):
 
 
 @java_bp.route('/alertas', methods=['GET', 'POST'])
+@conditional_get("alertas")
 def alertas():
     """Gerenciamento de alertas para Java"""
     if request.method == 'GET':
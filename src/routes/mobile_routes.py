@@ -11,6 +11,8 @@ from src.models.user import UserLogin
 from src.services.moto_service import MotoService
 from src.services.auth_service import AuthService
 from src.formatters.mobile_formatter import MobileFormatter
+from src.formatters.fields import parse_fields, columns_for
+from src.utils.http_cache import conditional_get
 
 logger = logging.getLogger(__name__)
 
@@ -62,13 +64,22 @@ def login():
 
 
 @mobile_bp.route('/motos', methods=['GET'])
+@conditional_get("motos_patio")
 def list_motos():
     """Lista motos disponíveis para o app mobile"""
     try:
+        try:
+            fields = parse_fields(request.args.get("fields"), MobileFormatter.MOTO_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         moto_service = get_moto_service()
-        motos = moto_service.get_all_motos(status_filter=['disponivel', 'em_uso'])
+        motos = moto_service.get_all_motos(
+            status_filter=['disponivel', 'em_uso'],
+            columns=columns_for(fields, MobileFormatter.MOTO_FIELDS)
+        )
         
-        return jsonify(MobileFormatter.format_moto_list(motos)), 200
+        return jsonify(MobileFormatter.format_moto_list(motos, fields)), 200
         
     except Exception as e:
         logger.error(f"Error listing motos: {e}", exc_info=True)
@@ -119,6 +130,7 @@ def reservar_moto(moto_id):
 
 
 @mobile_bp.route('/alertas', methods=['GET'])
+@conditional_get("alertas")
 def list_alertas():
     """Lista alertas para mobile"""
     try:
@@ -141,11 +153,26 @@ def list_alertas():
             return jsonify({"error": "Invalid status"}), 400
         
         alert_service = AlertService(current_app.config.get('DATABASE_PATH'))
-        alerts = alert_service.get_alerts(
-            status=status if status != "ALL" else None,
-            limit=limit,
-            offset=offset
-        )
+        status_filter = status if status != "ALL" else None
+        cursor = request.args.get("cursor")
+        
+        # Cursor (keyset) por padrão; offset mantido para clientes antigos
+        next_cursor = None
+        if offset and not cursor:
+            alerts = alert_service.get_alerts(
+                status=status_filter,
+                limit=limit,
+                offset=offset
+            )
+        else:
+            try:
+                alerts, next_cursor = alert_service.get_alerts_page(
+                    status=status_filter,
+                    limit=limit,
+                    cursor=cursor
+                )
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
         
         # Formata para mobile
         items = []
@@ -157,9 +184,14 @@ def list_alertas():
                 "message": alert.get("descricao"),
                 "severity": alert.get("severidade", "info").upper(),
                 "createdAt": alert.get("criado_em"),
+                "imageUrl": alert.get("imagem_url"),
             })
         
-        return jsonify({"items": items, "total": len(items)}), 200
+        return jsonify({
+            "items": items,
+            "total": len(items),
+            "next_cursor": next_cursor
+        }), 200
         
     except Exception as e:
         logger.error(f"Error listing alerts: {e}", exc_info=True)
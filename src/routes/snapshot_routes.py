@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Rotas de evidências - Recortes JPEG das detecções que geraram alertas
+"""
+
+import logging
+from flask import Blueprint, jsonify, send_file, current_app
+
+from src.utils.snapshot_store import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+snapshot_bp = Blueprint('snapshots', __name__, url_prefix='/api/snapshots')
+
+# Conteúdo endereçado por hash: a mesma URL nunca muda de imagem
+SNAPSHOT_MAX_AGE = 31536000
+
+
+def get_snapshot_store():
+    """Helper para obter o store de evidências"""
+    root = current_app.config.get('SNAPSHOT_DIR')
+    return SnapshotStore(root)
+
+
+def snapshot_response(key: str):
+    """
+    Evidência com cache HTTP de longa duração (ou 404)
+
+    Compartilhada pelo blueprint e pela API de integração, que é o backend
+    padrão (BACKEND_BASE_URL) das URLs enviadas nos eventos.
+    """
+    path = get_snapshot_store().open(key)
+    if path is None:
+        return jsonify({"error": "Snapshot not found"}), 404
+
+    response = send_file(
+        path,
+        mimetype='image/jpeg',
+        etag=key,
+        conditional=True,
+        max_age=SNAPSHOT_MAX_AGE,
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@snapshot_bp.route('/<key>.jpg', methods=['GET'])
+def get_snapshot(key):
+    """Serve uma evidência com cache HTTP de longa duração"""
+    return snapshot_response(key)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Rotas de Stream - Atualizações ao vivo via Server-Sent Events
+Substitui o polling do dashboard: cada cliente mantém uma conexão aberta e
+recebe apenas os deltas publicados pelo change feed do processo.
+"""
+
+import logging
+import queue
+from flask import Blueprint, Response, current_app, request, stream_with_context
+
+from src.config import Config
+from src.constants import SSE_KEEPALIVE_SECONDS, SSE_RETRY_MS
+from src.utils.change_feed import ChangeFeed, get_change_feed
+from src.utils.json_provider import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+stream_bp = Blueprint('stream', __name__, url_prefix='/api/stream')
+
+
+def get_db_path():
+    """Helper para obter caminho do banco"""
+    return current_app.config.get('DATABASE_PATH', 'visionmoto_integration.db')
+
+
+def format_sse(event_id: int, event: str, data) -> bytes:
+    """Serializa um evento no formato text/event-stream"""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+        event_id, event.encode("utf-8"), dumps_bytes(data)
+    )
+
+
+def streaming_supported(environ, mode: str = None) -> bool:
+    """
+    Indica se o servidor WSGI comporta conexões SSE abertas
+
+    Cada cliente ocupa o worker que o atende durante toda a conexão: em
+    workers síncronos (gunicorn sync) alguns dashboards bastariam para
+    bloquear a API. Em modo "auto" o stream só é servido quando o servidor
+    atende requisições em threads (wsgi.multithread). O modo ASGI tem
+    handler próprio e não passa por aqui.
+    """
+    mode = mode or Config.SSE_MODE
+    if mode == "on":
+        return True
+    if mode == "off":
+        return False
+    return bool(environ.get("wsgi.multithread"))
+
+
+def event_stream_response(feed: ChangeFeed) -> Response:
+    """
+    Resposta SSE de um cliente inscrito no change feed
+
+    Sem suporte a streaming no servidor responde 204: o EventSource do
+    navegador não reconecta e o dashboard volta ao polling.
+    """
+    if not streaming_supported(request.environ, current_app.config.get("SSE_MODE")):
+        return Response(status=204)
+
+    def generate():
+        # Inscrição dentro do gerador: o finally sempre a desfaz
+        subscriber = feed.subscribe()
+        try:
+            yield b"retry: %d\n\n" % SSE_RETRY_MS
+            while True:
+                try:
+                    event_id, event, data = subscriber.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    # Comentário SSE: mantém proxies abertos e detecta desconexão
+                    yield b": keepalive\n\n"
+                    continue
+                yield format_sse(event_id, event, data)
+        finally:
+            feed.unsubscribe(subscriber)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Desativa o buffering de proxies reversos (nginx)
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@stream_bp.route('/events', methods=['GET'])
+def stream_events():
+    """
+    Stream de eventos do pátio
+
+    Eventos: moto.updated, moto.removed, alert.created, alert.resolved,
+    device.heartbeat e resync (o cliente deve recarregar o estado completo).
+    """
+    return event_stream_response(get_change_feed(get_db_path()))
@@ -6,7 +6,7 @@ Garante type safety e validação de dados
 
 from typing import Optional, List, Dict, Any, Annotated
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, Field, validator, field_validator
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, validator, field_validator
 from enum import Enum
 import re
 
@@ -193,6 +193,16 @@ class DeviceDataRequest(BaseModel):
     custom_data: Optional[Dict[str, Any]] = Field(default_factory=dict)
 
 
+class DeviceReading(DeviceDataRequest):
+    """Schema de uma leitura no envio de telemetria em lote"""
+    device_id: str = Field(..., min_length=1, max_length=100)
+
+
+# Validadores compilados uma vez (o lote inteiro é validado em uma chamada)
+DEVICE_READING_ADAPTER = TypeAdapter(DeviceReading)
+DEVICE_READINGS_ADAPTER = TypeAdapter(List[DeviceReading])
+
+
 class DeviceResponse(BaseModel):
     """Schema para resposta de dispositivo"""
     id: str
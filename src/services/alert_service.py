@@ -3,11 +3,14 @@
 Serviço de Alertas - Gerenciamento centralizado de alertas
 """
 
+import base64
+import json
 import sqlite3
 import uuid
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, ContextManager, Tuple
 from datetime import datetime
 
+from src.utils.db_connection import get_connection_manager
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -18,12 +21,11 @@ class AlertService:
     
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.db = get_connection_manager(db_path)
     
-    def _get_connection(self) -> sqlite3.Connection:
-        """Retorna conexão com banco"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def _get_connection(self) -> ContextManager[sqlite3.Connection]:
+        """Conexão persistente da thread; o que não foi commitado é desfeito ao sair"""
+        return self.db.connection()
     
     def create_alert(
         self,
@@ -51,28 +53,24 @@ class AlertService:
         try:
             alert_id = str(uuid.uuid4())
             
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO alertas (
-                    id, tipo, severidade, titulo, descricao, 
-                    moto_id, zona, ativo, criado_em
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
-            """, (
-                alert_id,
-                tipo,
-                severidade,
-                titulo,
-                descricao,
-                moto_id,
-                zona,
-                datetime.now().isoformat()
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self._get_connection() as conn:
+                conn.execute("""
+                    INSERT INTO alertas (
+                        id, tipo, severidade, titulo, descricao, 
+                        moto_id, zona, ativo, criado_em
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+                """, (
+                    alert_id,
+                    tipo,
+                    severidade,
+                    titulo,
+                    descricao,
+                    moto_id,
+                    zona,
+                    datetime.now().isoformat()
+                ))
+                conn.commit()
             
             logger.info(
                 "Alerta criado",
@@ -105,32 +103,31 @@ class AlertService:
             Lista de alertas
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            if status == "OPEN":
-                cursor.execute("""
-                    SELECT * FROM alertas 
-                    WHERE ativo = 1 
-                    ORDER BY criado_em DESC 
-                    LIMIT ? OFFSET ?
-                """, (limit, offset))
-            elif status == "RESOLVED":
-                cursor.execute("""
-                    SELECT * FROM alertas 
-                    WHERE ativo = 0 
-                    ORDER BY resolvido_em DESC 
-                    LIMIT ? OFFSET ?
-                """, (limit, offset))
-            else:
-                cursor.execute("""
-                    SELECT * FROM alertas 
-                    ORDER BY criado_em DESC 
-                    LIMIT ? OFFSET ?
-                """, (limit, offset))
-            
-            alerts = [dict(row) for row in cursor.fetchall()]
-            conn.close()
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                if status == "OPEN":
+                    cursor.execute("""
+                        SELECT * FROM alertas 
+                        WHERE ativo = 1 
+                        ORDER BY criado_em DESC 
+                        LIMIT ? OFFSET ?
+                    """, (limit, offset))
+                elif status == "RESOLVED":
+                    cursor.execute("""
+                        SELECT * FROM alertas 
+                        WHERE ativo = 0 
+                        ORDER BY resolvido_em DESC 
+                        LIMIT ? OFFSET ?
+                    """, (limit, offset))
+                else:
+                    cursor.execute("""
+                        SELECT * FROM alertas 
+                        ORDER BY criado_em DESC 
+                        LIMIT ? OFFSET ?
+                    """, (limit, offset))
+                
+                alerts = [dict(row) for row in cursor.fetchall()]
             
             logger.debug(
                 "Alertas listados",
@@ -146,6 +143,129 @@ class AlertService:
             logger.error("Erro ao listar alertas", error=e, status=status)
             raise
     
+    @staticmethod
+    def encode_cursor(sort_value: Optional[str], alert_id: str) -> str:
+        """
+        Cursor opaco com a posição (valor de ordenação, id) do último item
+        
+        Valor de ordenação NULL é codificado explicitamente (null no JSON).
+        """
+        raw = json.dumps([sort_value, alert_id], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[Optional[str], str]:
+        """
+        Decodifica cursor gerado por encode_cursor
+        
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            sort_value, alert_id = json.loads(base64.urlsafe_b64decode(padded))
+        except (ValueError, TypeError, UnicodeDecodeError):
+            raise ValueError("Cursor inválido")
+        if not isinstance(sort_value, (str, type(None))) or not isinstance(alert_id, str):
+            raise ValueError("Cursor inválido")
+        return sort_value, alert_id
+    
+    def get_alerts_page(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Lista alertas com paginação por cursor (keyset)
+        
+        Ordena por (criado_em, id) — ou (resolvido_em, id) para RESOLVED — de
+        forma decrescente e continua a partir da posição do cursor, com custo
+        constante por página independentemente da profundidade. Itens com
+        valor de ordenação NULL vêm por último (ordenados por id), em uma
+        segunda fase do cursor.
+        
+        Args:
+            status: Filtro de status (OPEN, RESOLVED)
+            limit: Limite de resultados
+            cursor: Cursor retornado pela página anterior
+        
+        Returns:
+            (alertas, next_cursor); next_cursor é None na última página
+        
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        sort_column = "resolvido_em" if status == "RESOLVED" else "criado_em"
+        base: List[str] = []
+        if status == "OPEN":
+            base.append("ativo = 1")
+        elif status == "RESOLVED":
+            base.append("ativo = 0")
+        
+        # Duas fases, cada consulta um SEARCH no índice (ativo, coluna, id):
+        # primeiro os valores não nulos por (coluna, id), depois a cauda de
+        # NULLs por id. Um OR juntando as duas impediria a busca no índice.
+        in_null_tail = False
+        after: Optional[Tuple[Optional[str], str]] = None
+        if cursor:
+            sort_value, alert_id = self.decode_cursor(cursor)
+            in_null_tail = sort_value is None
+            after = (sort_value, alert_id)
+        
+        try:
+            with self._get_connection() as conn:
+                # Um item a mais indica se existe próxima página
+                rows: List[sqlite3.Row] = []
+                params: List[Any] = []
+                if not in_null_tail:
+                    conditions = [*base, f"{sort_column} IS NOT NULL"]
+                    if after:
+                        # Comparação de tuplas: linhas com NULL ficam de fora
+                        conditions[-1] = f"({sort_column}, id) < (?, ?)"
+                        params.extend(after)
+                    rows = conn.execute(f"""
+                        SELECT * FROM alertas 
+                        WHERE {' AND '.join(conditions)}
+                        ORDER BY {sort_column} DESC, id DESC 
+                        LIMIT ?
+                    """, (*params, limit + 1)).fetchall()
+                
+                if len(rows) <= limit:
+                    conditions = [*base, f"{sort_column} IS NULL"]
+                    params = []
+                    if in_null_tail:
+                        conditions.append("id < ?")
+                        params.append(after[1])
+                    rows += conn.execute(f"""
+                        SELECT * FROM alertas 
+                        WHERE {' AND '.join(conditions)}
+                        ORDER BY id DESC 
+                        LIMIT ?
+                    """, (*params, limit + 1 - len(rows))).fetchall()
+            
+            alerts = [dict(row) for row in rows]
+            
+            next_cursor = None
+            if len(alerts) > limit:
+                alerts = alerts[:limit]
+                last = alerts[-1]
+                next_cursor = self.encode_cursor(last[sort_column], last["id"])
+            
+            logger.debug(
+                "Alertas listados (cursor)",
+                total=len(alerts),
+                status=status,
+                limit=limit,
+                has_more=next_cursor is not None
+            )
+            
+            return alerts, next_cursor
+            
+        except sqlite3.Error as e:
+            logger.error("Erro ao listar alertas", error=e, status=status)
+            raise
+    
     def resolve_alert(
         self,
         alert_id: str,
@@ -165,27 +285,23 @@ class AlertService:
             ValueError: Se alerta não encontrado ou já resolvido
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE alertas 
-                SET ativo = 0, 
-                    resolvido_em = ?, 
-                    resolvido_por = ?
-                WHERE id = ? AND ativo = 1
-            """, (datetime.now().isoformat(), resolved_by, alert_id))
-            
-            if cursor.rowcount == 0:
-                conn.close()
-                logger.warning(
-                    "Tentativa de resolver alerta inexistente ou já resolvido",
-                    alert_id=alert_id
-                )
-                raise ValueError("Alerta não encontrado ou já resolvido")
-            
-            conn.commit()
-            conn.close()
+            with self._get_connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE alertas 
+                    SET ativo = 0, 
+                        resolvido_em = ?, 
+                        resolvido_por = ?
+                    WHERE id = ? AND ativo = 1
+                """, (datetime.now().isoformat(), resolved_by, alert_id))
+                
+                if cursor.rowcount == 0:
+                    logger.warning(
+                        "Tentativa de resolver alerta inexistente ou já resolvido",
+                        alert_id=alert_id
+                    )
+                    raise ValueError("Alerta não encontrado ou já resolvido")
+                
+                conn.commit()
             
             logger.info(
                 "Alerta resolvido",
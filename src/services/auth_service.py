@@ -6,11 +6,13 @@ Serviço de Autenticação - Implementação REAL com hash de senha
 import sqlite3
 import uuid
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, ContextManager
 from datetime import datetime, timedelta, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 
+from src.utils.db_connection import get_connection_manager
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,13 +21,12 @@ class AuthService:
     
     def __init__(self, db_path: str, secret_key: str):
         self.db_path = db_path
+        self.db = get_connection_manager(db_path)
         self.secret_key = secret_key
     
-    def _get_connection(self) -> sqlite3.Connection:
-        """Retorna conexão com banco"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def _get_connection(self) -> ContextManager[sqlite3.Connection]:
+        """Conexão persistente da thread; o que não foi commitado é desfeito ao sair"""
+        return self.db.connection()
     
     def create_user(
         self,
@@ -53,23 +54,19 @@ class AuthService:
             user_id = str(uuid.uuid4())
             senha_hash = generate_password_hash(senha, method='pbkdf2:sha256')
             
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO usuarios (id, nome, email, senha_hash, tipo, criado_em, ativo)
-                VALUES (?, ?, ?, ?, ?, ?, 1)
-            """, (
-                user_id,
-                nome,
-                email.lower().strip(),
-                senha_hash,
-                tipo,
-                datetime.now(timezone.utc).isoformat()
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self._get_connection() as conn:
+                conn.execute("""
+                    INSERT INTO usuarios (id, nome, email, senha_hash, tipo, criado_em, ativo)
+                    VALUES (?, ?, ?, ?, ?, ?, 1)
+                """, (
+                    user_id,
+                    nome,
+                    email.lower().strip(),
+                    senha_hash,
+                    tipo,
+                    datetime.now(timezone.utc).isoformat()
+                ))
+                conn.commit()
             
             logger.info(f"User created successfully: {email}")
             return user_id
@@ -99,42 +96,34 @@ class AuthService:
         try:
             email = email.lower().strip()
             
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT id, nome, email, senha_hash, tipo, ativo
-                FROM usuarios
-                WHERE email = ?
-            """, (email,))
-            
-            user = cursor.fetchone()
-            
-            if not user:
-                logger.warning(f"Login attempt for non-existent user: {email}")
-                conn.close()
-                return None
-            
-            if not user["ativo"]:
-                logger.warning(f"Login attempt for inactive user: {email}")
-                conn.close()
-                return None
-            
-            # Verifica senha
-            if not check_password_hash(user["senha_hash"], senha):
-                logger.warning(f"Invalid password for user: {email}")
-                conn.close()
-                return None
-            
-            # Atualiza último acesso
-            cursor.execute("""
-                UPDATE usuarios
-                SET ultimo_acesso = ?
-                WHERE id = ?
-            """, (datetime.now(timezone.utc).isoformat(), user["id"]))
-            
-            conn.commit()
-            conn.close()
+            with self._get_connection() as conn:
+                user = conn.execute("""
+                    SELECT id, nome, email, senha_hash, tipo, ativo
+                    FROM usuarios
+                    WHERE email = ?
+                """, (email,)).fetchone()
+                
+                if not user:
+                    logger.warning(f"Login attempt for non-existent user: {email}")
+                    return None
+                
+                if not user["ativo"]:
+                    logger.warning(f"Login attempt for inactive user: {email}")
+                    return None
+                
+                # Verifica senha
+                if not check_password_hash(user["senha_hash"], senha):
+                    logger.warning(f"Invalid password for user: {email}")
+                    return None
+                
+                # Atualiza último acesso
+                conn.execute("""
+                    UPDATE usuarios
+                    SET ultimo_acesso = ?
+                    WHERE id = ?
+                """, (datetime.now(timezone.utc).isoformat(), user["id"]))
+                
+                conn.commit()
             
             # Gera token JWT
             exp_time = datetime.now(timezone.utc) + timedelta(hours=24)
@@ -5,114 +5,184 @@ Serviço de IoT - Gerenciamento de dispositivos e eventos
 
 import sqlite3
 import uuid
-from typing import Optional, List, Dict, Any
+from typing import List, Dict, Any, ContextManager, Optional, Tuple
 from datetime import datetime
 
+from pydantic import ValidationError
+
+from src.constants import EVENT_INSERT_CHUNK
+from src.schemas import DEVICE_READING_ADAPTER, DEVICE_READINGS_ADAPTER
+from src.utils.db_connection import get_connection_manager
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+ALERT_INSERT_SQL = """
+    INSERT INTO alertas (
+        id, tipo, severidade, titulo, descricao,
+        moto_id, zona, imagem_url, ativo, criado_em
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
+"""
+
+
+def new_alert_id(now: datetime) -> str:
+    """Gera o ID de um alerta (ALR-AAAAMMDD-XXXXXX)"""
+    return f"ALR-{now.strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+
+
+EVENT_STRING_FIELDS = ("type", "deviceId", "imageUrl")
+
+
+def validate_event(event: Any) -> Optional[str]:
+    """
+    Valida um evento IoT antes de gravá-lo
+    
+    Returns:
+        Mensagem de erro, ou None se o evento for válido
+    """
+    if not isinstance(event, dict):
+        return "evento deve ser um objeto"
+    for field in EVENT_STRING_FIELDS:
+        if event.get(field) is not None and not isinstance(event[field], str):
+            return f"{field} deve ser texto"
+    metadata = event.get("metadata")
+    if metadata is not None:
+        if not isinstance(metadata, dict):
+            return "metadata deve ser um objeto"
+        if metadata.get("slot") is not None and not isinstance(metadata["slot"], str):
+            return "metadata.slot deve ser texto"
+    return None
+
+
+def event_alert_row(alert_id: str, event: Dict[str, Any], created_at: str) -> Tuple:
+    """
+    Linha de alertas criada por um evento IoT (formato do publisher)
+    
+    Usada pelos endpoints individual e em lote, para que ambos gerem o
+    mesmo alerta a partir do mesmo evento. imageUrl é a evidência gravada
+    pelo detector para a própria detecção que originou o evento.
+    """
+    event_type = event.get("type")
+    return (
+        alert_id,
+        event_type or "iot",
+        "HIGH" if event_type else "info",
+        "Moto fora da vaga" if event_type else "Alerta IoT",
+        f"Dispositivo {event.get('deviceId') or 'desconhecido'} detectou irregularidade",
+        None,
+        (event.get("metadata") or {}).get("slot"),
+        event.get("imageUrl"),
+        created_at
+    )
+
+
+def validate_readings(items: List[Any]) -> Tuple[List[Tuple[int, Any]], List[Dict[str, Any]]]:
+    """
+    Valida o lote com o TypeAdapter compilado
+    
+    O lote todo é validado em uma chamada; só quando há erro as leituras
+    são revalidadas uma a uma para separar as válidas das rejeitadas.
+    
+    Returns:
+        ([(índice, DeviceReading)], [{"index", "error"}])
+    """
+    try:
+        return list(enumerate(DEVICE_READINGS_ADAPTER.validate_python(items))), []
+    except ValidationError:
+        pass
+    
+    readings, rejected = [], []
+    for index, item in enumerate(items):
+        try:
+            readings.append((index, DEVICE_READING_ADAPTER.validate_python(item)))
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            rejected.append({"index": index, "error": f"{field}: {error['msg']}"})
+    return readings, rejected
+
 
 class IoTService:
     """Serviço para operações de IoT"""
     
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.db = get_connection_manager(db_path)
     
-    def _get_connection(self) -> sqlite3.Connection:
-        """Retorna conexão com banco"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def _get_connection(self) -> ContextManager[sqlite3.Connection]:
+        """Conexão persistente da thread; o que não foi commitado é desfeito ao sair"""
+        return self.db.connection()
     
     def process_event(
         self,
         idempotency_key: str,
-        event_type: Optional[str],
-        device_id: str,
-        metadata: Optional[Dict[str, Any]] = None
+        event: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
         Processa evento IoT com idempotência
         
         Args:
             idempotency_key: Chave de idempotência
-            event_type: Tipo do evento
-            device_id: ID do dispositivo
-            metadata: Metadados adicionais
+            event: Evento no formato do publisher (type, deviceId, metadata)
         
         Returns:
-            Dicionário com alertId e status
+            Dicionário com alertId, status e idempotent
+        
+        Raises:
+            ValueError: Se o evento for inválido
         """
+        error = validate_event(event)
+        if error:
+            raise ValueError(error)
+        
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Verifica idempotência
-            cursor.execute("""
-                SELECT alert_id FROM iot_eventos 
-                WHERE idempotency_key = ?
-            """, (idempotency_key,))
-            
-            row = cursor.fetchone()
-            
-            if row:
-                # Evento já processado
-                alert_id = row["alert_id"]
-                conn.close()
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
                 
-                logger.debug(
-                    "Evento IoT já processado (idempotente)",
-                    idempotency_key=idempotency_key,
-                    alert_id=alert_id
-                )
+                # Verifica idempotência
+                cursor.execute("""
+                    SELECT alert_id FROM iot_eventos 
+                    WHERE idempotency_key = ?
+                """, (idempotency_key,))
                 
-                return {
-                    "alertId": alert_id,
-                    "status": "OPEN",
-                    "idempotent": True
-                }
-            
-            # Cria novo alerta
-            alert_id = f"ALR-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
-            
-            titulo = "Moto fora da vaga" if event_type else "Alerta IoT"
-            descricao = f"Dispositivo {device_id} detectou irregularidade"
-            severidade = "HIGH" if event_type else "info"
-            zona = (metadata or {}).get("slot")
-            
-            cursor.execute("""
-                INSERT INTO alertas (
-                    id, tipo, severidade, titulo, descricao, 
-                    moto_id, zona, ativo, criado_em
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
-            """, (
-                alert_id,
-                event_type or "iot",
-                severidade,
-                titulo,
-                descricao,
-                None,
-                zona,
-                datetime.now().isoformat()
-            ))
-            
-            # Registra idempotência
-            cursor.execute("""
-                INSERT INTO iot_eventos (idempotency_key, alert_id, created_at)
-                VALUES (?, ?, ?)
-            """, (idempotency_key, alert_id, datetime.now().isoformat()))
-            
-            conn.commit()
-            conn.close()
+                row = cursor.fetchone()
+                
+                if row:
+                    # Evento já processado
+                    alert_id = row["alert_id"]
+                    
+                    logger.debug(
+                        "Evento IoT já processado (idempotente)",
+                        idempotency_key=idempotency_key,
+                        alert_id=alert_id
+                    )
+                    
+                    return {
+                        "alertId": alert_id,
+                        "status": "OPEN",
+                        "idempotent": True
+                    }
+                
+                # Cria novo alerta
+                now = datetime.now()
+                alert_id = new_alert_id(now)
+                cursor.execute(ALERT_INSERT_SQL, event_alert_row(alert_id, event, now.isoformat()))
+                
+                # Registra idempotência
+                cursor.execute("""
+                    INSERT INTO iot_eventos (idempotency_key, alert_id, created_at)
+                    VALUES (?, ?, ?)
+                """, (idempotency_key, alert_id, now.isoformat()))
+                
+                conn.commit()
             
             logger.info(
                 "Evento IoT processado",
                 idempotency_key=idempotency_key,
                 alert_id=alert_id,
-                device_id=device_id,
-                event_type=event_type
+                device_id=event.get("deviceId"),
+                event_type=event.get("type")
             )
             
             return {
@@ -126,10 +196,122 @@ class IoTService:
                 "Erro ao processar evento IoT",
                 error=e,
                 idempotency_key=idempotency_key,
-                device_id=device_id
+                device_id=event.get("deviceId")
             )
             raise
     
+    def process_events_batch(
+        self,
+        events: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Processa um lote de eventos IoT em uma única transação
+        
+        A idempotência de todo o lote é resolvida por INSERT ... ON CONFLICT
+        DO NOTHING RETURNING em iot_eventos: as chaves devolvidas são os
+        eventos novos (que geram alerta); as demais já existiam e apenas
+        têm o alerta original consultado. Chaves repetidas dentro do lote
+        são tratadas como o mesmo evento. Eventos malformados são
+        rejeitados antes da transação, sem impedir a gravação dos demais.
+        
+        Args:
+            events: Eventos no formato do publisher (id, type, deviceId, metadata)
+        
+        Returns:
+            Um resultado por evento, na ordem recebida: id, alertId, status e
+            idempotent, ou id e error se o evento for inválido
+        """
+        now = datetime.now()
+        created_at = now.isoformat()
+        
+        # Validação por evento antes da transação: inválidos não entram no lote
+        errors: List[Optional[str]] = []
+        for event in events:
+            key = event.get("id") if isinstance(event, dict) else None
+            if isinstance(event, dict) and (not isinstance(key, str) or not key):
+                errors.append("id (Idempotency-Key) obrigatório")
+            else:
+                errors.append(validate_event(event))
+        
+        # Primeira ocorrência válida de cada chave -> (alert_id, evento)
+        pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for event, error in zip(events, errors):
+            if error is None and event["id"] not in pending:
+                pending[event["id"]] = (new_alert_id(now), event)
+        
+        keys = list(pending)
+        alert_ids: Dict[str, str] = {}
+        inserted = set()
+        
+        try:
+            with self._get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                
+                for start in range(0, len(keys), EVENT_INSERT_CHUNK):
+                    chunk = keys[start:start + EVENT_INSERT_CHUNK]
+                    values = ", ".join(["(?, ?, ?)"] * len(chunk))
+                    params = [
+                        value
+                        for key in chunk
+                        for value in (key, pending[key][0], created_at)
+                    ]
+                    rows = conn.execute(f"""
+                        INSERT INTO iot_eventos (idempotency_key, alert_id, created_at)
+                        VALUES {values}
+                        ON CONFLICT (idempotency_key) DO NOTHING
+                        RETURNING idempotency_key
+                    """, params).fetchall()
+                    inserted.update(row[0] for row in rows)
+                    
+                    existing = [key for key in chunk if key not in inserted]
+                    if existing:
+                        placeholders = ",".join("?" * len(existing))
+                        for row in conn.execute(f"""
+                            SELECT idempotency_key, alert_id FROM iot_eventos
+                            WHERE idempotency_key IN ({placeholders})
+                        """, existing):
+                            alert_ids[row[0]] = row[1]
+                
+                alerts = []
+                for key in keys:
+                    if key not in inserted:
+                        continue
+                    alert_id, event = pending[key]
+                    alert_ids[key] = alert_id
+                    alerts.append(event_alert_row(alert_id, event, created_at))
+                
+                conn.executemany(ALERT_INSERT_SQL, alerts)
+                
+                conn.commit()
+            
+        except sqlite3.Error as e:
+            logger.error("Erro ao processar lote de eventos IoT", error=e, total=len(events))
+            raise
+        
+        results = []
+        first_seen = set()
+        for event, error in zip(events, errors):
+            key = event.get("id") if isinstance(event, dict) else None
+            if error:
+                results.append({"id": key, "error": error})
+                continue
+            results.append({
+                "id": key,
+                "alertId": alert_ids[key],
+                "status": "OPEN",
+                "idempotent": key not in inserted or key in first_seen
+            })
+            first_seen.add(key)
+        
+        logger.info(
+            "Lote de eventos IoT processado",
+            total=len(events),
+            created=len(inserted),
+            idempotent=len(keys) - len(inserted)
+        )
+        
+        return results
+    
     def get_devices(self) -> List[Dict[str, Any]]:
         """
         Lista todos os dispositivos IoT
@@ -138,16 +320,13 @@ class IoTService:
             Lista de dispositivos
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
+            with self._get_connection() as conn:
+                rows = conn.execute("""
+                    SELECT * FROM dispositivos_iot 
+                    ORDER BY nome
+                """).fetchall()
             
-            cursor.execute("""
-                SELECT * FROM dispositivos_iot 
-                ORDER BY nome
-            """)
-            
-            devices = [dict(row) for row in cursor.fetchall()]
-            conn.close()
+            devices = [dict(row) for row in rows]
             
             logger.debug("Dispositivos IoT listados", total=len(devices))
             
@@ -175,25 +354,22 @@ class IoTService:
         try:
             import json
             
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE dispositivos_iot 
-                SET dados_sensor = ?, 
-                    ultima_comunicacao = ?, 
-                    status = 'online'
-                WHERE id = ?
-            """, (
-                json.dumps(data),
-                datetime.now().isoformat(),
-                device_id
-            ))
-            
-            success = cursor.rowcount > 0
-            
-            conn.commit()
-            conn.close()
+            with self._get_connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE dispositivos_iot 
+                    SET dados_sensor = ?, 
+                        ultima_comunicacao = ?, 
+                        status = 'online'
+                    WHERE id = ?
+                """, (
+                    json.dumps(data),
+                    datetime.now().isoformat(),
+                    device_id
+                ))
+                
+                success = cursor.rowcount > 0
+                
+                conn.commit()
             
             if success:
                 logger.info(
@@ -215,3 +391,90 @@ class IoTService:
                 device_id=device_id
             )
             raise
+    
+    def update_devices_data_bulk(
+        self,
+        readings: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[str]:
+        """
+        Atualiza dados de vários dispositivos em uma única transação
+        
+        Args:
+            readings: Pares (device_id, dados do sensor); para o mesmo
+                dispositivo prevalece a última leitura do lote
+        
+        Returns:
+            IDs de dispositivos desconhecidos (leituras descartadas)
+        """
+        import json
+        
+        if not readings:
+            return []
+        
+        try:
+            with self._get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                
+                # Lotes limitados a MAX_TELEMETRY_BATCH_SIZE: um único IN basta
+                device_ids = list(dict.fromkeys(device_id for device_id, _ in readings))
+                placeholders = ",".join("?" * len(device_ids))
+                known = {
+                    row[0] for row in conn.execute(
+                        f"SELECT id FROM dispositivos_iot WHERE id IN ({placeholders})",
+                        device_ids
+                    )
+                }
+                
+                now = datetime.now().isoformat()
+                conn.executemany("""
+                    UPDATE dispositivos_iot 
+                    SET dados_sensor = ?, 
+                        ultima_comunicacao = ?, 
+                        status = 'online'
+                    WHERE id = ?
+                """, [
+                    (json.dumps(data), now, device_id)
+                    for device_id, data in readings
+                    if device_id in known
+                ])
+                
+                conn.commit()
+            
+            unknown = [device_id for device_id in device_ids if device_id not in known]
+            
+            logger.info(
+                "Telemetria em lote aplicada",
+                readings=len(readings),
+                devices=len(known),
+                unknown=len(unknown)
+            )
+            
+            return unknown
+            
+        except sqlite3.Error as e:
+            logger.error("Erro ao aplicar telemetria em lote", error=e, readings=len(readings))
+            raise
+    
+    def ingest_readings(self, items: List[Any]) -> Dict[str, Any]:
+        """
+        Valida e aplica um lote de leituras (POST /api/iot/devices/data:batch)
+        
+        Args:
+            items: Leituras no formato DeviceReading
+        
+        Returns:
+            accepted, unknown_devices e rejected (índice e erro de cada
+            leitura inválida)
+        """
+        readings, rejected = validate_readings(items)
+        unknown = self.update_devices_data_bulk([
+            (reading.device_id, reading.model_dump(exclude={"device_id"}, exclude_unset=True))
+            for _, reading in readings
+        ])
+        
+        unknown_ids = set(unknown)
+        return {
+            "accepted": len([r for _, r in readings if r.device_id not in unknown_ids]),
+            "unknown_devices": unknown,
+            "rejected": rejected
+        }
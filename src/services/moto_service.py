@@ -5,80 +5,137 @@ Remove duplicação e separa responsabilidades
 """
 
 import sqlite3
-from typing import Optional, List, Dict, Any
+import string
+import threading
+import weakref
+from typing import Optional, List, Dict, Any, ContextManager, Tuple
 from datetime import datetime
 
+from src.utils.db_connection import get_connection_manager
 from src.utils.logger import get_logger
+from src.utils.migrations import get_data_version
 from src.schemas import MotoResponse, MotoStatus
 
 logger = get_logger(__name__)
 
+# Snapshot da frota por banco: (versão dos dados, motos). Compartilhado pelas
+# instâncias de MotoService (criadas por requisição) do mesmo processo.
+_fleet_snapshots: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_fleet_lock = threading.Lock()
+
+# UPPER() do SQLite: apenas a-z -> A-Z
+ASCII_UPPER = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
+
 
 class MotoService:
     """Serviço para operações de motos"""
     
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.db = get_connection_manager(db_path)
     
-    def _get_connection(self) -> sqlite3.Connection:
-        """Retorna conexão com banco"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    @staticmethod
+    def normalize_placa(placa: str) -> str:
+        """
+        Normaliza placa para busca (maiúsculas, sem hífen nem espaços)
+        
+        Equivalente exato de PLACA_NORMALIZADA_SQL: TRIM do SQLite remove só
+        espaços (já removidos pelo REPLACE) e UPPER só altera letras ASCII.
+        """
+        return placa.replace("-", "").replace(" ", "").translate(ASCII_UPPER)
+    
+    def _get_connection(self) -> ContextManager[sqlite3.Connection]:
+        """Conexão persistente da thread; o que não foi commitado é desfeito ao sair"""
+        return self.db.connection()
+    
+    def get_fleet_snapshot(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Retorna a frota completa em memória e a versão dos dados
+        
+        A versão é incrementada por trigger a cada escrita em motos_patio
+        (de qualquer worker), então a tabela só é relida após uma escrita;
+        as demais chamadas custam uma leitura por chave primária.
+        
+        Returns:
+            (versão, motos ordenadas por status e bateria). Os dicionários
+            são compartilhados e não devem ser alterados.
+        """
+        try:
+            with self._get_connection() as conn:
+                version = get_data_version(conn, "motos_patio")
+                
+                cached = _fleet_snapshots.get(self.db)
+                if cached is not None and cached[0] == version:
+                    return cached
+                
+                with _fleet_lock:
+                    cached = _fleet_snapshots.get(self.db)
+                    if cached is not None and cached[0] == version:
+                        return cached
+                    
+                    # Versão e dados lidos na mesma transação de leitura,
+                    # encerrada antes de liberar o lock (inclusive em erro)
+                    conn.execute("BEGIN")
+                    try:
+                        version = get_data_version(conn, "motos_patio")
+                        cursor = conn.execute("""
+                            SELECT 
+                                id, modelo, placa, status, bateria, zona, 
+                                endereco, setor, andar, vaga, descricao_localizacao,
+                                ultima_atualizacao, localizacao_x, localizacao_y,
+                                em_uso_por
+                            FROM motos_patio 
+                            ORDER BY status, bateria DESC
+                        """)
+                        motos = [dict(row) for row in cursor.fetchall()]
+                    finally:
+                        conn.rollback()
+                    
+                    snapshot = (version, motos)
+                    _fleet_snapshots[self.db] = snapshot
+            
+            logger.debug("Snapshot da frota recarregado", version=version, total=len(motos))
+            
+            return snapshot
+            
+        except sqlite3.Error as e:
+            logger.error("Erro ao carregar frota", error=e, db_path=self.db_path)
+            raise
     
     def get_all_motos(
         self, 
-        status_filter: Optional[List[str]] = None
+        status_filter: Optional[List[str]] = None,
+        columns: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Lista todas as motos com filtro opcional
         
         Args:
             status_filter: Lista de status para filtrar
+            columns: Colunas a retornar (None = todas). status é sempre
+                incluído, pois os resumos das listagens dependem dele.
         
         Returns:
             Lista de motos
         """
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            if status_filter:
-                placeholders = ','.join('?' * len(status_filter))
-                query = f"""
-                    SELECT 
-                        id, modelo, placa, status, bateria, zona, 
-                        endereco, setor, andar, vaga, descricao_localizacao,
-                        ultima_atualizacao, localizacao_x, localizacao_y
-                    FROM motos_patio 
-                    WHERE status IN ({placeholders})
-                    ORDER BY status, bateria DESC
-                """
-                cursor.execute(query, status_filter)
-            else:
-                cursor.execute("""
-                    SELECT 
-                        id, modelo, placa, status, bateria, zona, 
-                        endereco, setor, andar, vaga, descricao_localizacao,
-                        ultima_atualizacao, localizacao_x, localizacao_y
-                    FROM motos_patio 
-                    ORDER BY status, bateria DESC
-                """)
-            
-            motos = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            logger.info(
-                "Motos listadas com sucesso",
-                total=len(motos),
-                status_filter=status_filter
-            )
-            
-            return motos
-            
-        except sqlite3.Error as e:
-            logger.error("Erro ao listar motos", error=e, db_path=self.db_path)
-            raise
+        _, fleet = self.get_fleet_snapshot()
+        
+        if status_filter:
+            fleet = [moto for moto in fleet if moto["status"] in status_filter]
+        
+        if columns:
+            keep = list(dict.fromkeys([*columns, "status"]))
+            motos = [{column: moto.get(column) for column in keep} for moto in fleet]
+        else:
+            motos = [dict(moto) for moto in fleet]
+        
+        logger.info(
+            "Motos listadas com sucesso",
+            total=len(motos),
+            status_filter=status_filter
+        )
+        
+        return motos
     
     def find_by_placa(self, placa: str) -> Optional[Dict[str, Any]]:
         """
@@ -91,23 +148,20 @@ class MotoService:
             Dados da moto ou None se não encontrada
         """
         try:
-            placa = placa.strip().upper()
-            
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT 
-                    id, modelo, placa, status, bateria, 
-                    localizacao_x, localizacao_y, zona,
-                    endereco, setor, andar, vaga, descricao_localizacao,
-                    ultima_atualizacao, em_uso_por
-                FROM motos_patio 
-                WHERE UPPER(placa) = ?
-            """, (placa,))
-            
-            row = cursor.fetchone()
-            conn.close()
+            with self._get_connection() as conn:
+                # Coluna gerada indexada: busca O(log n); em colisão de placas
+                # normalizadas, vale a moto atualizada mais recentemente
+                row = conn.execute("""
+                    SELECT 
+                        id, modelo, placa, status, bateria, 
+                        localizacao_x, localizacao_y, zona,
+                        endereco, setor, andar, vaga, descricao_localizacao,
+                        ultima_atualizacao, em_uso_por
+                    FROM motos_patio 
+                    WHERE placa_normalizada = ?
+                    ORDER BY ultima_atualizacao DESC, id
+                    LIMIT 1
+                """, (self.normalize_placa(placa),)).fetchone()
             
             if not row:
                 logger.warning("Moto não encontrada", placa=placa)
@@ -178,41 +232,39 @@ class MotoService:
             ValueError: Se moto não disponível
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Atualiza status da moto
-            cursor.execute("""
-                UPDATE motos_patio 
-                SET status = 'em_uso', 
-                    em_uso_por = ?, 
-                    ultima_atualizacao = ?
-                WHERE id = ? AND status = 'disponivel'
-            """, (usuario_id, datetime.now().isoformat(), moto_id))
-            
-            if cursor.rowcount == 0:
-                conn.close()
-                logger.warning(
-                    "Tentativa de reservar moto indisponível",
-                    moto_id=moto_id,
-                    usuario_id=usuario_id
-                )
-                raise ValueError("Moto não disponível para reserva")
-            
-            # Registra histórico
-            import uuid
-            cursor.execute("""
-                INSERT INTO historico_uso (id, moto_id, usuario_id, inicio_uso)
-                VALUES (?, ?, ?, ?)
-            """, (
-                str(uuid.uuid4()),
-                moto_id,
-                usuario_id,
-                datetime.now().isoformat()
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Atualiza status da moto
+                cursor.execute("""
+                    UPDATE motos_patio 
+                    SET status = 'em_uso', 
+                        em_uso_por = ?, 
+                        ultima_atualizacao = ?
+                    WHERE id = ? AND status = 'disponivel'
+                """, (usuario_id, datetime.now().isoformat(), moto_id))
+                
+                if cursor.rowcount == 0:
+                    logger.warning(
+                        "Tentativa de reservar moto indisponível",
+                        moto_id=moto_id,
+                        usuario_id=usuario_id
+                    )
+                    raise ValueError("Moto não disponível para reserva")
+                
+                # Registra histórico
+                import uuid
+                cursor.execute("""
+                    INSERT INTO historico_uso (id, moto_id, usuario_id, inicio_uso)
+                    VALUES (?, ?, ?, ?)
+                """, (
+                    str(uuid.uuid4()),
+                    moto_id,
+                    usuario_id,
+                    datetime.now().isoformat()
+                ))
+                
+                conn.commit()
             
             logger.info(
                 "Moto reservada com sucesso",
@@ -238,40 +290,25 @@ class MotoService:
         Returns:
             Dicionário com estatísticas
         """
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Query otimizada com agregação
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status = 'disponivel' THEN 1 ELSE 0 END) as disponiveis,
-                    SUM(CASE WHEN status = 'em_uso' THEN 1 ELSE 0 END) as em_uso,
-                    SUM(CASE WHEN status = 'manutencao' THEN 1 ELSE 0 END) as manutencao,
-                    AVG(bateria) as bateria_media,
-                    MIN(bateria) as bateria_minima,
-                    MAX(bateria) as bateria_maxima
-                FROM motos_patio
-            """)
-            
-            row = cursor.fetchone()
-            conn.close()
-            
-            stats = {
-                "total": row["total"],
-                "disponiveis": row["disponiveis"],
-                "em_uso": row["em_uso"],
-                "manutencao": row["manutencao"],
-                "bateria_media": round(row["bateria_media"] or 0, 2),
-                "bateria_minima": row["bateria_minima"] or 0,
-                "bateria_maxima": row["bateria_maxima"] or 0,
-            }
-            
-            logger.debug("Estatísticas calculadas", **stats)
-            
-            return stats
-            
-        except sqlite3.Error as e:
-            logger.error("Erro ao calcular estatísticas", error=e)
-            raise
+        _, fleet = self.get_fleet_snapshot()
+        
+        # Calculadas sobre o snapshot em memória (mesma semântica do SQL:
+        # AVG/MIN/MAX ignoram bateria nula)
+        baterias = [moto["bateria"] for moto in fleet if moto["bateria"] is not None]
+        por_status: Dict[str, int] = {}
+        for moto in fleet:
+            por_status[moto["status"]] = por_status.get(moto["status"], 0) + 1
+        
+        stats = {
+            "total": len(fleet),
+            "disponiveis": por_status.get("disponivel", 0),
+            "em_uso": por_status.get("em_uso", 0),
+            "manutencao": por_status.get("manutencao", 0),
+            "bateria_media": round(sum(baterias) / len(baterias), 2) if baterias else 0,
+            "bateria_minima": min(baterias, default=0),
+            "bateria_maxima": max(baterias, default=0),
+        }
+        
+        logger.debug("Estatísticas calculadas", **stats)
+        
+        return stats
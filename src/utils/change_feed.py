@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Change Feed - Deltas do banco para os clientes conectados via SSE
+Um watcher por processo consulta as versões de data_versions (incrementadas
+por trigger em qualquer worker) e só relê a tabela que mudou, publicando
+apenas o que mudou: moto atualizada/removida, alerta criado/resolvido e
+heartbeat de dispositivo. O custo do banco independe do número de clientes.
+"""
+
+import asyncio
+import itertools
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.constants import CHANGE_FEED_POLL_SECONDS, CHANGE_FEED_QUEUE_SIZE
+from src.utils.db_connection import get_connection_manager
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+WATCHED_TABLES = ("motos_patio", "alertas", "dispositivos_iot")
+
+# Evento enviado a um cliente lento cuja fila encheu: ele deve recarregar tudo
+RESYNC_EVENT = "resync"
+
+Event = Tuple[int, str, Dict[str, Any]]
+
+
+class AsyncSubscriber:
+    """
+    Assinante para handlers asyncio (modo ASGI)
+
+    O watcher roda em uma thread: a entrega é agendada no event loop do
+    cliente, que não ocupa nenhuma thread enquanto espera eventos.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = CHANGE_FEED_QUEUE_SIZE):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def put_nowait(self, item: Event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, item)
+        except RuntimeError:
+            # Event loop já encerrado: o cliente será removido pelo handler
+            pass
+
+    def _put(self, item: Event):
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            item = (item[0], RESYNC_EVENT, {})
+        self.queue.put_nowait(item)
+
+    async def get(self) -> Event:
+        return await self.queue.get()
+
+
+class ChangeFeed:
+    """Pub/sub em processo alimentado pelas versões das tabelas"""
+
+    def __init__(
+        self,
+        db_path: str,
+        poll_interval: float = CHANGE_FEED_POLL_SECONDS,
+        queue_size: int = CHANGE_FEED_QUEUE_SIZE,
+    ):
+        self.db_path = db_path
+        self.db = get_connection_manager(db_path)
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._subscribers: List[Any] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._thread: Optional[threading.Thread] = None
+        self._versions: Optional[Dict[str, int]] = None
+        self._motos: Dict[str, Dict[str, Any]] = {}
+        self._devices: Dict[str, Dict[str, Any]] = {}
+        self._alert_rowid = 0
+        self._active_alerts: Set[str] = set()
+
+    # ------------------------------------------------------------------
+    # Assinantes
+    # ------------------------------------------------------------------
+
+    def subscribe(self, subscriber: Optional[Any] = None) -> Any:
+        """
+        Registra um cliente e inicia o watcher se ele estiver parado
+
+        Args:
+            subscriber: Fila do cliente (padrão: queue.Queue limitada);
+                qualquer objeto com put_nowait, ex.: AsyncSubscriber
+        """
+        if subscriber is None:
+            subscriber = queue.Queue(maxsize=self.queue_size)
+        watcher = None
+        with self._lock:
+            self._subscribers.append(subscriber)
+            if self._thread is None:
+                watcher = self._thread = threading.Thread(
+                    target=self._run, name="change-feed", daemon=True
+                )
+
+        if watcher is not None:
+            # Estado de referência registrado antes de o cliente receber algo
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error("Erro no change feed", error=e)
+            watcher.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Any):
+        """Remove o cliente; o watcher para quando não resta nenhum"""
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """Entrega um evento a todos os clientes conectados"""
+        item: Event = (next(self._ids), event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(item)
+            except queue.Full:
+                # Cliente não acompanha o ritmo: descarta o atrasado e pede
+                # que ele recarregue o estado completo
+                self._drain(subscriber)
+                subscriber.put_nowait((next(self._ids), RESYNC_EVENT, {}))
+
+    @staticmethod
+    def _drain(subscriber: queue.Queue):
+        try:
+            while True:
+                subscriber.get_nowait()
+        except queue.Empty:
+            pass
+
+    # ------------------------------------------------------------------
+    # Watcher
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        logger.info("Change feed iniciado")
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if not self._subscribers:
+                    # Próximo subscribe reinicia a partir de um estado novo
+                    self._thread = None
+                    self._versions = None
+                    break
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error("Erro no change feed", error=e)
+        logger.info("Change feed parado (sem clientes)")
+
+    def poll(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Compara as versões das tabelas e publica os deltas
+
+        A primeira chamada apenas registra o estado atual (sem eventos).
+
+        Returns:
+            Eventos publicados nesta chamada, na ordem de envio
+        """
+        with self.db.connection() as conn:
+            placeholders = ",".join("?" * len(WATCHED_TABLES))
+            rows = conn.execute(
+                f"SELECT tabela, versao FROM data_versions WHERE tabela IN ({placeholders})",
+                WATCHED_TABLES,
+            ).fetchall()
+            versions = {table: 0 for table in WATCHED_TABLES}
+            versions.update({row[0]: row[1] for row in rows})
+
+            if self._versions is None:
+                self._versions = versions
+                self._motos = self._load_motos()
+                self._devices = self._load_devices(conn)
+                self._alert_rowid, self._active_alerts = self._alert_marks(conn)
+                return []
+
+            changed = {t for t in WATCHED_TABLES if versions[t] != self._versions[t]}
+            self._versions = versions
+            if not changed:
+                return []
+
+            events: List[Tuple[str, Dict[str, Any]]] = []
+            if "motos_patio" in changed:
+                events.extend(self._moto_deltas())
+            if "alertas" in changed:
+                events.extend(self._alert_deltas(conn))
+            if "dispositivos_iot" in changed:
+                events.extend(self._device_deltas(conn))
+
+        for event, data in events:
+            self.publish(event, data)
+        return events
+
+    def _load_motos(self) -> Dict[str, Dict[str, Any]]:
+        # Reaproveita o snapshot da frota (relido uma vez por versão)
+        from src.services.moto_service import MotoService
+
+        _, fleet = MotoService(self.db_path).get_fleet_snapshot()
+        return {moto["id"]: moto for moto in fleet}
+
+    def _moto_deltas(self) -> List[Tuple[str, Dict[str, Any]]]:
+        motos = self._load_motos()
+        events = [
+            ("moto.updated", moto)
+            for moto_id, moto in motos.items()
+            if self._motos.get(moto_id) != moto
+        ]
+        events.extend(
+            ("moto.removed", {"id": moto_id})
+            for moto_id in self._motos.keys() - motos.keys()
+        )
+        self._motos = motos
+        return events
+
+    @staticmethod
+    def _active_alert_ids(conn) -> Set[str]:
+        rows = conn.execute("SELECT id FROM alertas WHERE ativo = 1").fetchall()
+        return {row[0] for row in rows}
+
+    def _alert_marks(self, conn) -> Tuple[int, Set[str]]:
+        # rowid é atribuído sob o lock de escrita do SQLite: cresce na ordem
+        # de commit, ao contrário de criado_em (relógio de quem insere)
+        row = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM alertas").fetchone()
+        return row[0], self._active_alert_ids(conn)
+
+    def _alert_deltas(self, conn) -> List[Tuple[str, Dict[str, Any]]]:
+        events: List[Tuple[str, Dict[str, Any]]] = []
+
+        created = conn.execute(
+            "SELECT rowid AS _seq, * FROM alertas WHERE rowid > ? ORDER BY rowid",
+            (self._alert_rowid,),
+        ).fetchall()
+        known = set(self._active_alerts)
+        for row in created:
+            alert = dict(row)
+            self._alert_rowid = alert.pop("_seq")
+            events.append(("alert.created", alert))
+            known.add(alert["id"])
+
+        # Resolvidos: ativos na consulta anterior (ou criados agora) que
+        # deixaram de estar ativos, independente do horário registrado
+        active = self._active_alert_ids(conn)
+        self._active_alerts = active
+        gone = known - active
+        if gone:
+            placeholders = ",".join("?" * len(gone))
+            resolved = conn.execute(
+                f"SELECT * FROM alertas WHERE ativo = 0 AND id IN ({placeholders}) "
+                "ORDER BY resolvido_em, id",
+                tuple(gone),
+            ).fetchall()
+            events.extend(("alert.resolved", dict(row)) for row in resolved)
+
+        return events
+
+    @staticmethod
+    def _load_devices(conn) -> Dict[str, Dict[str, Any]]:
+        rows = conn.execute("""
+            SELECT id, nome, tipo, status, localizacao, ultima_comunicacao, dados_sensor
+            FROM dispositivos_iot
+        """).fetchall()
+        return {row["id"]: dict(row) for row in rows}
+
+    def _device_deltas(self, conn) -> List[Tuple[str, Dict[str, Any]]]:
+        devices = self._load_devices(conn)
+        events = [
+            ("device.heartbeat", device)
+            for device_id, device in devices.items()
+            if self._devices.get(device_id) != device
+        ]
+        self._devices = devices
+        return events
+
+
+_feeds: Dict[str, ChangeFeed] = {}
+_feeds_lock = threading.Lock()
+
+
+def get_change_feed(db_path: str) -> ChangeFeed:
+    """Retorna o ChangeFeed do banco (um watcher por processo e por banco)"""
+    with _feeds_lock:
+        if db_path not in _feeds:
+            _feeds[db_path] = ChangeFeed(db_path)
+        return _feeds[db_path]
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Compressão de respostas - gzip/brotli negociados por Accept-Encoding
+Aplicada às respostas JSON/texto de /api/* acima de um tamanho mínimo, com
+níveis escolhidos para latência. Corpos comprimidos de respostas com ETag
+ficam em um cache LRU: o mesmo conteúdo não é recomprimido a cada polling.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from flask import Flask, Response, request
+
+from src.config import Config
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "text/")
+ENCODINGS = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+CACHE_ENTRIES = 256
+
+
+class CompressedBodyCache:
+    """LRU de corpos comprimidos por (ETag, encoding)"""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, encoding: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get((etag, encoding))
+            if body is not None:
+                self._entries.move_to_end((etag, encoding))
+            return body
+
+    def put(self, etag: str, encoding: str, body: bytes):
+        with self._lock:
+            self._entries[(etag, encoding)] = body
+            self._entries.move_to_end((etag, encoding))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Comprime com o encoding negociado ("br" ou "gzip")"""
+    if encoding == "br":
+        quality = Config.BROTLI_QUALITY if level is None else level
+        return brotli.compress(data, quality=quality)
+    level = Config.GZIP_LEVEL if level is None else level
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag da representação comprimida (distinta da original)"""
+    return f"{etag}-{encoding}"
+
+
+def init_compression(app: Flask, min_bytes: Optional[int] = None):
+    """
+    Registra a compressão das respostas de /api/* no app
+
+    Args:
+        app: Aplicação Flask
+        min_bytes: Tamanho mínimo do corpo para comprimir
+            (padrão: COMPRESSION_MIN_BYTES)
+    """
+    threshold = Config.COMPRESSION_MIN_BYTES if min_bytes is None else min_bytes
+    cache = CompressedBodyCache()
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        if (
+            not request.path.startswith("/api/")
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or not response.mimetype.startswith(COMPRESSIBLE_MIMETYPES)
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(ENCODINGS)
+        if encoding is None or response.content_length is None:
+            return response
+        if response.content_length < threshold:
+            return response
+
+        etag, weak = response.get_etag()
+        body = cache.get(etag, encoding) if etag and not weak else None
+        if body is None:
+            body = compress(response.get_data(), encoding)
+            if etag and not weak:
+                cache.put(etag, encoding, body)
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding), weak=weak)
+        return response
+
+    return cache
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+ConnectionManager - Conexões SQLite persistentes por thread
+Cada thread (de cada processo) reutiliza a mesma conexão, já configurada com
+row_factory e pragmas (WAL, busy_timeout, cache, mmap), em vez de abrir o
+arquivo e reler o schema a cada operação. A conexão vive enquanto a thread:
+servidores que criam uma thread por requisição não acumulam conexões.
+"""
+
+import itertools
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from src.constants import (
+    DB_CONNECTION_TIMEOUT,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_JOURNAL_SIZE_LIMIT,
+    SQLITE_MMAP_SIZE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_WAL_AUTOCHECKPOINT_PAGES,
+)
+
+MEMORY_DB = ":memory:"
+_memory_ids = itertools.count()
+
+
+class _ThreadConnection:
+    """Conexão de uma thread; o finalizer a fecha quando a thread termina"""
+
+    __slots__ = ("conn", "pid", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection, pid: int):
+        self.conn = conn
+        self.pid = pid
+
+
+class ConnectionManager:
+    """Fornece uma conexão de longa duração por thread para um banco"""
+
+    def __init__(self, db_path: str, timeout: float = DB_CONNECTION_TIMEOUT):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+        # ":memory:" vira um banco em memória compartilhado entre as threads,
+        # mantido vivo por uma conexão própria enquanto o manager existir
+        self._uri = None
+        self._keeper = None
+        if db_path == MEMORY_DB:
+            self._uri = f"file:visionmoto-mem-{os.getpid()}-{next(_memory_ids)}?mode=memory&cache=shared"
+            self._keeper = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._uri:
+            conn = sqlite3.connect(
+                self._uri, uri=True, timeout=self.timeout, check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        self._apply_pragmas(conn)
+        return conn
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        """
+        Configura a conexão para vários workers no mesmo arquivo
+
+        Em WAL leitores não esperam escritores; o checkpoint automático a cada
+        SQLITE_WAL_AUTOCHECKPOINT_PAGES páginas e o journal_size_limit impedem
+        que o arquivo -wal cresça sem limite.
+        """
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        if self._uri:
+            return
+
+        conn.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+        conn.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        conn.execute(f"PRAGMA wal_autocheckpoint = {SQLITE_WAL_AUTOCHECKPOINT_PAGES}")
+        conn.execute(f"PRAGMA journal_size_limit = {SQLITE_JOURNAL_SIZE_LIMIT}")
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Retorna a conexão da thread atual, criando-a na primeira chamada
+
+        Transações deixadas abertas por uma operação anterior que falhou
+        são desfeitas antes de a conexão ser reutilizada. Prefira
+        connection(): a conexão vive com a thread, e uma transação aberta
+        em um caminho de erro prenderia o lock de escrita até a próxima
+        chamada da mesma thread.
+        """
+        holder = getattr(self._local, "holder", None)
+        # Após fork, conexões herdadas do processo pai não podem ser usadas
+        if holder is None or holder.pid != os.getpid():
+            conn = self._connect()
+            holder = _ThreadConnection(conn, os.getpid())
+            self._local.holder = holder
+            with self._lock:
+                self._connections.append(conn)
+            # O threading.local descarta o holder quando a thread termina
+            weakref.finalize(holder, self._discard, conn, holder.pid)
+        elif holder.conn.in_transaction:
+            holder.conn.rollback()
+        return holder.conn
+
+    def _discard(self, conn: sqlite3.Connection, pid: int):
+        """Fecha a conexão de uma thread encerrada e a remove da lista"""
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        # Conexão herdada via fork pertence ao processo pai: não é fechada aqui
+        if pid != os.getpid():
+            return
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @property
+    def open_connections(self) -> int:
+        """Número de conexões por thread abertas no momento"""
+        with self._lock:
+            return len(self._connections)
+
+    def release(self, conn: sqlite3.Connection):
+        """Devolve a conexão: desfaz o que não foi commitado e a mantém aberta"""
+        if conn.in_transaction:
+            conn.rollback()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager sobre acquire/release"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def dedicated_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Conexão exclusiva, fechada ao sair do bloco
+
+        Para leituras longas (ex.: exportação em streaming) que manteriam
+        um cursor aberto entre yields e não devem ocupar a conexão da thread.
+        """
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def checkpoint(self, mode: str = "PASSIVE"):
+        """
+        Executa checkpoint do WAL (PASSIVE, FULL, RESTART ou TRUNCATE)
+
+        Returns:
+            (ocupado, páginas no WAL, páginas transferidas)
+        """
+        if self._uri:
+            return (0, 0, 0)
+        with self.connection() as conn:
+            return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+
+    def backup(self, target_path: str):
+        """Cópia consistente do banco (inclui o conteúdo ainda no WAL)"""
+        with self.connection() as conn:
+            target = sqlite3.connect(target_path)
+            try:
+                conn.backup(target)
+            finally:
+                target.close()
+
+    def close_all(self):
+        """Fecha todas as conexões abertas por este manager"""
+        if self._connections and not self._uri:
+            try:
+                # Incorpora o WAL ao arquivo principal ao encerrar
+                self.checkpoint("TRUNCATE")
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: str) -> ConnectionManager:
+    """
+    Retorna o ConnectionManager do banco (singleton por caminho)
+
+    Args:
+        db_path: Caminho do arquivo SQLite (ou ":memory:")
+
+    Returns:
+        ConnectionManager compartilhado por serviços e rotas
+    """
+    with _managers_lock:
+        if db_path not in _managers:
+            _managers[db_path] = ConnectionManager(db_path)
+        return _managers[db_path]
+
+
+def reset_connection_manager(db_path: str):
+    """Fecha e descarta o manager do banco (um ":memory:" novo começa vazio)"""
+    with _managers_lock:
+        manager = _managers.pop(db_path, None)
+    if manager is not None:
+        manager.close_all()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+GET condicional - ETag derivada da versão dos dados
+Listagens consultadas por polling respondem 304 Not Modified sem executar a
+view nem serializar o corpo enquanto as tabelas de origem não mudarem.
+"""
+
+import hashlib
+from functools import wraps
+from typing import Callable
+
+from flask import current_app, request
+
+from src.utils.db_connection import get_connection_manager
+from src.utils.migrations import get_data_version
+
+
+def compute_etag(*tables: str) -> str:
+    """
+    ETag forte da requisição atual para os dados das tabelas informadas
+
+    Combina endpoint, query string e as versões das tabelas: qualquer escrita
+    nelas (de qualquer worker) gera uma ETag nova.
+    """
+    db = get_connection_manager(current_app.config.get('DATABASE_PATH', 'visionmoto_integration.db'))
+    with db.connection() as conn:
+        versions = [get_data_version(conn, table) for table in tables]
+
+    h = hashlib.blake2b(digest_size=12)
+    h.update(request.endpoint.encode())
+    h.update(b"\0")
+    h.update(request.query_string)
+    for table, version in zip(tables, versions):
+        h.update(f"\0{table}={version}".encode())
+    return h.hexdigest()
+
+
+def conditional_get(*tables: str) -> Callable:
+    """
+    Decorator de rotas de listagem: ETag + If-None-Match
+
+    Apenas GET/HEAD são afetados; outros métodos da mesma rota passam direto.
+
+    Args:
+        tables: Tabelas das quais a resposta depende
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+
+            etag = compute_etag(*tables)
+            # Aceita também a ETag da versão comprimida (ex.: "<etag>-gzip")
+            if request.if_none_match.star_tag or any(
+                tag == etag or tag.startswith(f"{etag}-")
+                for tag in request.if_none_match.as_set()
+            ):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+
+        return wrapper
+    return decorator
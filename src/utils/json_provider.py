@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+FastJSONProvider - Serialização JSON das respostas Flask
+Usa orjson quando instalado (codifica direto para bytes) e o json da
+biblioteca padrão como fallback, com o mesmo tratamento de tipos nos dois
+casos: datetime/date em ISO 8601, Enums dos schemas pelo valor, UUID,
+dataclasses, modelos pydantic e escalares/arrays NumPy.
+"""
+
+import dataclasses
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from flask.json.provider import JSONProvider
+from pydantic import BaseModel
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Converte tipos que o encoder não conhece nativamente"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # Escalares e arrays NumPy (sem importar numpy no backend)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serializa para bytes UTF-8 (sem passar por str quando há orjson)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(
+        obj, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONProvider(JSONProvider):
+    """Provider JSON do Flask (jsonify, request.get_json, app.json)"""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs or not ORJSON_AVAILABLE:
+            kwargs.setdefault("default", _default)
+            kwargs.setdefault("ensure_ascii", False)
+            kwargs.setdefault("separators", (",", ":"))
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode("utf-8")
+
+    def loads(self, s: "str | bytes", **kwargs: Any) -> Any:
+        # orjson.JSONDecodeError herda de ValueError: get_json continua
+        # respondendo 400 para JSON inválido
+        if kwargs or not ORJSON_AVAILABLE:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
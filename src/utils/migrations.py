@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Migrações de schema - Revisões incrementais controladas por PRAGMA user_version
+Executadas pelos dois caminhos de inicialização (create_app e integration_api)
+depois do CREATE TABLE IF NOT EXISTS das tabelas base.
+"""
+
+import sqlite3
+from typing import List, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Mesma normalização de MotoService.normalize_placa
+PLACA_NORMALIZADA_SQL = "UPPER(REPLACE(REPLACE(TRIM(placa), '-', ''), ' ', ''))"
+
+
+def _version_triggers(table: str) -> List[str]:
+    """Triggers que incrementam o contador de versão da tabela a cada escrita"""
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_versao_{event.lower()}
+        AFTER {event} ON {table}
+        BEGIN
+            UPDATE data_versions SET versao = versao + 1 WHERE tabela = '{table}';
+        END
+        """
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+# (versão, descrição, comandos)
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (
+        1,
+        "Placa normalizada e índices das consultas mais frequentes",
+        [
+            f"""
+            ALTER TABLE motos_patio ADD COLUMN placa_normalizada TEXT
+            GENERATED ALWAYS AS ({PLACA_NORMALIZADA_SQL}) VIRTUAL
+            """,
+            # Não único: placas já gravadas podem colidir após a normalização
+            # (ex.: "ABC-1234" e "abc1234"); as colisões são reportadas
+            """
+            CREATE INDEX IF NOT EXISTS idx_motos_placa_normalizada
+            ON motos_patio (placa_normalizada)
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_alertas_ativo_criado ON alertas (ativo, criado_em)",
+            "CREATE INDEX IF NOT EXISTS idx_alertas_ativo_resolvido ON alertas (ativo, resolvido_em)",
+            "CREATE INDEX IF NOT EXISTS idx_historico_inicio ON historico_uso (inicio_uso)",
+            "CREATE INDEX IF NOT EXISTS idx_historico_moto ON historico_uso (moto_id)",
+        ],
+    ),
+    (
+        2,
+        "Índices de paginação por cursor (valor de ordenação, id) dos alertas",
+        [
+            "DROP INDEX IF EXISTS idx_alertas_ativo_criado",
+            "DROP INDEX IF EXISTS idx_alertas_ativo_resolvido",
+            "CREATE INDEX IF NOT EXISTS idx_alertas_ativo_criado ON alertas (ativo, criado_em, id)",
+            "CREATE INDEX IF NOT EXISTS idx_alertas_ativo_resolvido ON alertas (ativo, resolvido_em, id)",
+            "CREATE INDEX IF NOT EXISTS idx_alertas_criado ON alertas (criado_em, id)",
+        ],
+    ),
+    (
+        3,
+        "Contador de versão da frota (invalidação de cache entre workers)",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS data_versions (
+                tabela TEXT PRIMARY KEY,
+                versao INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+            "INSERT OR IGNORE INTO data_versions (tabela, versao) VALUES ('motos_patio', 0)",
+            *_version_triggers("motos_patio"),
+        ],
+    ),
+    (
+        4,
+        "Contadores de versão de alertas e dispositivos (ETag das listagens)",
+        [
+            "INSERT OR IGNORE INTO data_versions (tabela, versao) VALUES ('alertas', 0)",
+            "INSERT OR IGNORE INTO data_versions (tabela, versao) VALUES ('dispositivos_iot', 0)",
+            *_version_triggers("alertas"),
+            *_version_triggers("dispositivos_iot"),
+        ],
+    ),
+    (
+        5,
+        "Índice por data das detecções (exportação por período)",
+        [
+            "CREATE INDEX IF NOT EXISTS idx_detections_created ON detections (created_at)",
+        ],
+    ),
+    (
+        6,
+        "URL da evidência (snapshot) do evento que gerou o alerta",
+        [
+            "ALTER TABLE alertas ADD COLUMN imagem_url TEXT",
+        ],
+    ),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Versão atual do schema gravada no banco"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def get_data_version(conn: sqlite3.Connection, table: str) -> int:
+    """
+    Versão atual dos dados da tabela (incrementada por trigger a cada escrita)
+
+    Leitura por chave primária: barata o bastante para ser feita a cada
+    requisição por qualquer worker.
+    """
+    row = conn.execute(
+        "SELECT versao FROM data_versions WHERE tabela = ?", (table,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def find_placa_collisions(conn: sqlite3.Connection) -> List[Tuple[str, List[str]]]:
+    """
+    Placas normalizadas compartilhadas por mais de uma moto
+
+    Returns:
+        (placa normalizada, IDs das motos) de cada colisão
+    """
+    rows = conn.execute("""
+        SELECT placa_normalizada, GROUP_CONCAT(id)
+        FROM motos_patio
+        WHERE placa_normalizada IS NOT NULL
+        GROUP BY placa_normalizada
+        HAVING COUNT(*) > 1
+    """).fetchall()
+    return [(row[0], sorted(row[1].split(","))) for row in rows]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Aplica as migrações pendentes, cada uma em sua própria transação
+
+    BEGIN IMMEDIATE serializa workers que inicializam ao mesmo tempo; a
+    versão é relida dentro da transação para não aplicar nada duas vezes.
+
+    Returns:
+        Versão do schema após as migrações
+    """
+    version = get_schema_version(conn)
+
+    for target, description, statements in MIGRATIONS:
+        if target <= version:
+            continue
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = get_schema_version(conn)
+            if target <= version:
+                conn.rollback()
+                continue
+
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error("Falha ao aplicar migração", version=target, error=e)
+            raise
+
+        version = target
+        logger.info("Migração aplicada", version=target, description=description)
+
+        if target == 1:
+            for placa, moto_ids in find_placa_collisions(conn):
+                logger.warning(
+                    "Placas duplicadas após normalização", placa=placa, motos=moto_ids
+                )
+
+    return version
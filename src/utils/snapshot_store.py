@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+SnapshotStore - Evidências JPEG endereçadas por conteúdo
+A chave é o hash dos pixels (calculado na hora), então a URL da evidência
+existe antes do JPEG ser codificado; a codificação roda em um pool de
+threads. O diretório tem tamanho máximo com remoção LRU por mtime.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.config import Config
+from src.constants import SNAPSHOT_MAX_PENDING
+
+logger = logging.getLogger(__name__)
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+# Após estourar o limite, remove até ficar abaixo desta fração
+EVICTION_TARGET = 0.9
+
+
+class SnapshotStore:
+    """Armazenamento local de recortes de evidência com limite de tamanho"""
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        jpeg_quality: int = 85,
+        workers: int = 2,
+        max_pending: int = SNAPSHOT_MAX_PENDING,
+    ):
+        self.root = Path(root or os.getenv("SNAPSHOT_DIR", Config.SNAPSHOT_DIR))
+        self.max_bytes = max_bytes or Config.SNAPSHOT_MAX_MB * 1024 * 1024
+        self.jpeg_quality = jpeg_quality
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self._pending = 0
+        self.dropped = 0
+
+    # ==================== CHAVES ====================
+
+    @staticmethod
+    def is_valid_key(key: str) -> bool:
+        return bool(KEY_PATTERN.match(key))
+
+    def path_for(self, key: str) -> Path:
+        """Arquivo da evidência (subdiretório pelos 2 primeiros caracteres)"""
+        return self.root / key[:2] / f"{key}.jpg"
+
+    @staticmethod
+    def content_key(image: np.ndarray) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(str(image.shape).encode())
+        h.update(np.ascontiguousarray(image).data)
+        return h.hexdigest()
+
+    # ==================== ESCRITA ====================
+
+    @staticmethod
+    def crop(frame: np.ndarray, bbox: Sequence[int], margin: float = 0.15) -> np.ndarray:
+        """Recorta a bbox com margem (cópia, independente do frame)"""
+        height, width = frame.shape[:2]
+        x1, y1, x2, y2 = bbox
+        mx = int((x2 - x1) * margin)
+        my = int((y2 - y1) * margin)
+        x1, y1 = max(0, x1 - mx), max(0, y1 - my)
+        x2, y2 = min(width, x2 + mx), min(height, y2 + my)
+        return frame[y1:y2, x1:x2].copy()
+
+    def submit(self, image: np.ndarray) -> Optional[str]:
+        """
+        Agenda a gravação da imagem e retorna a chave imediatamente
+
+        A imagem passa a pertencer ao store. Conteúdo repetido não é
+        recodificado: apenas tem o mtime (recência LRU) atualizado. Com
+        max_pending codificações na fila o recorte é descartado (None),
+        para que a fila não cresça quando a codificação não acompanha.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return None
+            self._pending += 1
+
+        key = self.content_key(image)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="snapshot"
+            )
+        self._executor.submit(self._write, key, image)
+        return key
+
+    def _write(self, key: str, image: np.ndarray):
+        try:
+            self._encode(key, image)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _encode(self, key: str, image: np.ndarray):
+        import cv2
+
+        path = self.path_for(key)
+        if path.exists():
+            os.utime(path)
+            return
+
+        ok, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            logger.warning(f"Falha ao codificar evidência {key}")
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(buf.tobytes())
+        os.replace(tmp, path)
+        self._account(len(buf))
+
+    def _account(self, nbytes: int):
+        """Atualiza o total em disco e dispara a remoção LRU ao passar do limite"""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._total_bytes += nbytes
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """Lista (path, tamanho, mtime) de todas as evidências"""
+        entries = []
+        for path in self.root.glob("*/*.jpg"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        # Recência vem do mtime: o backend o atualiza a cada leitura (outro processo)
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICTION_TARGET
+        removed = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._total_bytes = total
+        logger.info(f"Evidências: {removed} removidas (LRU), {total} bytes em disco")
+
+    # ==================== LEITURA ====================
+
+    def open(self, key: str) -> Optional[Path]:
+        """Caminho da evidência para leitura, marcando o acesso (LRU)"""
+        if not self.is_valid_key(key):
+            return None
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def close(self, wait: bool = True):
+        """Aguarda as codificações pendentes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+def snapshot_url(base_url: str, key: str) -> str:
+    """URL pública da evidência no backend"""
+    return f"{base_url.rstrip('/')}/api/snapshots/{key}.jpg"
@@ -138,6 +138,139 @@ class TestMobileEndpoints:
         )
         assert response.status_code == 400
 
+    def test_fleet_snapshot_invalidated_on_write(self, app):
+        """Testa que o snapshot da frota só é recarregado após escrita"""
+        from services.moto_service import MotoService
+
+        service = MotoService(app.config["DATABASE_PATH"])
+        version, fleet = service.get_fleet_snapshot()
+        assert service.get_fleet_snapshot()[1] is fleet
+
+        moto = next(m for m in fleet if m["status"] == "disponivel")
+        service.reservar_moto(moto["id"], "USER001")
+
+        new_version, new_fleet = service.get_fleet_snapshot()
+        assert new_version > version
+        reserved = next(m for m in new_fleet if m["id"] == moto["id"])
+        assert reserved["status"] == "em_uso"
+
+    def test_alertas_cursor_pagination(self, app, client):
+        """Testa paginação por cursor sem repetir nem pular alertas"""
+        from services.alert_service import AlertService
+
+        service = AlertService(app.config["DATABASE_PATH"])
+        created = {service.create_alert("TESTE", f"Alerta {i}") for i in range(5)}
+
+        seen = []
+        cursor = None
+        for _ in range(5):
+            url = "/api/mobile/alertas?status=ALL&limit=2"
+            if cursor:
+                url += f"&cursor={cursor}"
+            data = json.loads(client.get(url).data)
+            seen.extend(item["id"] for item in data["items"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(seen) == len(set(seen))
+        assert created <= set(seen)
+
+    def test_alertas_cursor_pagination_null_sort_value(self, app, client):
+        """Testa que alertas sem data de ordenação (NULL) são paginados até o fim"""
+        from services.alert_service import AlertService
+
+        service = AlertService(app.config["DATABASE_PATH"])
+        created = [service.create_alert("TESTE", f"Alerta {i}") for i in range(5)]
+        conn = service.db.acquire()
+        conn.executemany(
+            "UPDATE alertas SET criado_em = NULL WHERE id = ?", [(i,) for i in created[:3]]
+        )
+        conn.commit()
+
+        seen = []
+        cursor = None
+        for _ in range(50):
+            url = "/api/mobile/alertas?status=ALL&limit=2"
+            if cursor:
+                url += f"&cursor={cursor}"
+            response = client.get(url)
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            seen.extend(item["id"] for item in data["items"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(seen) == len(set(seen))
+        assert set(created) <= set(seen)
+        # NULLs por último
+        assert set(seen[-3:]) == set(created[:3])
+
+    def test_alertas_cursor_queries_seek_index(self, app):
+        """Testa que cada consulta de página é uma busca no índice, não um SCAN"""
+        from services.alert_service import AlertService
+
+        service = AlertService(app.config["DATABASE_PATH"])
+        created = [service.create_alert("TESTE", f"Alerta {i}") for i in range(4)]
+        conn = service.db.acquire()
+        conn.execute("UPDATE alertas SET criado_em = NULL WHERE id = ?", (created[0],))
+        conn.commit()
+
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            for status in ("OPEN", None):
+                cursor = None
+                while True:
+                    _, cursor = service.get_alerts_page(status=status, limit=1, cursor=cursor)
+                    if cursor is None:
+                        break
+        finally:
+            conn.set_trace_callback(None)
+
+        selects = [sql for sql in statements if "FROM alertas" in sql]
+        assert any("IS NULL" in sql for sql in selects)
+        for sql in selects:
+            plan = " ".join(row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            assert plan.startswith("SEARCH"), (sql, plan)
+
+    def test_alertas_invalid_cursor(self, client):
+        """Testa cursor inválido"""
+        response = client.get("/api/mobile/alertas?cursor=invalido")
+        assert response.status_code == 400
+
+    def test_list_motos_sparse_fields(self, client):
+        """Testa listagem apenas com os campos pedidos"""
+        response = client.get("/api/mobile/motos?fields=id,placa,localizacao_x")
+        assert response.status_code == 200
+
+        data = json.loads(response.data)
+        assert data["total"] > 0
+        assert all(set(m) == {"id", "placa", "localizacao_x"} for m in data["motos"])
+
+        response = client.get("/api/mobile/motos?fields=id,senha")
+        assert response.status_code == 400
+
+    def test_motos_conditional_get(self, app, client):
+        """Testa 304 enquanto a frota não muda e ETag nova após escrita"""
+        from services.moto_service import MotoService
+
+        response = client.get("/api/mobile/motos")
+        etag = response.headers["ETag"]
+
+        response = client.get("/api/mobile/motos", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.data == b""
+
+        service = MotoService(app.config["DATABASE_PATH"])
+        moto = service.get_all_motos(status_filter=["disponivel"])[0]
+        service.reservar_moto(moto["id"], "USER001")
+
+        response = client.get("/api/mobile/motos", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
 
 class TestJavaEndpoints:
     """Testes de endpoints Java"""
@@ -162,6 +295,29 @@ class TestJavaEndpoints:
         assert data["success"] is True
         assert "data" in data
     
+    def test_motos_status_sparse_fields(self, client):
+        """Testa ?fields= com os nomes do formato Java"""
+        response = client.get("/api/java/motos/status?fields=motoId,latitude,longitude")
+        assert response.status_code == 200
+
+        data = json.loads(response.data)
+        motos = data["data"]["motos"]
+        assert all(set(m) == {"motoId", "latitude", "longitude"} for m in motos)
+        assert data["data"]["resumo"]["total"] == len(motos)
+    
+    def test_motos_status_em_uso_por(self, app, client):
+        """Testa emUsoPor preenchido para moto reservada (completo e ?fields=)"""
+        from services.moto_service import MotoService
+
+        service = MotoService(app.config["DATABASE_PATH"])
+        moto = service.get_all_motos(status_filter=["disponivel"])[0]
+        service.reservar_moto(moto["id"], "USER001")
+
+        for url in ("/api/java/motos/status", "/api/java/motos/status?fields=motoId,emUsoPor"):
+            motos = json.loads(client.get(url).data)["data"]["motos"]
+            reserved = next(m for m in motos if m["motoId"] == moto["id"])
+            assert reserved["emUsoPor"] == "USER001"
+    
     def test_alertas_get(self, client):
         """Testa GET de alertas Java"""
         response = client.get("/api/java/alertas")
@@ -259,6 +415,118 @@ class TestIoTEndpoints:
         assert response.status_code == 200
         data = json.loads(response.data)
         assert data.get("idempotent") is True
+    
+    def test_evento_image_url_on_alert(self, client):
+        """Testa que a evidência do evento fica no alerta criado por ele"""
+        image_url = "http://localhost:5001/api/snapshots/" + "a" * 32 + ".jpg"
+        response = client.post(
+            "/api/iot/eventos",
+            data=json.dumps({"type": "PARKING_OUT_OF_SPOT", "deviceId": "CAM1", "imageUrl": image_url}),
+            content_type="application/json",
+            headers={"Idempotency-Key": "evt-with-image"}
+        )
+        alert_id = json.loads(response.data)["alertId"]
+        
+        items = json.loads(client.get("/api/mobile/alertas?limit=100").data)["items"]
+        alert = next(item for item in items if item["id"] == alert_id)
+        assert alert["imageUrl"] == image_url
+    
+    def test_eventos_batch(self, client):
+        """Testa lote com eventos novos, repetidos, já existentes e inválidos"""
+        client.post(
+            "/api/iot/eventos",
+            data=json.dumps({"type": "alert"}),
+            content_type="application/json",
+            headers={"Idempotency-Key": "batch-existing"}
+        )
+        
+        events = [
+            {"id": "batch-1", "type": "PARKING_OUT_OF_SPOT", "deviceId": "cam-01"},
+            {"id": "batch-existing", "type": "alert"},
+            {"id": "batch-1", "type": "PARKING_OUT_OF_SPOT"},
+            {"type": "alert"},
+        ]
+        response = client.post(
+            "/api/iot/eventos:batch",
+            data=json.dumps({"events": events}),
+            content_type="application/json"
+        )
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        results = data["results"]
+        assert [r.get("idempotent") for r in results] == [False, True, True, None]
+        assert results[0]["alertId"] == results[2]["alertId"]
+        assert "error" in results[3]
+        assert (data["created"], data["idempotent"], data["failed"]) == (1, 2, 1)
+    
+    def test_eventos_batch_mixed_invalid(self, client):
+        """Testa que eventos malformados são rejeitados um a um e os demais gravados"""
+        events = [
+            {"id": "mixed-1", "type": "PARKING_OUT_OF_SPOT", "metadata": {"slot": "VAGA-07"}},
+            {"id": "mixed-2", "type": "X", "metadata": "oops"},
+            {"id": "mixed-3", "type": 42},
+            {"id": "mixed-4", "deviceId": ["cam-01"]},
+            {"id": "mixed-5", "imageUrl": {"url": "x"}},
+            "não é um objeto",
+            {"id": "mixed-6", "type": "alert", "deviceId": "cam-02"},
+        ]
+        response = client.post(
+            "/api/iot/eventos:batch",
+            data=json.dumps({"events": events}),
+            content_type="application/json"
+        )
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        results = data["results"]
+        assert ["error" in r for r in results] == [False, True, True, True, True, True, False]
+        assert results[1] == {"id": "mixed-2", "error": "metadata deve ser um objeto"}
+        assert (data["created"], data["idempotent"], data["failed"]) == (2, 0, 5)
+        
+        # Evento individual malformado: 400 em vez de 500
+        response = client.post(
+            "/api/iot/eventos",
+            data=json.dumps({"type": "alert", "metadata": "oops"}),
+            content_type="application/json",
+            headers={"Idempotency-Key": "mixed-single"}
+        )
+        assert response.status_code == 400
+        
+        items = json.loads(client.get("/api/mobile/alertas?limit=100").data)["items"]
+        assert {results[0]["alertId"], results[6]["alertId"]} <= {item["id"] for item in items}
+    
+    def test_devices_data_batch(self, client):
+        """Testa telemetria em lote com leitura inválida e dispositivo desconhecido"""
+        readings = [
+            {"device_id": "SENSOR001", "temperature": 25.5, "battery_level": 90},
+            {"device_id": "SENSOR001", "battery_level": 150},
+            {"device_id": "NAO-EXISTE", "humidity": 50},
+        ]
+        response = client.post(
+            "/api/iot/devices/data:batch",
+            data=json.dumps({"readings": readings}),
+            content_type="application/json"
+        )
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["accepted"] == 1
+        assert data["unknown_devices"] == ["NAO-EXISTE"]
+        assert [r["index"] for r in data["rejected"]] == [1]
+        
+        devices = json.loads(client.get("/api/iot/devices").data)["devices"]
+        sensor = next(d for d in devices if d["id"] == "SENSOR001")
+        assert json.loads(sensor["dados_sensor"])["temperature"] == 25.5
+    
+    def test_eventos_batch_invalid(self, client):
+        """Testa lote vazio"""
+        response = client.post(
+            "/api/iot/eventos:batch",
+            data=json.dumps({"events": []}),
+            content_type="application/json"
+        )
+        assert response.status_code == 400
 
 
 class TestDatabaseEndpoints:
@@ -272,6 +540,263 @@ class TestDatabaseEndpoints:
         data = json.loads(response.data)
         assert data["success"] is True
         assert "analytics" in data
+    
+    def test_export_ndjson_and_csv(self, app, client):
+        """Testa exportação em streaming com filtro de período"""
+        from services.alert_service import AlertService
+        
+        service = AlertService(app.config["DATABASE_PATH"])
+        for i in range(3):
+            service.create_alert("TESTE", f"Export {i}")
+        
+        response = client.get("/api/database/export/alertas?since=2000-01-01")
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.data.splitlines()]
+        assert len([r for r in rows if r["tipo"] == "TESTE"]) == 3
+        
+        response = client.get("/api/database/export/alertas?format=csv&until=2000-01-01")
+        assert response.mimetype == "text/csv"
+        assert response.data.decode().splitlines()[0].startswith("id,tipo")
+        assert len(response.data.decode().splitlines()) == 1
+    
+    def test_export_invalid(self, client):
+        """Testa tabela não exportável e data inválida"""
+        assert client.get("/api/database/export/usuarios").status_code == 404
+        assert client.get("/api/database/export/alertas?since=ontem").status_code == 400
+
+
+class TestSnapshotEndpoints:
+    """Testes de evidências JPEG"""
+    
+    def test_serve_snapshot_with_cache_headers(self, app, client, tmp_path):
+        """Evidência gravada é servida com cache longo e ETag"""
+        import numpy as np
+        pytest.importorskip("cv2")
+        from src.utils.snapshot_store import SnapshotStore
+        
+        store = SnapshotStore(str(tmp_path))
+        key = store.submit(np.full((32, 32, 3), 200, dtype=np.uint8))
+        store.close()
+        app.config["SNAPSHOT_DIR"] = str(tmp_path)
+        
+        response = client.get(f"/api/snapshots/{key}.jpg")
+        assert response.status_code == 200
+        assert response.mimetype == "image/jpeg"
+        assert "immutable" in response.headers["Cache-Control"]
+        
+        response = client.get(
+            f"/api/snapshots/{key}.jpg", headers={"If-None-Match": f'"{key}"'}
+        )
+        assert response.status_code == 304
+    
+    def test_snapshot_queue_is_bounded(self, tmp_path):
+        """Com a codificação atrasada, recortes além do limite são descartados"""
+        import threading
+        import numpy as np
+        from src.utils.snapshot_store import SnapshotStore
+        
+        store = SnapshotStore(str(tmp_path), workers=1, max_pending=2)
+        release = threading.Event()
+        store._encode = lambda key, image: release.wait(5)
+        
+        keys = [store.submit(np.full((8, 8, 3), i, dtype=np.uint8)) for i in range(5)]
+        assert [key is not None for key in keys] == [True, True, False, False, False]
+        assert store.dropped == 3
+        
+        release.set()
+        store.close()
+        assert store.submit(np.zeros((8, 8, 3), dtype=np.uint8)) is not None
+        store.close()
+    
+    def test_invalid_snapshot_key(self, client):
+        """Chave inválida retorna 404"""
+        response = client.get("/api/snapshots/..%2Fsecret.jpg")
+        assert response.status_code == 404
+
+
+class TestLiveUpdates:
+    """Testes do change feed e do stream SSE"""
+    
+    def test_change_feed_publishes_deltas(self, app):
+        """Apenas o que mudou desde a última consulta vira evento"""
+        from services.moto_service import MotoService
+        from services.alert_service import AlertService
+        from services.iot_service import IoTService
+        from src.utils.change_feed import ChangeFeed
+        
+        db_path = app.config["DATABASE_PATH"]
+        # Watcher parado durante o teste: as consultas são feitas aqui
+        feed = ChangeFeed(db_path, poll_interval=3600)
+        subscriber = feed.subscribe()
+        assert feed.poll() == []
+        
+        moto = MotoService(db_path).get_all_motos()[0]
+        MotoService(db_path).reservar_moto(moto["id"], "USER001")
+        alert_service = AlertService(db_path)
+        alert_id = alert_service.create_alert("TESTE", "Stream")
+        alert_service.resolve_alert(alert_id, "USER001")
+        IoTService(db_path).update_device_data("SENSOR001", {"battery_level": 80})
+        
+        events = feed.poll()
+        types = [event for event, _ in events]
+        assert types == ["moto.updated", "alert.created", "alert.resolved", "device.heartbeat"]
+        assert events[0][1]["id"] == moto["id"]
+        assert events[1][1]["id"] == alert_id
+        assert events[3][1]["id"] == "SENSOR001"
+        
+        assert [item[1] for item in list(subscriber.queue)] == types
+        assert feed.poll() == []
+        feed.unsubscribe(subscriber)
+    
+    def test_change_feed_alerts_out_of_order(self, app):
+        """Alertas com horário anterior ao último enviado não são perdidos"""
+        from services.alert_service import AlertService
+        from src.utils.change_feed import ChangeFeed
+        
+        db_path = app.config["DATABASE_PATH"]
+        alert_service = AlertService(db_path)
+        alert_id = alert_service.create_alert("TESTE", "Ativo")
+        feed = ChangeFeed(db_path, poll_interval=3600)
+        subscriber = feed.subscribe()
+        
+        # Commit tardio: criado/resolvido com relógio atrasado
+        conn = alert_service.db.acquire()
+        conn.execute(
+            "INSERT INTO alertas (id, tipo, titulo, ativo, criado_em) "
+            "VALUES ('ALT_ATRASADO', 'TESTE', 'Atrasado', 1, '2000-01-01T00:00:00')"
+        )
+        conn.execute(
+            "UPDATE alertas SET ativo = 0, resolvido_em = '2000-01-01T00:00:00' WHERE id = ?",
+            (alert_id,),
+        )
+        conn.commit()
+        
+        events = feed.poll()
+        assert [(event, data["id"]) for event, data in events] == [
+            ("alert.created", "ALT_ATRASADO"),
+            ("alert.resolved", alert_id),
+        ]
+        assert "_seq" not in events[0][1]
+        assert feed.poll() == []
+        feed.unsubscribe(subscriber)
+    
+    def test_stream_endpoint(self, app, client):
+        """Stream responde text/event-stream e libera o cliente ao fechar"""
+        from src.utils.change_feed import get_change_feed
+        
+        feed = get_change_feed(app.config["DATABASE_PATH"])
+        # Servidor com threads (gthread / servidor de desenvolvimento)
+        response = client.get("/api/stream/events", environ_overrides={"wsgi.multithread": True})
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        assert "Content-Encoding" not in response.headers
+        
+        assert next(iter(response.response)).startswith(b"retry:")
+        assert feed.subscriber_count == 1
+        response.close()
+        assert feed.subscriber_count == 0
+    
+    def test_stream_disabled_on_sync_workers(self, app, client):
+        """Worker síncrono: 204 (o dashboard usa polling) sem inscrever o cliente"""
+        from src.utils.change_feed import get_change_feed
+        
+        feed = get_change_feed(app.config["DATABASE_PATH"])
+        response = client.get("/api/stream/events", environ_overrides={"wsgi.multithread": False})
+        assert response.status_code == 204
+        assert feed.subscriber_count == 0
+        
+        app.config["SSE_MODE"] = "on"
+        response = client.get("/api/stream/events", environ_overrides={"wsgi.multithread": False})
+        assert response.status_code == 200
+        response.close()
+        
+        app.config["SSE_MODE"] = "off"
+        response = client.get("/api/stream/events", environ_overrides={"wsgi.multithread": True})
+        assert response.status_code == 204
+
+async def asgi_get(asgi_app, path, on_body=None):
+    """Executa um GET na aplicação ASGI e retorna as mensagens enviadas"""
+    import asyncio
+    
+    messages = []
+    finished = asyncio.Event()
+    request_sent = False
+    
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body":
+            if on_body is not None and on_body(message):
+                finished.set()
+            elif not message.get("more_body", False):
+                finished.set()
+    
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(asgi_app(scope, receive, send), timeout=10)
+    return messages
+
+
+class TestAsgiMode:
+    """Testes do modo ASGI (a2wsgi)"""
+    
+    def test_routes_served_through_thread_pool(self, app):
+        """Rotas Flask respondem iguais pela aplicação ASGI"""
+        import asyncio
+        pytest.importorskip("a2wsgi")
+        from src.backend.asgi import create_asgi_app
+        
+        asgi_app = create_asgi_app(app, threads=4)
+        messages = asyncio.run(asgi_get(asgi_app, "/api/mobile/motos"))
+        
+        assert messages[0]["status"] == 200
+        body = b"".join(m.get("body", b"") for m in messages[1:])
+        assert "motos" in json.loads(body)
+    
+    def test_native_event_stream(self, app):
+        """Stream SSE servido no event loop e liberado na desconexão"""
+        import asyncio
+        pytest.importorskip("a2wsgi")
+        from src.backend.asgi import create_asgi_app
+        from src.utils.change_feed import get_change_feed
+        
+        asgi_app = create_asgi_app(app, threads=4)
+        feed = get_change_feed(app.config["DATABASE_PATH"])
+        chunks = []
+        
+        def on_body(message):
+            chunks.append(message["body"])
+            if len(chunks) == 1:
+                feed.publish("moto.updated", {"id": "MOTO001"})
+            return len(chunks) == 2
+        
+        messages = asyncio.run(asgi_get(asgi_app, "/api/stream/events", on_body))
+        
+        assert messages[0]["status"] == 200
+        assert (b"content-type", b"text/event-stream; charset=utf-8") in messages[0]["headers"]
+        assert chunks[0].startswith(b"retry:")
+        assert b"event: moto.updated" in chunks[1]
+        assert feed.subscriber_count == 0
 
 
 class TestValidation:
@@ -295,5 +820,56 @@ class TestValidation:
         assert response.status_code == 200
 
 
+class TestCompression:
+    """Testes da compressão das respostas"""
+
+    def test_gzip_negotiated(self, client):
+        """Testa gzip com Accept-Encoding e ETag da versão comprimida"""
+        import gzip
+
+        plain = client.get("/api/mobile/motos")
+        assert "Content-Encoding" not in plain.headers
+
+        response = client.get("/api/mobile/motos", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert json.loads(gzip.decompress(response.data))["total"] == json.loads(plain.data)["total"]
+
+        etag = response.headers["ETag"]
+        assert etag.endswith('-gzip"')
+        response = client.get(
+            "/api/mobile/motos",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+    def test_small_response_not_compressed(self, client):
+        """Testa que respostas abaixo do limite não são comprimidas"""
+        response = client.get("/api/mobile/alertas", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+
+
+class TestJSONProvider:
+    """Testes da serialização JSON das respostas"""
+
+    def test_schema_types(self, app):
+        """Testa datetime e Enums dos schemas"""
+        from datetime import datetime
+        from schemas import MotoStatus
+
+        payload = {"status": MotoStatus("disponivel"), "quando": datetime(2025, 1, 2, 3, 4, 5)}
+        data = json.loads(app.json.dumps(payload))
+        assert data == {"status": "disponivel", "quando": "2025-01-02T03:04:05"}
+
+    def test_jsonify_response(self, app):
+        """Testa jsonify com caracteres não ASCII"""
+        with app.app_context():
+            from flask import jsonify
+
+            response = jsonify({"zona": "Pátio"})
+        assert response.mimetype == "application/json"
+        assert json.loads(response.data) == {"zona": "Pátio"}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
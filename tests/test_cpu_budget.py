@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Testes do orçamento de CPU e do launcher de instâncias
+"""
+
+import multiprocessing as mp
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.detection.cpu_budget import THREAD_ENV_VARS, set_thread_env, split_cores  # noqa: E402
+
+
+def _report(results, index):
+    """Instância que responde normalmente"""
+    results.put(("ready", index))
+
+
+def _crash():
+    """Instância que morre antes de responder (ex.: falha ao carregar o modelo)"""
+    os._exit(3)
+
+
+class TestSplitCores:
+    """Testes da divisão de núcleos entre instâncias"""
+
+    def test_even_split_is_contiguous_and_disjoint(self):
+        assert split_cores(2, [0, 1, 2, 3]) == [[0, 1], [2, 3]]
+
+    def test_remainder_goes_to_first_instances(self):
+        sets = split_cores(3, list(range(8)))
+        assert [len(cores) for cores in sets] == [3, 3, 2]
+        assert sum(sets, []) == list(range(8))
+
+    def test_preserves_given_core_ids(self):
+        assert split_cores(2, [4, 5, 10, 11]) == [[4, 5], [10, 11]]
+
+    def test_one_core_per_instance(self):
+        assert split_cores(4, [0, 1, 2, 3]) == [[0], [1], [2], [3]]
+
+    @pytest.mark.parametrize("instances", [0, 5])
+    def test_invalid_instance_count(self, instances):
+        with pytest.raises(ValueError):
+            split_cores(instances, [0, 1, 2, 3])
+
+    def test_defaults_to_available_cores(self):
+        sets = split_cores(1)
+        assert len(sets) == 1 and sets[0]
+
+
+class TestThreadEnv:
+    """Testes das variáveis de ambiente dos pools de threads"""
+
+    def test_sets_all_thread_vars(self, monkeypatch):
+        for var in THREAD_ENV_VARS:
+            monkeypatch.delenv(var, raising=False)
+        set_thread_env(3)
+        assert all(os.environ[var] == "3" for var in THREAD_ENV_VARS)
+
+    def test_none_leaves_environment(self, monkeypatch):
+        for var in THREAD_ENV_VARS:
+            monkeypatch.delenv(var, raising=False)
+        set_thread_env(None)
+        assert not any(var in os.environ for var in THREAD_ENV_VARS)
+
+
+class TestGather:
+    """O launcher não bloqueia quando uma instância morre sem responder"""
+
+    def test_dead_instance_is_dropped(self):
+        pytest.importorskip("scipy")
+        from src.detection.launcher import _gather
+
+        ctx = mp.get_context("spawn")
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=_report, args=(results, 0)),
+            ctx.Process(target=_crash),
+        ]
+        for process in processes:
+            process.start()
+
+        pending = {0, 1}
+        received = _gather(results, processes, "ready", pending)
+        for process in processes:
+            process.join(timeout=10)
+
+        assert list(received) == [0]
+        assert pending == {0}
+        assert processes[1].exitcode == 3
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Testes do gerenciador de conexões SQLite persistentes
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils.db_connection import ConnectionManager  # noqa: E402
+
+
+class TestConnectionManager:
+    """Testes de reuso de conexões por thread"""
+
+    def test_same_connection_per_thread(self, tmp_path):
+        db = ConnectionManager(str(tmp_path / "test.db"))
+        first = db.acquire()
+        db.release(first)
+        assert db.acquire() is first
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db.acquire()))
+        thread.start()
+        thread.join()
+        assert other[0] is not first
+        db.close_all()
+
+    def test_connections_closed_when_threads_exit(self, tmp_path):
+        db = ConnectionManager(str(tmp_path / "test.db"))
+        db.acquire()
+        opened = []
+
+        def short_request():
+            conn = db.acquire()
+            conn.execute("SELECT 1")
+            opened.append(conn)
+
+        # Servidor com uma thread por requisição
+        for _ in range(50):
+            thread = threading.Thread(target=short_request)
+            thread.start()
+            thread.join()
+
+        assert len(opened) == 50
+        assert db.open_connections == 1
+        with pytest.raises(sqlite3.ProgrammingError):
+            opened[0].execute("SELECT 1")
+        db.close_all()
+
+    def test_memory_database_shared_between_threads(self):
+        db = ConnectionManager(":memory:")
+        conn = db.acquire()
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.commit()
+
+        counts = []
+        thread = threading.Thread(
+            target=lambda: counts.append(db.acquire().execute("SELECT COUNT(*) FROM t").fetchone()[0])
+        )
+        thread.start()
+        thread.join()
+        assert counts == [1]
+        db.close_all()
+
+    def test_uncommitted_work_is_rolled_back(self, tmp_path):
+        db = ConnectionManager(str(tmp_path / "test.db"))
+        with db.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.commit()
+            conn.execute("INSERT INTO t VALUES (1)")
+
+        with db.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+        db.close_all()
+
+    def test_failed_service_write_releases_lock(self, tmp_path):
+        from src.services.moto_service import MotoService
+        from src.utils.db_connection import reset_connection_manager
+
+        db_path = str(tmp_path / "test.db")
+        service = MotoService(db_path)
+        with service.db.connection() as conn:
+            conn.execute("CREATE TABLE motos_patio (id TEXT PRIMARY KEY, status TEXT, em_uso_por TEXT, "
+                         "ultima_atualizacao TEXT)")
+            conn.execute("INSERT INTO motos_patio (id, status) VALUES ('MOTO001', 'disponivel')")
+            conn.commit()
+
+        # Sem historico_uso: o INSERT falha depois do UPDATE já ter aberto a transação
+        with pytest.raises(sqlite3.OperationalError):
+            service.reservar_moto("MOTO001", "USER001")
+
+        # O lock de escrita não fica preso à thread que falhou
+        other = sqlite3.connect(db_path, timeout=0)
+        other.execute("UPDATE motos_patio SET status = 'manutencao'")
+        other.commit()
+        other.close()
+        reset_connection_manager(db_path)
+
+    def test_file_database_uses_wal(self, tmp_path):
+        db = ConnectionManager(str(tmp_path / "test.db"))
+        conn = db.acquire()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.commit()
+        db.backup(str(tmp_path / "backup.db"))
+        db.close_all()
+
+        backup = ConnectionManager(str(tmp_path / "backup.db"))
+        assert backup.acquire().execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        backup.close_all()
+
+
+class TestMigrations:
+    """Testes das migrações de schema"""
+
+    @staticmethod
+    def _base_schema(conn):
+        conn.execute("CREATE TABLE motos_patio (id TEXT PRIMARY KEY, placa TEXT)")
+        conn.execute("CREATE TABLE alertas (id TEXT PRIMARY KEY, ativo BOOLEAN, criado_em TEXT, resolvido_em TEXT)")
+        conn.execute("CREATE TABLE historico_uso (id TEXT PRIMARY KEY, moto_id TEXT, inicio_uso TEXT)")
+        conn.execute("CREATE TABLE dispositivos_iot (id TEXT PRIMARY KEY)")
+        conn.execute("CREATE TABLE detections (id INTEGER PRIMARY KEY, created_at TEXT)")
+
+    def test_plate_lookup_uses_index(self, tmp_path):
+        from src.utils.migrations import SCHEMA_VERSION, apply_migrations, get_schema_version
+
+        db = ConnectionManager(str(tmp_path / "test.db"))
+        conn = db.acquire()
+        self._base_schema(conn)
+        conn.execute("INSERT INTO motos_patio VALUES ('MOTO001', 'abc-1234')")
+        conn.commit()
+
+        assert apply_migrations(conn) == SCHEMA_VERSION
+        # Idempotente
+        assert apply_migrations(conn) == SCHEMA_VERSION
+        assert get_schema_version(conn) == SCHEMA_VERSION
+
+        row = conn.execute(
+            "SELECT id FROM motos_patio WHERE placa_normalizada = ?", ("ABC1234",)
+        ).fetchone()
+        assert row["id"] == "MOTO001"
+
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM motos_patio WHERE placa_normalizada = ?", ("X",)
+        ).fetchall()
+        assert "idx_motos_placa_normalizada" in " ".join(r["detail"] for r in plan)
+        db.close_all()
+
+    def test_colliding_plates_do_not_block_migration(self, tmp_path):
+        from src.utils.migrations import SCHEMA_VERSION, apply_migrations, find_placa_collisions
+
+        db = ConnectionManager(str(tmp_path / "test.db"))
+        conn = db.acquire()
+        self._base_schema(conn)
+        conn.execute("INSERT INTO motos_patio VALUES ('MOTO001', 'ABC-1234')")
+        conn.execute("INSERT INTO motos_patio VALUES ('MOTO002', 'abc 1234')")
+        conn.execute("INSERT INTO motos_patio VALUES ('MOTO003', 'XYZ-9876')")
+        conn.commit()
+
+        assert apply_migrations(conn) == SCHEMA_VERSION
+        assert find_placa_collisions(conn) == [("ABC1234", ["MOTO001", "MOTO002"])]
+        db.close_all()
+
+    @pytest.mark.parametrize("placa", [
+        "abc-1234", " abc 1d23 ", "\tabc-1234\n", "çab-12", "straße", "ABC1D23",
+    ])
+    def test_python_normalization_matches_sql(self, placa):
+        from src.services.moto_service import MotoService
+        from src.utils.migrations import PLACA_NORMALIZADA_SQL
+
+        conn = sqlite3.connect(":memory:")
+        expected = conn.execute(
+            f"SELECT {PLACA_NORMALIZADA_SQL} FROM (SELECT ? AS placa)", (placa,)
+        ).fetchone()[0]
+        conn.close()
+        assert MotoService.normalize_placa(placa) == expected
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Testes do cache de detecções por frame
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.detection.detection_cache import RAW_COLUMNS, DetectionCache  # noqa: E402
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"conteudo-do-video" * 100)
+    return str(path)
+
+
+def raw_rows(n, start=0.0):
+    return np.arange(n * RAW_COLUMNS, dtype=np.float32).reshape(n, RAW_COLUMNS) + start
+
+
+class TestDetectionCache:
+    """Testes de put/get, persistência e chave do cache"""
+
+    def test_put_and_get(self, tmp_path, video):
+        """Frames gravados são lidos de volta; os demais são miss"""
+        cache = DetectionCache(str(tmp_path / "cache"), video, "yolov8n.pt", 0.5, 10)
+        cache.put(0, raw_rows(2))
+        cache.put(3, raw_rows(1, start=100.0))
+
+        np.testing.assert_array_equal(cache.get(0), raw_rows(2))
+        np.testing.assert_array_equal(cache.get(3), raw_rows(1, start=100.0))
+        assert cache.get(1) is None
+        assert cache.stats() == {"cache_hits": 2, "cache_misses": 1}
+        cache.close()
+
+    def test_empty_frame_is_a_hit(self, tmp_path, video):
+        """Frame sem detecções é cacheado como zero linhas"""
+        cache = DetectionCache(str(tmp_path / "cache"), video, "yolov8n.pt", 0.5, 10)
+        cache.put(5, np.empty((0, RAW_COLUMNS), dtype=np.float32))
+
+        rows = cache.get(5)
+        assert rows is not None and rows.shape == (0, RAW_COLUMNS)
+        cache.close()
+
+    def test_reopen_from_disk(self, tmp_path, video):
+        """Uma nova execução reaproveita o que foi gravado, inclusive além do índice inicial"""
+        cache_dir = str(tmp_path / "cache")
+        cache = DetectionCache(cache_dir, video, "yolov8n.pt", 0.5, 4)
+        cache.put(1, raw_rows(3))
+        cache.put(9, raw_rows(1, start=50.0))
+        cache.close()
+
+        reopened = DetectionCache(cache_dir, video, "yolov8n.pt", 0.5, 4)
+        assert reopened.path == cache.path
+        np.testing.assert_array_equal(reopened.get(1), raw_rows(3))
+        np.testing.assert_array_equal(reopened.get(9), raw_rows(1, start=50.0))
+        reopened.close()
+
+    def test_key_includes_inference_parameters(self, tmp_path, video):
+        """Tamanho de entrada, IoU, classes, limiar e modelo separam os caches"""
+        cache_dir = str(tmp_path / "cache")
+        base = DetectionCache(cache_dir, video, "yolov8n.pt", 0.5, 4, input_size=640)
+        base.put(0, raw_rows(1))
+        base.close()
+
+        variants = [
+            DetectionCache(cache_dir, video, "yolov8n.pt", 0.5, 4, input_size=320),
+            DetectionCache(cache_dir, video, "yolov8n.pt", 0.5, 4, input_size=640, iou_threshold=0.5),
+            DetectionCache(cache_dir, video, "yolov8n.pt", 0.5, 4, input_size=640, classes=[3]),
+            DetectionCache(cache_dir, video, "yolov8n.pt", 0.6, 4, input_size=640),
+            DetectionCache(cache_dir, video, "yolov8s.pt", 0.5, 4, input_size=640),
+        ]
+        assert len({base.path, *(v.path for v in variants)}) == len(variants) + 1
+        for variant in variants:
+            assert variant.get(0) is None
+            variant.close()
+
+    def test_video_change_invalidates(self, tmp_path, video):
+        """Outro conteúdo no mesmo caminho não reaproveita o cache"""
+        cache_dir = str(tmp_path / "cache")
+        cache = DetectionCache(cache_dir, video, "yolov8n.pt", 0.5, 4)
+        cache.close()
+
+        with open(video, "ab") as f:
+            f.write(b"novo")
+        os.utime(video, (0, 0))
+
+        changed = DetectionCache(cache_dir, video, "yolov8n.pt", 0.5, 4)
+        assert changed.path != cache.path
+        changed.close()
+
+    def test_retrained_weights_invalidate(self, tmp_path, video):
+        """Pesos retreinados salvos com o mesmo nome não reaproveitam o cache"""
+        cache_dir = str(tmp_path / "cache")
+        weights = tmp_path / "best.pt"
+        weights.write_bytes(b"pesos-v1")
+        cache = DetectionCache(cache_dir, video, str(weights), 0.5, 4)
+        cache.put(0, raw_rows(1))
+        cache.close()
+
+        weights.write_bytes(b"pesos-v2")
+        retrained = DetectionCache(cache_dir, video, str(weights), 0.5, 4)
+        assert retrained.path != cache.path
+        assert retrained.get(0) is None
+        retrained.close()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Testes da geometria de detecção (vagas, homografia, letterbox e fusão multi-câmera)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+cv2 = pytest.importorskip("cv2")
+
+from src.detection.slot_occupancy import SlotOccupancyMap  # noqa: E402
+from src.detection.yard_mapping import YardHomography  # noqa: E402
+from src.detection.preprocess import Letterbox  # noqa: E402
+
+pytest.importorskip("scipy")
+from src.detection.fusion import DetectionFusion  # noqa: E402
+
+
+@pytest.fixture
+def slot_map():
+    """Mapa com duas vagas lado a lado em um frame 200x100"""
+    slots = {
+        "A1-001": [[0, 50], [99, 50], [99, 99], [0, 99]],
+        "A1-002": [[100, 50], [199, 50], [199, 99], [100, 99]],
+    }
+    return SlotOccupancyMap(slots, (200, 100))
+
+
+class TestSlotOccupancy:
+    """Testes de ocupação de vagas"""
+
+    def test_assign_by_footpoint(self, slot_map):
+        """Vaga é definida pelo centro da base da bbox"""
+        bboxes = np.array([[10, 20, 60, 90], [120, 0, 180, 30], [150, 40, 190, 95]])
+        assert slot_map.assign(bboxes) == ["A1-001", None, "A1-002"]
+
+    def test_occupancy(self, slot_map):
+        """Ocupação por vaga"""
+        occupancy = slot_map.occupancy(np.array([[10, 20, 60, 90]]))
+        assert occupancy == {"A1-001": True, "A1-002": False}
+
+    def test_empty_detections(self, slot_map):
+        """Frame sem detecções não ocupa vagas"""
+        assert slot_map.assign(np.empty((0, 4))) == []
+        assert not slot_map.occupancy_from_labels(slot_map.lookup([])).any()
+
+    def test_rescaled_frame(self, slot_map):
+        """Frames com resolução diferente da calibração são reescalados"""
+        bboxes = np.array([[75, 40, 95, 48]])
+        assert slot_map.assign(bboxes, frame_size=(100, 50)) == ["A1-002"]
+
+
+class TestYardHomography:
+    """Testes do mapeamento pixel -> pátio"""
+
+    @pytest.fixture
+    def homography(self):
+        """Escala 10 px = 1 m com origem deslocada em (5, 5) metros"""
+        image = [[0, 0], [100, 0], [100, 100], [0, 100]]
+        yard = [[5, 5], [15, 5], [15, 15], [5, 15]]
+        return YardHomography.from_points(image, yard, frame_size=(100, 100))
+
+    def test_points_to_yard(self, homography):
+        """Pontos são transformados em lote"""
+        yard = homography.to_yard(np.array([[50, 50], [0, 100]]))
+        np.testing.assert_allclose(yard, [[10, 10], [5, 15]], atol=1e-4)
+
+    def test_bboxes_use_footpoint(self, homography):
+        """Posição da bbox é o centro da base"""
+        yard = homography.bboxes_to_yard(np.array([[40, 20, 60, 80]]))
+        np.testing.assert_allclose(yard, [[10, 13]], atol=1e-4)
+
+    def test_rescaled_frame(self, homography):
+        """Frame em outra resolução usa matriz reescalada"""
+        yard = homography.to_yard(np.array([[25, 25]]), frame_size=(50, 50))
+        np.testing.assert_allclose(yard, [[10, 10]], atol=1e-4)
+
+    def test_invalid_calibration(self):
+        """Calibração com menos de 4 pontos é rejeitada"""
+        with pytest.raises(ValueError):
+            YardHomography.from_points([[0, 0]], [[0, 0]])
+
+
+class TestLetterbox:
+    """Testes do pré-processamento com buffers reutilizados"""
+
+    def test_buffer_is_reused(self):
+        """O mesmo tensor é devolvido a cada frame"""
+        letterbox = Letterbox(64)
+        frame = np.zeros((48, 80, 3), dtype=np.uint8)
+        first = letterbox(frame)
+        frame[:] = 255
+        second = letterbox(frame)
+        assert first is second
+        assert first.shape == (1, 3, 64, 64)
+        assert second[0, :, 32, 32].tolist() == [1.0, 1.0, 1.0]
+        # Faixas de padding permanecem com o valor de preenchimento
+        assert second[0, 0, 0, 0] == pytest.approx(114 / 255)
+
+    def test_unletterbox_round_trip(self):
+        """Caixas no espaço do modelo voltam ao frame original"""
+        letterbox = Letterbox(64)
+        letterbox(np.zeros((50, 100, 3), dtype=np.uint8))
+        # Escala 0.64, padding vertical de 16 px
+        raw = np.array([[0, 16, 32, 48, 0.9, 3]], dtype=np.float32)
+        letterbox.unletterbox(raw)
+        np.testing.assert_allclose(raw[0, :4], [0, 0, 50, 50], atol=1e-4)
+        assert raw[0, 5] == 3
+
+    def test_invalid_input_size(self):
+        with pytest.raises(ValueError):
+            Letterbox(100)
+
+
+class TestDetectionFusion:
+    """Testes da fusão multi-câmera"""
+
+    @staticmethod
+    def _det(x, y, confidence=0.9):
+        return {"location_x": x, "location_y": y, "confidence": confidence, "class": 3}
+
+    def test_same_moto_from_two_cameras(self):
+        """Mesma moto vista por duas câmeras vira uma observação"""
+        fusion = DetectionFusion(window_seconds=1.0, merge_radius=1.0)
+        fusion.submit("CAM1", [self._det(10.0, 10.0, 0.9)], timestamp=100.0)
+        fusion.submit("CAM2", [self._det(10.4, 10.0, 0.6)], timestamp=100.2)
+
+        fused = fusion.fuse(now=100.3)
+        assert len(fused) == 1
+        assert fused[0]["cameras"] == ["CAM1", "CAM2"]
+        assert fused[0]["location_x"] == pytest.approx(10.16)
+
+    def test_neighbours_in_same_camera_are_kept(self):
+        """Motos próximas na mesma câmera não são fundidas"""
+        fusion = DetectionFusion(window_seconds=1.0, merge_radius=1.0)
+        fusion.submit("CAM1", [self._det(10.0, 10.0), self._det(10.5, 10.0)], timestamp=100.0)
+        fusion.submit("CAM2", [self._det(10.1, 10.0)], timestamp=100.0)
+
+        fused = fusion.fuse(now=100.0)
+        assert len(fused) == 2
+        assert sum(f["detections"] for f in fused) == 3
+
+    def test_stale_frames_are_ignored(self):
+        """Frames fora da janela de tempo são descartados"""
+        fusion = DetectionFusion(window_seconds=0.5)
+        fusion.submit("CAM1", [self._det(1.0, 1.0)], timestamp=100.0)
+        assert fusion.fuse(now=101.0) == []
+
+    def test_dedup_ratio_counts_fused_inputs(self):
+        """Frames substituídos entre duas fusões não inflam a deduplicação"""
+        fusion = DetectionFusion(window_seconds=1.0, merge_radius=1.0)
+        for i in range(10):
+            fusion.submit("CAM1", [self._det(10.0, 10.0)], timestamp=100.0 + i * 0.01)
+        fusion.submit("CAM2", [self._det(20.0, 20.0)], timestamp=100.1)
+
+        assert len(fusion.fuse(now=100.2)) == 2
+        metrics = fusion.get_metrics()
+        assert (metrics["submitted"], metrics["fuse_inputs"], metrics["fused"]) == (11, 2, 2)
+        assert metrics["dedup_ratio"] == 0
+
+    def test_fusion_process_receives_from_queue(self):
+        """Detectores de processos distintos enviam à fusão por fila"""
+        import multiprocessing as mp
+        from src.detection.fusion import QueueFusionSink, run_fusion_process
+
+        ctx = mp.get_context("spawn")
+        fusion_queue, results = ctx.Queue(), ctx.Queue()
+        process = ctx.Process(
+            target=run_fusion_process,
+            args=(fusion_queue, results),
+            kwargs={"backend_url": None, "window_seconds": 30.0},
+        )
+        process.start()
+
+        sink = QueueFusionSink(fusion_queue)
+        sink.submit("CAM1", [self._det(10.0, 10.0, 0.9)])
+        sink.submit("CAM2", [dict(self._det(10.3, 10.0, 0.7), bbox=[0, 0, 5, 5])])
+        sink.submit("CAM2", [{"bbox": [0, 0, 5, 5], "confidence": 0.8}])
+        fusion_queue.put(None)
+
+        _, metrics = results.get(timeout=30)
+        process.join(timeout=10)
+        assert process.exitcode == 0
+        # O último frame da CAM2 (sem localização) substitui o anterior
+        assert metrics["submitted"] == 2
+        assert metrics["fused"] == 1
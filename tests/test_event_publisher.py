@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Testes do envio de eventos de moto fora da vaga pelo detector
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.iot.event_publisher import OutOfSpotReporter  # noqa: E402
+
+
+class FakePublisher:
+    """Publisher em memória (sem rede nem fila offline)"""
+
+    base_url = "http://backend:5001"
+    device_id = "cam-01"
+
+    def __init__(self):
+        self.sent = []
+
+    def send_event(self, payload, event_id=None):
+        self.sent.append((event_id, payload))
+        return True
+
+
+def _detection(key, confidence=0.91):
+    return {"bbox": [10, 20, 50, 80], "confidence": confidence, "snapshot": key}
+
+
+class TestOutOfSpotReporter:
+    """Testes do evento gerado a partir de uma detecção com evidência"""
+
+    def test_event_carries_its_own_snapshot(self):
+        publisher = FakePublisher()
+        reporter = OutOfSpotReporter(publisher, cooldown_seconds=0)
+        key = "ab" * 16
+
+        event_id = reporter.report("CAM1", _detection(key))
+        reporter.close()
+
+        assert event_id == f"evt-{key}"
+        sent_id, payload = publisher.sent[0]
+        assert sent_id == event_id
+        assert payload["deviceId"] == "CAM1"
+        assert payload["type"] == "PARKING_OUT_OF_SPOT"
+        assert payload["imageUrl"] == f"http://backend:5001/api/snapshots/{key}.jpg"
+        assert payload["metadata"]["snapshot"] == key
+
+    def test_cooldown_per_camera(self):
+        publisher = FakePublisher()
+        reporter = OutOfSpotReporter(publisher, cooldown_seconds=60)
+
+        assert reporter.report("CAM1", _detection("1" * 32)) is not None
+        assert reporter.report("CAM1", _detection("2" * 32)) is None
+        assert reporter.report("CAM2", _detection("3" * 32)) is not None
+        reporter.close()
+
+        assert [payload["deviceId"] for _, payload in publisher.sent] == ["CAM1", "CAM2"]
+
+    def test_ready_reflects_cooldown(self):
+        reporter = OutOfSpotReporter(FakePublisher(), cooldown_seconds=60)
+
+        assert reporter.ready("CAM1")
+        reporter.report("CAM1", _detection("1" * 32))
+        # O detector não codifica evidências enquanto a câmera está em cooldown
+        assert not reporter.ready("CAM1")
+        assert reporter.ready("CAM2")
+        reporter.close()
+
+    def test_detection_without_snapshot_is_ignored(self):
+        publisher = FakePublisher()
+        reporter = OutOfSpotReporter(publisher, cooldown_seconds=0)
+
+        assert reporter.report("CAM1", {"bbox": [0, 0, 1, 1], "confidence": 0.5}) is None
+        reporter.close()
+        assert publisher.sent == []
@@ -106,6 +106,42 @@ def test_iot_devices(api_client):
     assert "total" in data
 
 
+def test_iot_devices_data_batch(api_client):
+    """Testa telemetria em lote (destino do TelemetryBatcher)"""
+    readings = [
+        {"device_id": "NAO-EXISTE", "temperature": 25.5, "battery_level": 90},
+        {"device_id": "NAO-EXISTE", "battery_level": 150},
+    ]
+    response = api_client.post(
+        "/api/iot/devices/data:batch",
+        data=json.dumps({"readings": readings}),
+        content_type="application/json",
+    )
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+
+    data = json.loads(response.data)
+    assert data["accepted"] == 0
+    assert data["unknown_devices"] == ["NAO-EXISTE"]
+    assert [r["index"] for r in data["rejected"]] == [1]
+
+
+def test_snapshot_served(api_client, tmp_path):
+    """Testa que a evidência das URLs dos eventos é servida por esta API"""
+    import numpy as np
+    pytest.importorskip("cv2")
+    from src.utils.snapshot_store import SnapshotStore
+
+    store = SnapshotStore(str(tmp_path))
+    key = store.submit(np.full((32, 32, 3), 200, dtype=np.uint8))
+    store.close()
+    api_client.application.config["SNAPSHOT_DIR"] = str(tmp_path)
+
+    response = api_client.get(f"/api/snapshots/{key}.jpg")
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+    assert response.mimetype == "image/jpeg"
+    assert api_client.get(f"/api/snapshots/{'0' * 32}.jpg").status_code == 404
+
+
 def test_database_analytics(api_client):
     """Testa endpoint de analytics do banco"""
     response = api_client.get("/api/database/analytics")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Testes da captura ao vivo com o frame mais recente
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.detection.live_capture import LatestFrameGrabber  # noqa: E402
+
+
+class BlockingCapture:
+    """Câmera falsa cujo read() bloqueia até ser liberado pelo teste"""
+
+    def __init__(self):
+        self.unblock = threading.Event()
+        self.reading = threading.Event()
+        self.released = threading.Event()
+        self.read_during_release = False
+
+    def read(self):
+        self.reading.set()
+        self.unblock.wait()
+        return False, None
+
+    def release(self):
+        if self.reading.is_set() and not self.unblock.is_set():
+            self.read_during_release = True
+        self.released.set()
+
+
+class FiniteCapture:
+    """Câmera falsa que entrega alguns frames e termina"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.released = False
+
+    def read(self):
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+    def release(self):
+        self.released = True
+
+
+def make_grabber(cap):
+    grabber = LatestFrameGrabber("inexistente.mp4", read_timeout=1.0)
+    grabber.cap.release()
+    grabber.cap = cap
+    return grabber
+
+
+class TestLatestFrameGrabber:
+    """Testes da thread de captura e da liberação da câmera"""
+
+    def test_release_deferred_while_read_blocks(self):
+        """Com a thread presa em read(), a câmera só é liberada quando ela sai"""
+        cap = BlockingCapture()
+        grabber = make_grabber(cap).start()
+        assert cap.reading.wait(timeout=5)
+
+        grabber.release()
+        assert not cap.released.is_set()
+
+        cap.unblock.set()
+        assert cap.released.wait(timeout=5)
+        assert not cap.read_during_release
+
+    def test_release_after_thread_exit(self):
+        """Thread já encerrada: release libera a câmera imediatamente"""
+        cap = FiniteCapture([np.zeros((2, 2, 3), dtype=np.uint8)])
+        grabber = make_grabber(cap).start()
+        ok, frame = grabber.read()
+        assert ok and frame.shape == (2, 2, 3)
+        assert grabber.read() == (False, None)
+
+        grabber.release()
+        assert cap.released
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Testes da seleção automática de modelo por orçamento de latência
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest  # noqa: E402
+
+from src.detection.model_selection import resolve_auto_model, select_model  # noqa: E402
+
+# Latências simuladas (ms) por modelo e tamanho de entrada
+LATENCIES = {
+    ("large.pt", 320): 90, ("large.pt", 640): 300,
+    ("small.pt", 320): 20, ("small.pt", 640): 60,
+}
+
+
+def fake_timer(calls):
+    def timer(model, size):
+        calls.append((model, size))
+        return LATENCIES[(model, size)]
+    return timer
+
+
+def process_selector(latency_budget_ms):
+    """Seletor executado no processo de calibração (precisa ser picklable)"""
+    return {
+        "model": "small.pt", "input_size": 320, "latency_ms": 20.0, "fits": True,
+        "budget_ms": latency_budget_ms, "pid": os.getpid(),
+        "affinity": sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None,
+        "threads": os.environ.get("OMP_NUM_THREADS"),
+    }
+
+
+def failing_selector(latency_budget_ms):
+    raise RuntimeError("calibração falhou")
+
+
+class TestModelSelection:
+    """Testes da calibração e do cache por host"""
+
+    def test_picks_most_accurate_within_budget(self, tmp_path):
+        calls = []
+        choice = select_model(
+            100, ["large.pt", "small.pt"], [320, 640],
+            cache_path=str(tmp_path / "sel.json"), timer=fake_timer(calls),
+        )
+        assert (choice["model"], choice["input_size"], choice["fits"]) == ("large.pt", 320, True)
+        # small.pt nem chega a ser medido
+        assert calls == [("large.pt", 320), ("large.pt", 640)]
+
+    def test_fallback_when_nothing_fits(self, tmp_path):
+        choice = select_model(
+            10, ["large.pt", "small.pt"], [320, 640],
+            cache_path=str(tmp_path / "sel.json"), timer=fake_timer([]),
+        )
+        assert (choice["model"], choice["input_size"], choice["fits"]) == ("small.pt", 320, False)
+
+    def test_choice_is_cached_per_host(self, tmp_path):
+        cache_path = tmp_path / "sel.json"
+        first = select_model(
+            70, ["large.pt", "small.pt"], [320, 640],
+            cache_path=str(cache_path), timer=fake_timer([]),
+        )
+        calls = []
+        second = select_model(
+            70, ["large.pt", "small.pt"], [320, 640],
+            cache_path=str(cache_path), timer=fake_timer(calls),
+        )
+        assert first == second
+        assert calls == []
+        assert len(json.loads(cache_path.read_text())) == 1
+        # Escrita atômica: nenhum arquivo temporário fica para trás
+        assert [p.name for p in tmp_path.iterdir()] == ["sel.json"]
+
+
+class TestResolveAutoModel:
+    """Testes da resolução de model_path="auto" antes dos workers"""
+
+    def test_selection_is_passed_to_workers(self):
+        kwargs = resolve_auto_model(
+            {"model_path": "auto", "latency_budget_ms": 50}, selector=process_selector,
+        )
+        assert (kwargs["model_path"], kwargs["input_size"]) == ("small.pt", 320)
+        assert "latency_budget_ms" not in kwargs
+        # Registro vai junto para os workers exporem nas métricas
+        assert kwargs["model_selection"]["budget_ms"] == 50
+        # Calibração fora do processo pai
+        assert kwargs["model_selection"]["pid"] != os.getpid()
+
+    def test_calibrates_under_worker_budget(self):
+        pytest.importorskip("torch")
+        if not hasattr(os, "sched_getaffinity"):
+            pytest.skip("Afinidade de CPU não suportada")
+        core = min(os.sched_getaffinity(0))
+        kwargs = resolve_auto_model({"model_path": "auto"}, [core], selector=process_selector)
+        assert kwargs["model_selection"]["affinity"] == [core]
+        assert kwargs["model_selection"]["threads"] == "1"
+
+    def test_concrete_model_is_untouched(self):
+        kwargs = resolve_auto_model({"model_path": "yolov8n.pt"}, selector=failing_selector)
+        assert kwargs == {"model_path": "yolov8n.pt"}
+
+    def test_failed_calibration_raises(self):
+        with pytest.raises(RuntimeError):
+            resolve_auto_model({"model_path": "auto"}, selector=failing_selector)
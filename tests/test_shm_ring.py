@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Testes do anel de frames em memória compartilhada
+"""
+
+import multiprocessing as mp
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.detection.shm_ring import SharedFrameRing  # noqa: E402
+
+FRAME_SHAPE = (4, 6, 3)
+
+
+def _produce(ring, values):
+    """Processo produtor: escreve e publica um frame por valor"""
+    for value in values:
+        slot, view = ring.acquire(timeout=5)
+        view[:] = value
+        ring.publish(slot, int(value))
+    ring.close_producer(1)
+    ring.close()
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing(FRAME_SHAPE, slots=2)
+    yield ring
+    ring.close()
+
+
+class TestSharedFrameRing:
+    """Testes de reciclagem de slots e posse do bloco compartilhado"""
+
+    def test_wraparound_reuses_slots(self, ring):
+        """Mais frames que slots: cada slot é reciclado sem misturar conteúdo"""
+        used = set()
+        for i in range(7):
+            slot, view = ring.acquire(timeout=1)
+            view[:] = i
+            ring.publish(slot, i)
+
+            got_slot, frame, frame_index, _ = ring.get(timeout=1)
+            assert (got_slot, frame_index) == (slot, i)
+            assert np.all(frame == i)
+            ring.release(got_slot)
+            used.add(slot)
+        assert used == {0, 1}
+
+    def test_acquire_blocks_until_release(self, ring):
+        """Com todos os slots reservados não há slot livre até um release"""
+        first = ring.acquire(timeout=1)
+        second = ring.acquire(timeout=1)
+        assert first is not None and second is not None
+        assert ring.acquire() is None
+        assert ring.acquire(timeout=0.05) is None
+
+        ring.release(first[0])
+        assert ring.acquire(timeout=1)[0] == first[0]
+
+    def test_stale_publication_is_skipped(self, ring):
+        """Slot republicado antes da leitura: a publicação antiga é descartada"""
+        slot, view = ring.acquire(timeout=1)
+        view[:] = 1
+        ring.publish(slot, 1)
+        view[:] = 2
+        ring.publish(slot, 2)
+        ring.close_producer(1)
+
+        got_slot, frame, frame_index, _ = ring.get(timeout=1)
+        assert frame_index == 2 and np.all(frame == 2)
+        ring.release(got_slot)
+        assert ring.get(timeout=1) is None
+
+    def test_child_close_does_not_unlink(self, ring):
+        """Só o criador remove o bloco: o fechamento no filho preserva os frames"""
+        ctx = mp.get_context("spawn")
+        shared = SharedFrameRing(FRAME_SHAPE, slots=2, ctx=ctx)
+        try:
+            process = ctx.Process(target=_produce, args=(shared, [5, 6, 7]))
+            process.start()
+
+            seen = []
+            while True:
+                item = shared.get(timeout=30)
+                if item is None:
+                    break
+                slot, frame, frame_index, _ = item
+                assert np.all(frame == frame_index)
+                seen.append(frame_index)
+                shared.release(slot)
+
+            process.join(timeout=10)
+            assert process.exitcode == 0
+            assert seen == [5, 6, 7]
+        finally:
+            shared.close()